@@ -0,0 +1,11 @@
+"""
+Performance benchmarks for the analysis pipeline and API hot paths.
+
+Run from the project root:
+
+    python -m benchmarks.run --sizes 1000,10000 --out bench.json
+    python -m benchmarks.compare old.json new.json
+
+Every suite works on a seeded synthetic corpus (see `corpus`) and the API and
+ingest suites run against a throwaway test database, never `db.sqlite3`.
+"""
@@ -0,0 +1,51 @@
+"""Per-stage timings of `myapp.ai_analysis` on synthetic corpora."""
+
+from . import corpus
+from .harness import measure
+
+
+def _fit_topic_model(texts):
+    from myapp import topics
+
+    model = topics.OnlineTopicModel()
+    for i in range(0, len(texts), topics.BATCH_SIZE):
+        model.partial_fit(texts[i : i + topics.BATCH_SIZE])
+    return model.topics()
+
+
+def run(sizes, seed=0):
+    from myapp import ai_analysis, summaries
+    from myapp.records import ReviewBatch
+
+    results = {}
+    for n in sizes:
+        reviews = list(corpus.generate_reviews(n, seed=seed))
+        review_objects = corpus.as_analysis_input(reviews)
+        texts = [r["text"] for r in reviews]
+        ratings = [r["rating"] for r in reviews]
+        repeat = 3 if n <= 10_000 else 1
+
+        def sentiment():
+            for text, rating in zip(texts, ratings):
+                ai_analysis.classify_sentiment(ai_analysis.get_sentiment_score(text), rating)
+
+        topics = ai_analysis.extract_topics(texts)
+        stages = {
+            "sentiment": sentiment,
+            "topics": lambda: ai_analysis.extract_topics(texts),
+            "keywords": lambda: ai_analysis.extract_keywords(texts),
+            "praises": lambda: ai_analysis.extract_praises(texts),
+            "complaints": lambda: ai_analysis.extract_complaints(texts),
+            "insights": lambda: ai_analysis.generate_ai_insights(topics, 0.1),
+            "analyze_reviews": lambda: ai_analysis.analyze_reviews("bench", review_objects),
+            "analyze_batches": lambda: ai_analysis.analyze_batches("bench", [ReviewBatch(texts, ratings)]),
+            "analyze_texts": lambda: ai_analysis.analyze_texts(list(zip(texts, ratings))),
+            "topic_model": lambda: _fit_topic_model(texts),
+            "summarize": lambda: summaries.summarize(texts),
+        }
+        for stage, fn in stages.items():
+            timing = measure(fn, repeat=repeat)
+            timing["items"] = n
+            timing["items_per_sec"] = n / timing["median"] if timing["median"] else None
+            results[f"analysis/{stage}/{n}"] = timing
+    return results
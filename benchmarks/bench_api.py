@@ -0,0 +1,140 @@
+"""Dashboard and list views through the Django test client: latency and query counts."""
+
+import datetime
+
+from . import corpus
+from .harness import count_queries, measure, test_database
+
+DASHBOARD_ENDPOINTS = [
+    "/api/dashboard/stats",
+    "/api/dashboard/sentiment",
+    "/api/dashboard/trends",
+    "/api/dashboard/insights",
+    "/api/dashboard/topic-distribution",
+    "/api/dashboard/top-praises",
+    "/api/dashboard/top-complaints",
+    "/api/dashboard/review-analysis",
+    "/api/dashboard/competitor-comparison",
+]
+LIST_ENDPOINTS = ["/api/business", "/api/reviews", "/api/trends"]
+ANALYZE_BATCH = 500
+
+
+def populate(n, businesses=5, seed=0, batch_size=5000):
+    """Create an owner with `businesses` businesses sharing n synthetic reviews."""
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from myapp.models import Business, Review
+
+    user = get_user_model().objects.create_user(username="bench@example.com", email="bench@example.com", password="x")
+    owned = [
+        Business.objects.create(name=f"Bench {i}", category="Restaurant", location="City", owner=user)
+        for i in range(businesses)
+    ]
+    batch = []
+    for i, review in enumerate(corpus.generate_reviews(n, seed=seed)):
+        batch.append(
+            Review(
+                business=owned[i % businesses],
+                owner=user,
+                reviewer_name=review["author"],
+                rating=review["rating"],
+                text=review["text"],
+                platform=review["platform"],
+                review_date=timezone.make_aware(datetime.datetime.combine(review["date"], datetime.time(12))),
+            )
+        )
+        if len(batch) >= batch_size:
+            Review.objects.bulk_create(batch)
+            batch.clear()
+    Review.objects.bulk_create(batch)
+    return user, owned
+
+
+def api_client(user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def _bench_get(client, url, repeat):
+    def call():
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        return response
+
+    response, queries = count_queries(call)
+    timing = measure(call, repeat=repeat)
+    timing["queries"] = queries
+    timing["bytes"] = len(response.content)
+    return timing
+
+
+def _bench_batch_analyze(client, seed, repeat, batch=ANALYZE_BATCH):
+    """POST /api/reviews/analyze with one full batch of distinct texts; reports texts/sec."""
+    texts = [r["text"] for r in corpus.generate_reviews(batch, seed=seed + 1)]
+
+    def call():
+        response = client.post("/api/reviews/analyze", {"texts": texts}, format="json")
+        assert response.status_code == 200, response.status_code
+        return response
+
+    timing = measure(call, repeat=repeat)
+    timing["items"] = batch
+    timing["items_per_sec"] = batch / timing["median"] if timing["median"] else None
+    return timing
+
+
+def run(sizes, seed=0):
+    results = {}
+    for n in sizes:
+        with test_database():
+            from myapp import peers, trends
+
+            user, _ = populate(n, seed=seed)
+            client = api_client(user)
+            repeat = 5 if n <= 10_000 else 2
+
+            # Cold pipeline run for every business, then the cached path.
+            refresh = measure(lambda: client.get("/api/dashboard/insights?refresh=1"), repeat=1)
+            results[f"api/dashboard/insights?refresh=1/{n}"] = refresh
+            trends.backfill()
+            peers.compute_benchmarks()
+
+            for url in DASHBOARD_ENDPOINTS + LIST_ENDPOINTS:
+                results[f"api{url.removeprefix('/api')}/{n}"] = _bench_get(client, url, repeat)
+
+            results[f"api/reviews/analyze/{n}"] = _bench_batch_analyze(client, seed, repeat)
+            results.update(_bench_serialization(n, repeat))
+    return results
+
+
+def _bench_serialization(n, repeat):
+    """DRF ModelSerializer(many=True) against values-based serialization, rendered to JSON bytes."""
+    from rest_framework.renderers import JSONRenderer
+
+    from myapp import serializers
+    from myapp.models import Business, Review, TrendLog
+
+    renderer = JSONRenderer()
+    cases = {
+        "business": (Business.objects.order_by("-created_at"), serializers.BusinessSerializer),
+        "reviews": (Review.objects.order_by("-review_date"), serializers.ReviewSerializer),
+        "trends": (TrendLog.objects.order_by("-year", "-week", "-created_at"), serializers.TrendLogSerializer),
+    }
+    results = {}
+    for name, (qs, serializer_class) in cases.items():
+        drf = lambda: renderer.render(serializer_class(qs.all(), many=True).data)  # noqa: E731
+        values = lambda: renderer.render(serializers.serialize_values(qs.all(), serializer_class))  # noqa: E731
+        if drf() != values():
+            raise AssertionError(f"values-based serialization of {name} differs from DRF output")
+        rows = qs.count()
+        for mode, fn in (("drf", drf), ("values", values)):
+            timing = measure(fn, repeat=repeat)
+            timing["items"] = rows
+            timing["items_per_sec"] = rows / timing["median"] if timing["median"] else None
+            results[f"serialize/{name}/{mode}/{n}"] = timing
+    return results
@@ -0,0 +1,114 @@
+"""
+Review ingest paths: per-row ORM/API creates, scraper saves, bulk inserts
+(bulk_create and import_reviews' executemany), trend backfill and near-duplicate indexing.
+"""
+
+import datetime
+from unittest import mock
+
+from . import corpus
+from .bench_api import api_client, populate
+from .harness import measure, test_database
+
+# Row-at-a-time paths are sampled; throughput is reported per row.
+PER_ROW_CAP = 2_000
+# Single-review duplicate checks timed once the whole table is indexed.
+DEDUP_SAMPLE = 200
+
+
+def _rate(timing, rows):
+    timing["rows"] = rows
+    timing["rows_per_sec"] = rows / timing["median"] if timing["median"] else None
+    return timing
+
+
+def run(sizes, seed=0):
+    results = {}
+    for n in sizes:
+        with test_database():
+            from django.utils import timezone
+
+            from myapp import dedup, importers, trends
+            from myapp.models import Review
+
+            user, owned = populate(0, businesses=1, seed=seed)
+            business = owned[0]
+            client = api_client(user)
+            reviews = list(corpus.generate_reviews(n, seed=seed))
+            sample = reviews[:PER_ROW_CAP]
+
+            def orm_create():
+                for r in sample:
+                    Review.objects.create(business=business, rating=r["rating"], text=r["text"], platform=r["platform"])
+
+            def api_post():
+                for r in sample:
+                    client.post(
+                        "/api/reviews",
+                        {"business": str(business.id), "rating": r["rating"], "text": r["text"]},
+                        format="json",
+                    )
+
+            scraped = [
+                {"author": r["author"], "rating": r["rating"], "text": r["text"], "date": r["date"]}
+                for r in sample
+            ]
+
+            def scraper_save():
+                with mock.patch("myapp.scraper.scrape_google_reviews", return_value=(scraped, {})):
+                    client.post(
+                        "/api/scraper/run", {"url": "http://bench.local", "business_id": str(business.id)}, format="json"
+                    )
+
+            def bulk_create():
+                Review.objects.bulk_create(
+                    [
+                        Review(
+                            business=business,
+                            owner_id=business.owner_id,
+                            rating=r["rating"],
+                            text=r["text"],
+                            platform=r["platform"],
+                            review_date=timezone.make_aware(datetime.datetime.combine(r["date"], datetime.time(12))),
+                        )
+                        for r in reviews
+                    ],
+                    batch_size=1000,
+                )
+
+            rows = [
+                (
+                    r["author"],
+                    r["rating"],
+                    r["text"],
+                    r["platform"],
+                    timezone.make_aware(datetime.datetime.combine(r["date"], datetime.time(12))),
+                )
+                for r in reviews
+            ]
+
+            def import_insert():
+                for start in range(0, n, importers.BATCH_SIZE):
+                    importers._insert(business, rows[start : start + importers.BATCH_SIZE], timezone.now())
+
+            results[f"ingest/orm_create/{n}"] = _rate(measure(orm_create, repeat=1), len(sample))
+            results[f"ingest/api_post/{n}"] = _rate(measure(api_post, repeat=1), len(sample))
+            results[f"ingest/scraper_save/{n}"] = _rate(measure(scraper_save, repeat=1), len(sample))
+            results[f"ingest/bulk_create/{n}"] = _rate(measure(bulk_create, repeat=1), n)
+            results[f"ingest/import_insert/{n}"] = _rate(measure(import_insert, repeat=1), n)
+            total = Review.objects.count()
+            results[f"ingest/backfill_trends/{n}"] = _rate(measure(trends.backfill, repeat=1), total)
+
+            # Reviews posted above were indexed as they came in; the bulk inserts were not.
+            unsigned = Review.objects.filter(minhash__isnull=True).count()
+            results[f"ingest/dedup_backfill/{n}"] = _rate(measure(dedup.backfill, repeat=1), unsigned)
+
+            def dedup_insert():
+                for r in reviews[:DEDUP_SAMPLE]:
+                    review = Review.objects.create(business=business, rating=r["rating"], text=r["text"])
+                    dedup.index_reviews(business.pk, [review])
+
+            timing = _rate(measure(dedup_insert, repeat=1), min(n, DEDUP_SAMPLE))
+            timing["indexed_rows"] = Review.objects.count()
+            results[f"ingest/dedup_insert/{n}"] = timing
+    return results
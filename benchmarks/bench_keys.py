@@ -0,0 +1,98 @@
+"""
+Primary key generators: uuid4 (random) against ids.uuid7 (time-ordered).
+
+    keys/generate/<gen>/n   generating n keys
+    keys/insert/<gen>/n     bulk-inserting n reviews with those keys into an
+                            empty table; `tail_rows_per_sec` is the rate over
+                            the last tenth, when the key index is largest
+
+Each insert run gets its own test database on the configured backend
+(`vendor` in the results). On SQLite the test database is a file rather
+than Django's default in-memory one, so page cache misses count as they
+would in production.
+"""
+
+import datetime
+import os
+import tempfile
+import time
+import uuid
+
+from . import corpus
+from .bench_api import populate
+from .harness import measure, test_database
+
+GENERATORS = ("uuid4", "uuid7")
+INSERT_BATCH = 5000
+
+
+def _generator(name):
+    from myapp import ids
+
+    return uuid.uuid4 if name == "uuid4" else ids.uuid7
+
+
+def _insert(name, reviews):
+    from django.utils import timezone
+
+    from myapp.models import Review
+
+    new_id = _generator(name)
+    user, owned = populate(0, businesses=1)
+    business = owned[0]
+    rows = [
+        Review(
+            id=new_id(),
+            business=business,
+            owner=user,
+            rating=r["rating"],
+            text=r["text"],
+            platform=r["platform"],
+            review_date=timezone.make_aware(datetime.datetime.combine(r["date"], datetime.time(12))),
+        )
+        for r in reviews
+    ]
+    tail = max(len(rows) - len(rows) // 10, 0)
+    start = time.perf_counter()
+    Review.objects.bulk_create(rows[:tail], batch_size=INSERT_BATCH)
+    middle = time.perf_counter()
+    Review.objects.bulk_create(rows[tail:], batch_size=INSERT_BATCH)
+    end = time.perf_counter()
+    return end - start, len(rows) - tail, end - middle
+
+
+def run(sizes, seed=0):
+    from django.db import connection
+
+    results = {}
+    for n in sizes:
+        for name in GENERATORS:
+            timing = measure(lambda: [_generator(name)() for _ in range(n)], repeat=3)
+            timing["items"] = n
+            timing["items_per_sec"] = n / timing["median"] if timing["median"] else None
+            results[f"keys/generate/{name}/{n}"] = timing
+
+        reviews = list(corpus.generate_reviews(n, seed=seed))
+        for name in GENERATORS:
+            with tempfile.TemporaryDirectory() as tmp:
+                test_settings = connection.settings_dict.setdefault("TEST", {})
+                previous = test_settings.get("NAME")
+                if connection.vendor == "sqlite":
+                    test_settings["NAME"] = os.path.join(tmp, "keys.sqlite3")
+                try:
+                    with test_database():
+                        seconds, tail_rows, tail_seconds = _insert(name, reviews)
+                finally:
+                    test_settings["NAME"] = previous
+            results[f"keys/insert/{name}/{n}"] = {
+                "min": seconds,
+                "median": seconds,
+                "max": seconds,
+                "repeat": 1,
+                "number": 1,
+                "rows": n,
+                "rows_per_sec": n / seconds if seconds else None,
+                "tail_rows_per_sec": tail_rows / tail_seconds if tail_seconds else None,
+                "vendor": connection.vendor,
+            }
+    return results
@@ -0,0 +1,144 @@
+"""
+Peak memory of the AI pipeline's review analysis.
+
+Each variant runs over n generated reviews in a fresh interpreter, since peak
+RSS only ever grows within a process:
+
+    materialized  the previous analyze_reviews: review dicts collected into a
+                  list, parallel texts/ratings/scores lists, then one more
+                  walk of the texts per aggregate
+    streaming     ai_analysis.analyze_reviews fed by a generator, one pass
+    batched       ai_analysis.analyze_batches over records.ReviewBatch chunks
+                  of (text, int rating) rows, as the pipeline reads them
+
+Reported per variant: wall time, peak RSS above the RSS after imports and
+TextBlob warm-up, and a digest of the output so both variants can be checked
+for identical results.
+"""
+
+import hashlib
+import itertools
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from . import corpus
+
+VARIANTS = ("materialized", "streaming", "batched")
+
+
+def materialized_analyze(business_id, review_objects):
+    """The list-based analyze_reviews the pipeline used before the single-pass aggregator."""
+    from myapp import ai_analysis
+
+    texts = []
+    ratings = []
+    for r in review_objects:
+        texts.append(r.get("text"))
+        ratings.append(int(r.get("rating", "0 stars").split()[0]))
+
+    pos = neg = neu = 0
+    sentiment_scores = []
+    for text, rating in zip(texts, ratings):
+        sc = ai_analysis.get_sentiment_score(text)
+        sentiment_scores.append(sc)
+        sentiment = ai_analysis.classify_sentiment(sc, rating)
+        if sentiment == "pos":
+            pos += 1
+        elif sentiment == "neg":
+            neg += 1
+        else:
+            neu += 1
+    avg_sentiment = sum(sentiment_scores) / len(sentiment_scores)
+
+    topic_trends = ai_analysis.extract_topics(texts)
+    ai_result_output = {
+        "business_id": business_id,
+        "sentiment_pos": pos,
+        "sentiment_neg": neg,
+        "sentiment_neu": neu,
+        "top_topics": topic_trends,
+        "aspect_sentiment": ai_analysis.extract_aspect_sentiment(texts),
+        "keywords": ai_analysis.extract_keywords(texts),
+        "top_praises": ai_analysis.extract_praises(texts),
+        "top_complaints": ai_analysis.extract_complaints(texts),
+        "ai_insights": ai_analysis.generate_ai_insights(topic_trends, avg_sentiment),
+    }
+    return {"sentiment_score": round(avg_sentiment, 3), "topic_trends": topic_trends}, ai_result_output
+
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def _batches(n, seed):
+    from myapp.records import BATCH_SIZE, ReviewBatch
+
+    rows = ((r["text"], r["rating"]) for r in corpus.generate_reviews(n, seed=seed))
+    while chunk := list(itertools.islice(rows, BATCH_SIZE)):
+        yield ReviewBatch.from_rows(chunk)
+
+
+def _child(variant, n, seed):
+    from myapp import ai_analysis
+
+    ai_analysis.warm_up()
+    baseline = _peak_rss_bytes()
+    # A generator, so only the materialized variant ever holds the whole corpus.
+    reviews = ({"text": r["text"], "rating": f"{r['rating']} stars"} for r in corpus.generate_reviews(n, seed=seed))
+
+    start = time.perf_counter()
+    if variant == "materialized":
+        trend, result = materialized_analyze("bench", list(reviews))
+    elif variant == "streaming":
+        trend, result = ai_analysis.analyze_reviews("bench", reviews)
+    else:
+        trend, result = ai_analysis.analyze_batches("bench", _batches(n, seed))
+    seconds = time.perf_counter() - start
+
+    output = {"sentiment_score": trend["sentiment_score"], "topic_trends": trend["topic_trends"], **result}
+    digest = hashlib.sha256(json.dumps(output, sort_keys=True).encode()).hexdigest()
+    print(json.dumps({"seconds": seconds, "peak_rss": _peak_rss_bytes() - baseline, "digest": digest}))
+
+
+def run(sizes, seed=0):
+    results = {}
+    for n in sizes:
+        digests = set()
+        for variant in VARIANTS:
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_memory", variant, str(n), str(seed)],
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode:
+                # e.g. the materialized variant divides by zero on an empty corpus
+                error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode
+                print(f"memory/{variant}/{n} failed: {error}", file=sys.stderr)
+                continue
+            child = json.loads(proc.stdout.strip().splitlines()[-1])
+            digests.add(child["digest"])
+            results[f"memory/{variant}/{n}"] = {
+                "min": child["seconds"],
+                "median": child["seconds"],
+                "max": child["seconds"],
+                "repeat": 1,
+                "number": 1,
+                "items": n,
+                "items_per_sec": n / child["seconds"] if child["seconds"] else None,
+                "peak_rss_mb": round(child["peak_rss"] / 2**20, 1),
+            }
+        for variant in VARIANTS:
+            if f"memory/{variant}/{n}" in results:
+                results[f"memory/{variant}/{n}"]["same_output"] = len(digests) == 1
+    return results
+
+
+if __name__ == "__main__":
+    from .harness import setup_django
+
+    setup_django()
+    _child(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))
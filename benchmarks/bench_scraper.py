@@ -0,0 +1,175 @@
+"""
+Scraper review extraction against a local fixture page.
+
+A seeded page mimicking the Google Maps review markup (review blocks,
+truncated texts with "More" buttons, the place metadata rows) is written to a
+temporary directory and opened in headless Firefox. The per-element
+extraction the scraper used to do (four find_element calls per review) is
+timed against `scraper.extract_reviews`, which reads everything with one
+`execute_script`; WebDriver round trips are counted for both.
+
+Needs Firefox and geckodriver; without them the suite reports nothing.
+"""
+
+import html
+import os
+import random
+import sys
+import tempfile
+
+from . import corpus
+from .harness import measure
+
+TRUNCATE_AT = 80
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>fixture</title></head>
+<body>
+<div class="DxyBCb" style="height:400px;overflow:auto">
+{meta}
+{blocks}
+</div>
+<script>
+document.querySelectorAll("button.w8nwRe").forEach((button) => {{
+  button.addEventListener("click", () => {{
+    const span = button.parentElement.querySelector("span.wiI7pd");
+    span.textContent = span.dataset.full;
+    button.setAttribute("aria-expanded", "true");
+  }});
+}});
+</script>
+</body></html>
+"""
+
+BLOCK = """<div class="jftiEf"><div class="jJc9Ad">
+  <div class="d4r55">{author}</div>
+  <span aria-label="{rating} stars"></span>
+  <span class="rsqaWe">{days} days ago</span>
+  <div><span class="wiI7pd" data-full="{full}">{shown}</span>{more}</div>
+</div></div>"""
+
+META_ROW = """<div jslog="126926"><span jslog="127691">{label}:</span><span jslog="127691">{value}</span></div>"""
+
+
+def fixture_page(n, seed=0):
+    """HTML with n review blocks; longer texts are truncated behind a "More" button."""
+    rng = random.Random(seed)
+    blocks = []
+    for r in corpus.generate_reviews(n, seed=seed):
+        text = r["text"]
+        truncated = len(text) > TRUNCATE_AT
+        blocks.append(
+            BLOCK.format(
+                author=html.escape(r["author"]),
+                rating=r["rating"],
+                days=rng.randint(1, 6),
+                full=html.escape(text, quote=True),
+                shown=html.escape(text[:TRUNCATE_AT] + "…" if truncated else text),
+                more='<button class="w8nwRe" aria-expanded="false">More</button>' if truncated else "",
+            )
+        )
+    meta = "\n".join(
+        META_ROW.format(label=label, value=value) for label, value in (("Service", "Dine in"), ("Price", "$$"))
+    )
+    return PAGE.format(meta=meta, blocks="\n".join(blocks))
+
+
+def per_element_extract(driver):
+    """The scraper's previous extraction loop: several WebDriver calls per review block."""
+    from selenium.webdriver.common.by import By
+
+    reviews = []
+    for r in driver.find_elements(By.CLASS_NAME, "jJc9Ad"):
+        row = {}
+        for key, how, what in (
+            ("author", By.CSS_SELECTOR, "div.d4r55"),
+            ("text", By.CSS_SELECTOR, "span.wiI7pd"),
+            ("date_raw", By.CLASS_NAME, "rsqaWe"),
+        ):
+            try:
+                row[key] = r.find_element(how, what).text
+            except Exception:
+                row[key] = None
+        try:
+            row["rating"] = r.find_element(By.CSS_SELECTOR, "span[aria-label*='star']").get_attribute("aria-label")
+        except Exception:
+            row["rating"] = None
+        reviews.append(row)
+
+    review_data = {}
+    for row in driver.find_elements(By.CSS_SELECTOR, "div[jslog='126926']"):
+        spans = row.find_elements(By.CSS_SELECTOR, "[jslog='127691']")
+        if len(spans) >= 2:
+            review_data[spans[0].text.strip().replace(":", "")] = spans[1].text.strip()
+    return reviews, review_data
+
+
+def _count_round_trips(driver, fn):
+    calls = 0
+    execute = driver.execute
+
+    def counting(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return execute(*args, **kwargs)
+
+    driver.execute = counting
+    try:
+        result = fn()
+    finally:
+        del driver.execute
+    return result, calls
+
+
+def _start_firefox():
+    try:
+        from selenium import webdriver
+
+        from myapp import proxies
+
+        return webdriver.Firefox(options=proxies.firefox_options(None))
+    except Exception as e:
+        print(f"Skipping scraper suite, Firefox is unavailable: {e.__class__.__name__}", file=sys.stderr)
+        return None
+
+
+def run(sizes, seed=0):
+    from myapp import scraper
+
+    driver = _start_firefox()
+    if driver is None:
+        return {}
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for n in sizes:
+                path = os.path.join(tmp, f"reviews-{n}.html")
+                with open(path, "w", encoding="utf-8") as fh:
+                    fh.write(fixture_page(n, seed=seed))
+                driver.get(f"file://{path}")
+
+                # Expanding is one-shot, so it is timed on a single (counted) run.
+                outcome = {}
+
+                def expand():
+                    outcome["result"] = _count_round_trips(driver, lambda: scraper.expand_truncated_reviews(driver))
+
+                timing = measure(expand, repeat=1)
+                expanded, trips = outcome["result"]
+                timing.update(items=n, expanded=expanded, round_trips=trips)
+                results[f"scraper/expand_more/{n}"] = timing
+
+                repeat = 3 if n <= 1_000 else 1
+                for name, fn in (
+                    ("per_element", lambda: per_element_extract(driver)),
+                    ("execute_script", lambda: scraper.extract_reviews(driver)),
+                ):
+                    (reviews, _), trips = _count_round_trips(driver, fn)
+                    timing = measure(fn, repeat=repeat)
+                    timing.update(items=len(reviews), round_trips=trips)
+                    timing["items_per_sec"] = len(reviews) / timing["median"] if timing["median"] else None
+                    results[f"scraper/{name}/{n}"] = timing
+    finally:
+        driver.quit()
+    return results
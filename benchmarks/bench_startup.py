@@ -0,0 +1,89 @@
+"""
+Process startup cost, measured with `python -X importtime`.
+
+Each sample is a fresh interpreter that runs `django.setup()` and imports the
+URLconf, i.e. what a worker or `manage.py` command pays before doing any work.
+Run standalone as a CI gate:
+
+    python -m benchmarks.bench_startup --budget-ms 800
+
+It exits non-zero when the median import time exceeds the budget or when one
+of the lazily loaded heavy modules is imported at startup.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from .harness import measure
+
+STARTUP_SCRIPT = "import django; django.setup(); import myproject.urls"
+# Loaded on first use (see myapp/lazy.py); importing any of them at startup is a regression.
+LAZY_MODULES = ("textblob", "nltk", "numpy", "selenium", "swiftshadow")
+DEFAULT_BUDGET_MS = 800
+SAMPLES = 5
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def import_profile():
+    """(total import microseconds, {module: cumulative microseconds}) of one fresh startup."""
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "myproject.settings")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    modules = {}
+    for match in _LINE.finditer(proc.stderr):
+        _, cumulative, indent, name = match.groups()
+        modules[name] = int(cumulative)
+        if len(indent) == 1:  # top-level import: its cumulative time covers all nested ones
+            total += int(cumulative)
+    return total, modules
+
+
+def check(budget_ms=DEFAULT_BUDGET_MS, samples=SAMPLES):
+    """(median ms, eagerly imported lazy modules, problems)."""
+    profiles = [import_profile() for _ in range(samples)]
+    median_ms = statistics.median(total for total, _ in profiles) / 1000
+    eager = sorted({name for _, modules in profiles for name in modules if name.split(".")[0] in LAZY_MODULES})
+    problems = []
+    if median_ms > budget_ms:
+        problems.append(f"startup imports take {median_ms:.1f} ms, budget is {budget_ms} ms")
+    if eager:
+        roots = sorted({name.split(".")[0] for name in eager})
+        problems.append(f"imported at startup but meant to load lazily: {', '.join(roots)}")
+    return median_ms, eager, problems
+
+
+def run(sizes, seed=0):
+    """Suite entry point for benchmarks.run; corpus sizes do not apply here."""
+    timing = measure(lambda: import_profile(), repeat=SAMPLES)
+    _, modules = import_profile()
+    timing["lazy_modules_imported"] = sorted(name for name in modules if name.split(".")[0] in LAZY_MODULES)
+    return {"startup/django_setup_and_urls": timing}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Allowed median import time.")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="Fresh interpreters to sample.")
+    args = parser.parse_args(argv)
+
+    median_ms, _, problems = check(args.budget_ms, args.samples)
+    print(f"startup imports: {median_ms:.1f} ms (budget {args.budget_ms:g} ms)")
+    for problem in problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compare two benchmark result files (e.g. from two commits).
+
+    python -m benchmarks.compare base.json head.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def compare(base, head, threshold):
+    """Yield (key, base_ms, head_ms, change_pct, regressed, query_change) for shared results."""
+    base_results = base["results"]
+    head_results = head["results"]
+    for key in sorted(set(base_results) & set(head_results)):
+        before = base_results[key]["median"]
+        after = head_results[key]["median"]
+        change = ((after - before) / before * 100) if before else 0.0
+        queries = None
+        if "queries" in base_results[key] and "queries" in head_results[key]:
+            queries = head_results[key]["queries"] - base_results[key]["queries"]
+        regressed = change > threshold or bool(queries and queries > 0)
+        yield key, before * 1000, after * 1000, change, regressed, queries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Slowdown in percent counted as a regression.")
+    args = parser.parse_args(argv)
+
+    base, head = _load(args.base), _load(args.head)
+    print(f"base {base['environment'].get('commit')}  head {head['environment'].get('commit')}")
+
+    regressions = 0
+    for key, before, after, change, regressed, queries in compare(base, head, args.threshold):
+        regressions += regressed
+        flag = "REGRESSION" if regressed else ""
+        query_note = f" queries {queries:+d}" if queries else ""
+        print(f"{key:60s} {before:10.2f} -> {after:10.2f} ms ({change:+6.1f}%){query_note} {flag}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
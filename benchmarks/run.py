@@ -0,0 +1,52 @@
+"""
+Benchmark runner.
+
+    python -m benchmarks.run --sizes 1k,10k --suites analysis,api,ingest --out bench.json
+"""
+
+import argparse
+import json
+import sys
+
+from . import bench_analysis, bench_api, bench_ingest, bench_keys, bench_memory, bench_scraper, bench_startup, corpus
+from .harness import setup_django, write_results
+
+SUITES = {
+    "analysis": bench_analysis.run,
+    "api": bench_api.run,
+    "ingest": bench_ingest.run,
+    "keys": bench_keys.run,
+    "memory": bench_memory.run,
+    "scraper": bench_scraper.run,
+    "startup": bench_startup.run,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,10k", help="Comma separated corpus sizes (1k, 10k, 100k, 1m or integers).")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"Comma separated subset of: {', '.join(SUITES)}.")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus generator seed.")
+    parser.add_argument("--out", default="bench.json", help="Where to write the JSON results.")
+    args = parser.parse_args(argv)
+
+    sizes = corpus.parse_sizes(args.sizes)
+    setup_django()
+
+    results = {}
+    for name in args.suites.split(","):
+        name = name.strip()
+        if name not in SUITES:
+            parser.error(f"unknown suite {name!r}")
+        print(f"Running {name} suite for sizes {sizes}...", file=sys.stderr)
+        results.update(SUITES[name](sizes, seed=args.seed))
+
+    write_results(args.out, results)
+    for key, value in sorted(results.items()):
+        extra = {k: v for k, v in value.items() if k in ("queries", "items_per_sec", "rows_per_sec", "peak_rss_mb", "same_output")}
+        print(f"{key:60s} {value['median'] * 1000:10.2f} ms  {json.dumps(extra)}")
+    print(f"Wrote {len(results)} results to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
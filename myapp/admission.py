@@ -0,0 +1,233 @@
+"""
+Admission control for expensive endpoints.
+
+Each scope in `settings.ADMISSION_LIMITS` (e.g. "scraper", "insights_refresh")
+gets:
+
+    tokens_per_minute / burst   a token bucket per owner (OwnerRateThrottle)
+    concurrency                 a cap on requests of the scope running at once
+                                across all owners (slot / limit_concurrency)
+    queue_seconds               how long a request waits for a free slot
+                                before it is turned away
+
+Rejections are DRF `Throttled` errors, i.e. 429 with a Retry-After header.
+`coalesce` lets identical in-flight computations (e.g. two refreshes of the
+same business) share one run.
+
+State lives in process memory, so limits apply per worker process.
+"""
+
+import contextlib
+import functools
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+DEFAULT_LIMITS = {
+    "tokens_per_minute": 6,
+    "burst": 3,
+    "concurrency": 2,
+    "queue_seconds": 5.0,
+}
+
+
+def limits(scope):
+    configured = getattr(settings, "ADMISSION_LIMITS", {}).get(scope, {})
+    return {**DEFAULT_LIMITS, **configured}
+
+
+# --------------------------
+# TOKEN BUCKETS
+# --------------------------
+
+
+class TokenBucket:
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity, rate, now):
+        self.capacity = capacity
+        self.rate = rate  # tokens per second
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now):
+        """Take a token; returns 0 on success, else the seconds until one is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate if self.rate else math.inf
+
+    def full(self, now):
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+_buckets = OrderedDict()  # least recently used first
+_buckets_lock = threading.Lock()
+
+
+def take_token(scope, owner, clock=time.monotonic):
+    """0 when `owner` may proceed in `scope`, else seconds to wait."""
+    config = limits(scope)
+    now = clock()
+    with _buckets_lock:
+        bucket = _buckets.pop((scope, owner), None)
+        if bucket is None:
+            bucket = TokenBucket(config["burst"], config["tokens_per_minute"] / 60, now)
+        _buckets[(scope, owner)] = bucket
+        wait = bucket.take(now)
+        # A bucket that has refilled is no different from a new one: drop idle owners'.
+        while _buckets:
+            key, oldest = next(iter(_buckets.items()))
+            if not oldest.full(now):
+                break
+            del _buckets[key]
+        return wait
+
+
+def reset():
+    with _buckets_lock:
+        _buckets.clear()
+    with _slots_lock:
+        _slots.clear()
+
+
+class OwnerRateThrottle(BaseThrottle):
+    """Token bucket per authenticated owner; set `scope` on subclasses."""
+
+    scope = None
+
+    def applies(self, request):
+        return True
+
+    def allow_request(self, request, view):
+        self._wait = None
+        user = getattr(request, "user", None)
+        if not self.applies(request) or not (user and user.is_authenticated):
+            return True
+        wait = take_token(self.scope, user.pk)
+        if wait:
+            self._wait = wait
+            return False
+        return True
+
+    def wait(self):
+        return math.ceil(self._wait) if self._wait else None
+
+
+class ScraperThrottle(OwnerRateThrottle):
+    scope = "scraper"
+
+
+class InsightsRefreshThrottle(OwnerRateThrottle):
+    scope = "insights_refresh"
+
+    def applies(self, request):
+        return request.query_params.get("refresh") == "1"
+
+
+class ReviewsAnalyzeThrottle(OwnerRateThrottle):
+    scope = "reviews_analyze"
+
+
+# --------------------------
+# CONCURRENCY CAP
+# --------------------------
+
+_slots = {}
+_slots_lock = threading.Lock()
+
+
+def _semaphore(scope):
+    with _slots_lock:
+        semaphore = _slots.get(scope)
+        if semaphore is None:
+            semaphore = _slots[scope] = threading.BoundedSemaphore(limits(scope)["concurrency"])
+        return semaphore
+
+
+@contextlib.contextmanager
+def slot(scope):
+    """
+    Hold one of the scope's `concurrency` slots for the block. When none frees
+    up within `queue_seconds` the request is rejected with 429.
+    """
+    config = limits(scope)
+    semaphore = _semaphore(scope)
+    if not semaphore.acquire(timeout=config["queue_seconds"]):
+        raise Throttled(
+            wait=max(1, math.ceil(config["queue_seconds"])),
+            detail="Too many requests of this kind are running; try again shortly.",
+        )
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+def limit_concurrency(scope):
+    """View decorator running the whole view inside `slot(scope)`."""
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with slot(scope):
+                return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# --------------------------
+# COALESCING
+# --------------------------
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def coalesce(key, fn):
+    """
+    Run fn() once for concurrent callers with the same key: the first caller
+    computes, the rest wait and get its result (or its exception).
+    Returns (result, shared) where shared is True for the waiting callers.
+    """
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _Call()
+
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+    try:
+        call.result = fn()
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        call.done.set()
+    return call.result, False
@@ -1,8 +1,14 @@
+import contextlib
 import json
-from textblob import TextBlob
 from collections import Counter
 import re
 import datetime
+import itertools
+import time
+
+from .lazy import lazy_import
+
+textblob_en = lazy_import("textblob.en")
 
 
 # ---------------------------------------------------
@@ -20,8 +26,14 @@ def clean(text):
 def get_sentiment_score(text):
     if not text:
         return 0
-    blob = TextBlob(text)
-    return blob.sentiment.polarity
+    # TextBlob(text).sentiment.polarity without the blob: the same PatternAnalyzer
+    # lexicon call, minus the per-call namedtuple class TextBlob builds (~45% of the time).
+    return textblob_en.sentiment(text)[0]
+
+
+def warm_up():
+    """Import TextBlob and load its sentiment lexicon before the first real call."""
+    return get_sentiment_score("The food was great but the service was slow.")
 
 
 def classify_sentiment(score, rating):
@@ -64,21 +76,133 @@ TOPIC_KEYWORDS = {
     "ambience": ["ambience", "atmosphere", "environment", "place"]
 }
 
+def count_topics(text, topic_counts):
+    """Add the topic keyword hits of a single text to topic_counts in place."""
+    if not text:
+        return topic_counts
+    c = clean(text)
+    for topic, words in TOPIC_KEYWORDS.items():
+        for w in words:
+            if w in c:
+                topic_counts[topic] += 1
+    return topic_counts
+
+
 def extract_topics(texts):
     topic_counts = {topic: 0 for topic in TOPIC_KEYWORDS}
 
     for t in texts:
-        if not t:
-            continue
-        c = clean(t)
-        for topic, words in TOPIC_KEYWORDS.items():
-            for w in words:
-                if w in c:
-                    topic_counts[topic] += 1
+        count_topics(t, topic_counts)
 
     return topic_counts
 
 
+# ---------------------------------------------------
+# ASPECT SENTIMENT (per topic, sentence level)
+# ---------------------------------------------------
+# Same cut-off classify_sentiment applies to text scores.
+ASPECT_POLARITY_THRESHOLD = 0.2
+
+
+def aspect_mentions(text):
+    """
+    (polarity, [(topics, sentence polarity)]) of a text: its whole-text
+    polarity, equal to get_sentiment_score(text), and the topics named by
+    each of its sentences. The text is tokenized once, with TextBlob's own
+    tokenizer and sentence splitter, and both scores come from those tokens.
+    """
+    if not text:
+        return 0, []
+    sentiment = textblob_en.sentiment
+    sentences = [sentence.lower().split() for sentence in sentiment.tokenizer(text)]
+    score = sentiment([word for words in sentences for word in words])[0]
+    mentions = []
+    for words in sentences:
+        c = clean(" ".join(words))
+        matched = [topic for topic, keywords in TOPIC_KEYWORDS.items() if any(w in c for w in keywords)]
+        if matched:
+            mentions.append((matched, score if len(sentences) == 1 else sentiment(words)[0]))
+    return score, mentions
+
+
+class AspectSentiment:
+    """
+    Per-topic (mentions, positive, negative, polarity sum) over review
+    sentences: every sentence naming a topic's keywords counts as one mention
+    with that sentence's polarity. Totals merge by addition, so chunks,
+    windows and businesses combine without rescanning their texts.
+    """
+
+    __slots__ = ("totals",)
+
+    def __init__(self):
+        self.totals = {topic: [0, 0, 0, 0.0] for topic in TOPIC_KEYWORDS}
+
+    @classmethod
+    def from_result(cls, result):
+        """
+        Resume from a previous result() and its raw polarity_sum; results
+        stored before the sum was kept fall back to mean times mentions.
+        """
+        acc = cls()
+        for topic, values in (result or {}).items():
+            mentions = values.get("mentions") or 0
+            polarity_sum = values.get("polarity_sum")
+            acc.totals[topic] = [
+                mentions,
+                values.get("positive") or 0,
+                values.get("negative") or 0,
+                (values.get("polarity") or 0) * mentions if polarity_sum is None else polarity_sum,
+            ]
+        return acc
+
+    def add(self, text):
+        """Fold in the sentences of one text; returns its get_sentiment_score polarity."""
+        score, mentions = aspect_mentions(text)
+        self.add_mentions(mentions)
+        return score
+
+    def add_mentions(self, mentions):
+        """Fold in the [(topics, polarity)] mentions of an aspect_mentions result."""
+        for topics, polarity in mentions:
+            for topic in topics:
+                totals = self.totals.setdefault(topic, [0, 0, 0, 0.0])
+                totals[0] += 1
+                totals[1] += polarity > ASPECT_POLARITY_THRESHOLD
+                totals[2] += polarity < -ASPECT_POLARITY_THRESHOLD
+                totals[3] += polarity
+
+    def merge(self, other):
+        for topic, values in other.totals.items():
+            totals = self.totals.setdefault(topic, [0, 0, 0, 0.0])
+            for i, value in enumerate(values):
+                totals[i] += value
+        return self
+
+    def result(self):
+        """
+        {topic: {"mentions", "positive", "negative", "polarity", "polarity_sum"}}:
+        polarity is the mean rounded for display, polarity_sum the raw total.
+        """
+        return {
+            topic: {
+                "mentions": mentions,
+                "positive": positive,
+                "negative": negative,
+                "polarity": round(polarity / mentions, 3) if mentions else 0,
+                "polarity_sum": polarity,
+            }
+            for topic, (mentions, positive, negative, polarity) in self.totals.items()
+        }
+
+
+def extract_aspect_sentiment(texts):
+    acc = AspectSentiment()
+    for t in texts:
+        acc.add(t)
+    return acc.result()
+
+
 # ---------------------------------------------------
 # COMPLAINTS & PRAISES
 # ---------------------------------------------------
@@ -105,7 +229,8 @@ def extract_complaints(texts):
 # ---------------------------------------------------
 # AI GENERATED INSIGHTS
 # ---------------------------------------------------
-def generate_ai_insights(topic_trends, avg_sentiment):
+def generate_ai_insights(topic_trends, avg_sentiment, summary=None):
+    # summary: optional [{"text", ...}] sentences, most central first (see myapp/summaries.py)
     insights = []
 
     if avg_sentiment > 0.2:
@@ -120,74 +245,279 @@ def generate_ai_insights(topic_trends, avg_sentiment):
     if topic_trends[top_topic] > 0:
         insights.append(f"The most discussed topic is '{top_topic}'.")
 
+    if summary:
+        insights.append(f"Reviewers most often say: \"{summary[0]['text']}\"")
+
     return " ".join(insights)
 
 
 # ---------------------------------------------------
-# MAIN PIPELINE (Final Output Matching Django Models)
+# TIME WINDOWS (ISO year-week TrendLog buckets)
 # ---------------------------------------------------
-def analyze_reviews(business_id, review_objects):
-    # Extract only text and numeric rating
-    texts = []
-    ratings = []
-
-    for r in review_objects:
-        texts.append(r.get("text"))
-        rating_str = r.get("rating", "0 stars")
-        rating_num = int(rating_str.split()[0])
-        ratings.append(rating_num)
-
-    # SENTIMENT COUNTS
-    pos = neg = neu = 0
-    sentiment_scores = []
-
-    for text, rating in zip(texts, ratings):
-        sc = get_sentiment_score(text)
-        sentiment_scores.append(sc)
-
-        sentiment = classify_sentiment(sc, rating)
-
-        if sentiment == "pos": pos += 1
-        elif sentiment == "neg": neg += 1
-        else: neu += 1
-
-    # AVERAGE SENTIMENT
-    avg_sentiment = sum(sentiment_scores) / len(sentiment_scores)
-
-    # NLP EXTRACTION
-    topic_trends = extract_topics(texts)
-    keywords = extract_keywords(texts)
-    praises = extract_praises(texts)
-    complaints = extract_complaints(texts)
-    insights = generate_ai_insights(topic_trends, avg_sentiment)
-
-    # TREND LOG OUTPUT
-    today = datetime.date.today()
-    week = today.isocalendar().week
-    month = today.month
-
-    trend_log_output = {
-        "business_id": business_id,
-        "week": week,
-        "month": month,
-        "sentiment_score": round(avg_sentiment, 3),
-        "topic_trends": topic_trends
-    }
+def iso_window(date):
+    """Return the (iso_year, iso_week) window a date falls into."""
+    iso = date.isocalendar()
+    return iso[0], iso[1]
+
+
+def window_start(year, week):
+    """First day (Monday) of an ISO year-week window."""
+    return datetime.date.fromisocalendar(year, week, 1)
+
+
+class WindowAccumulator:
+    """
+    Running sentiment/topic totals for one window, so a window can be built
+    from a stream of texts without keeping them in memory.
+    """
+
+    __slots__ = ("review_count", "sentiment_sum", "topic_trends", "aspects")
+
+    def __init__(self):
+        self.review_count = 0
+        self.sentiment_sum = 0.0
+        self.topic_trends = {topic: 0 for topic in TOPIC_KEYWORDS}
+        self.aspects = AspectSentiment()
+
+    @classmethod
+    def from_result(cls, result):
+        """Resume from a previous result() (its unrounded sentiment_sum) so new texts can be folded in."""
+        acc = cls()
+        acc.review_count = result.get("review_count") or 0
+        acc.sentiment_sum = result["sentiment_sum"]
+        for topic, count in (result.get("topic_trends") or {}).items():
+            acc.topic_trends[topic] = acc.topic_trends.get(topic, 0) + count
+        acc.aspects = AspectSentiment.from_result(result.get("aspect_sentiment"))
+        return acc
+
+    def add(self, text, scored=None):
+        """Fold in one text; `scored` is its aspect_mentions(text) when the caller already has it."""
+        self.review_count += 1
+        # Scores the text and its topic sentences from one tokenization.
+        score, mentions = aspect_mentions(text) if scored is None else scored
+        self.sentiment_sum += score
+        self.aspects.add_mentions(mentions)
+        count_topics(text, self.topic_trends)
+
+    def result(self):
+        avg_sentiment = self.sentiment_sum / self.review_count if self.review_count else 0
+        return {
+            "review_count": self.review_count,
+            "sentiment_score": round(avg_sentiment, 3),
+            "sentiment_sum": self.sentiment_sum,
+            "topic_trends": dict(self.topic_trends),
+            "aspect_sentiment": self.aspects.result(),
+        }
+
+
+def analyze_window(texts):
+    """TrendLog values (count, avg sentiment, topic counts, aspect sentiment) for the texts of one window."""
+    acc = WindowAccumulator()
+    for t in texts:
+        acc.add(t)
+    return acc.result()
 
-    # AI RESULT OUTPUT
-    ai_result_output = {
-        "business_id": business_id,
-        "sentiment_pos": pos,
-        "sentiment_neg": neg,
-        "sentiment_neu": neu,
-        "top_topics": topic_trends,
-        "keywords": keywords,
-        "top_praises": praises,
-        "top_complaints": complaints,
-        "ai_insights": insights
+
+# ---------------------------------------------------
+# BATCH SCORING (stateless, one result per text)
+# ---------------------------------------------------
+def score_text(text, rating=None):
+    """Sentiment, class, topics and praise/complaint flags of a single text."""
+    c = clean(text)
+    sc = get_sentiment_score(text)
+    return {
+        "sentiment_score": round(sc, 3),
+        # Without a star rating the middle value lets the text score decide.
+        "sentiment": classify_sentiment(sc, rating if rating is not None else 3),
+        "topics": [topic for topic, words in TOPIC_KEYWORDS.items() if any(w in c for w in words)],
+        "is_praise": bool(c) and any(w in c for w in positive_words),
+        "is_complaint": bool(c) and any(w in c for w in negative_words),
     }
 
-    return trend_log_output, ai_result_output
+
+def analyze_texts(items, budget_seconds=None, clock=time.thread_time):
+    """
+    Score a batch of (text, rating) pairs. Scoring stops once `clock` has
+    advanced by budget_seconds, so the returned list may be a prefix of items.
+    """
+    results = []
+    deadline = clock() + budget_seconds if budget_seconds is not None else None
+    for text, rating in items:
+        if deadline is not None and clock() > deadline:
+            break
+        results.append(score_text(text, rating))
+    return results
+
+
+# ---------------------------------------------------
+# MAIN PIPELINE (Final Output Matching Django Models)
+# ---------------------------------------------------
+@contextlib.contextmanager
+def _untimed_stage(name, items=None):
+    yield {"stage": name, "items": items}
+
+
+class ReviewAggregator:
+    """
+    Every aggregate analyze_reviews reports (sentiment counts and average,
+    topic counts, aspect sentiment, keyword counts, first praises/complaints),
+    updated one review at a time. Memory is bounded by the vocabulary, not the
+    number of reviews, and the result equals the list-based extract_* functions.
+    """
+
+    __slots__ = (
+        "review_count", "pos", "neg", "neu", "sentiment_sum", "topic_counts", "aspects", "words", "praises", "complaints",
+        "phase_seconds",
+    )
+
+    MAX_EXAMPLES = 10
+    # Phases timed into phase_seconds; "sentiment" includes aspect sentiment (one tokenization).
+    PHASES = ("sentiment", "clean", "topics", "keywords", "praises", "complaints")
+    # Reviews run through each phase together, so the clock is read per chunk, not per review.
+    CHUNK = 256
+
+    def __init__(self):
+        self.review_count = 0
+        self.pos = self.neg = self.neu = 0
+        self.sentiment_sum = 0.0
+        self.topic_counts = {topic: 0 for topic in TOPIC_KEYWORDS}
+        self.aspects = AspectSentiment()
+        self.words = Counter()
+        self.praises = []
+        self.complaints = []
+        self.phase_seconds = dict.fromkeys(self.PHASES, 0.0)
+
+    def add(self, text, rating):
+        self._add_chunk(((text, rating),))
+
+    def add_batch(self, batch):
+        """Fold in a records.ReviewBatch, or any iterable of (text, rating) pairs."""
+        items = iter(batch)
+        while chunk := list(itertools.islice(items, self.CHUNK)):
+            self._add_chunk(chunk)
+
+    def _add_chunk(self, chunk):
+        clock = time.perf_counter
+        phases = self.phase_seconds
+        t0 = clock()
+        self.review_count += len(chunk)
+        for text, rating in chunk:
+            # Scores the text and its topic sentences from one tokenization.
+            sc = self.aspects.add(text)
+            self.sentiment_sum += sc
+            sentiment = classify_sentiment(sc, rating)
+            if sentiment == "pos": self.pos += 1
+            elif sentiment == "neg": self.neg += 1
+            else: self.neu += 1
+        t1 = clock()
+        phases["sentiment"] += t1 - t0
+
+        cleaned = [(text, clean(text)) for text, _ in chunk if text]
+        t2 = clock()
+        phases["clean"] += t2 - t1
+        topic_counts = self.topic_counts
+        for _, c in cleaned:
+            for topic, words in TOPIC_KEYWORDS.items():
+                for w in words:
+                    if w in c:
+                        topic_counts[topic] += 1
+        t3 = clock()
+        phases["topics"] += t3 - t2
+        words = self.words
+        for _, c in cleaned:
+            words.update(c.split())
+        t4 = clock()
+        phases["keywords"] += t4 - t3
+        for text, c in cleaned:
+            if len(self.praises) >= self.MAX_EXAMPLES:
+                break
+            if any(w in c for w in positive_words):
+                self.praises.append(text)
+        t5 = clock()
+        phases["praises"] += t5 - t4
+        for text, c in cleaned:
+            if len(self.complaints) >= self.MAX_EXAMPLES:
+                break
+            if any(w in c for w in negative_words):
+                self.complaints.append(text)
+        phases["complaints"] += clock() - t5
+
+    def result(self, business_id):
+        """(trend_log_output, ai_result_output) as returned by analyze_reviews."""
+        # An empty input averages to 0 instead of dividing by zero.
+        avg_sentiment = self.sentiment_sum / self.review_count if self.review_count else 0
+        topic_trends = dict(self.topic_counts)
+        aspect_sentiment = self.aspects.result()
+        today = datetime.date.today()
+
+        trend_log_output = {
+            "business_id": business_id,
+            "week": today.isocalendar().week,
+            "month": today.month,
+            "sentiment_score": round(avg_sentiment, 3),
+            "topic_trends": topic_trends,
+            "aspect_sentiment": aspect_sentiment,
+        }
+        ai_result_output = {
+            "business_id": business_id,
+            "sentiment_pos": self.pos,
+            "sentiment_neg": self.neg,
+            "sentiment_neu": self.neu,
+            "top_topics": topic_trends,
+            "aspect_sentiment": aspect_sentiment,
+            "keywords": [w for w, _ in self.words.most_common(10)],
+            "top_praises": list(self.praises),
+            "top_complaints": list(self.complaints),
+            "ai_insights": generate_ai_insights(topic_trends, avg_sentiment)
+        }
+        return trend_log_output, ai_result_output
+
+
+def parse_star_rating(value):
+    """4 from the scraper's "4 stars" rating strings."""
+    return int(value.split()[0])
+
+
+def analyze_stream(business_id, items, stats=None):
+    """
+    Single-pass analyze_reviews over an iterable of (text, rating) pairs,
+    e.g. a chunked `Review.objects.values_list("text", "rating").iterator()`.
+    Items are consumed once and never held in memory.
+    """
+    return analyze_batches(business_id, (items,), stats=stats)
+
+
+def analyze_batches(business_id, batches, stats=None):
+    """
+    analyze_stream over an iterable of records.ReviewBatch, e.g.
+    `ReviewBatch.from_queryset(reviews)`: integer ratings and texts go
+    straight from the database rows into the aggregator.
+    """
+    # stats: optional collector with a stage(name, items) context manager and
+    # record(name, seconds, items) (see myapp.profiling.PipelineStats) that
+    # receives per-stage timings; "aggregate" is also split into
+    # "aggregate.<phase>" sub-stages from ReviewAggregator.phase_seconds.
+    stage = stats.stage if stats is not None else _untimed_stage
+
+    acc = ReviewAggregator()
+    with stage("aggregate") as timing:
+        for batch in batches:
+            acc.add_batch(batch)
+        timing["items"] = acc.review_count
+    if stats is not None:
+        for phase, seconds in acc.phase_seconds.items():
+            stats.record(f"aggregate.{phase}", seconds, items=acc.review_count)
+    with stage("insights", items=1):
+        return acc.result(business_id)
+
+
+def analyze_reviews(business_id, review_objects, stats=None):
+    """
+    Analyze an iterable of {"text", "rating": "N stars"} dicts (a list or
+    any iterator) in one pass; see analyze_stream.
+    """
+    items = ((r.get("text"), parse_star_rating(r.get("rating", "0 stars"))) for r in review_objects)
+    return analyze_stream(business_id, items, stats=stats)
 
 
 
@@ -10,8 +10,10 @@ urlpatterns = [
     # Business
     path("business", api_views.business_collection, name="api-business-list"),
     path("business/<uuid:pk>", api_views.business_detail, name="api-business-detail"),
+    path("business/purges/<uuid:pk>", api_views.business_purge, name="api-business-purge"),
     # Reviews
     path("reviews", api_views.reviews_collection, name="api-reviews-list"),
+    path("reviews/analyze", api_views.reviews_analyze, name="api-reviews-analyze"),
     path("reviews/<uuid:pk>", api_views.review_detail, name="api-review-detail"),
     # Trends
     path("trends", api_views.trend_collection, name="api-trends-list"),
@@ -27,6 +29,11 @@ urlpatterns = [
     path("dashboard/top-praises", api_views.dashboard_top_praises, name="api-dashboard-praises"),
     path("dashboard/top-complaints", api_views.dashboard_top_complaints, name="api-dashboard-complaints"),
     path("dashboard/review-analysis", api_views.dashboard_review_analysis, name="api-dashboard-review-analysis"),
+    path(
+        "dashboard/competitor-comparison",
+        api_views.dashboard_competitor_comparison,
+        name="api-dashboard-competitor-comparison",
+    ),
     # Scraper
     path("scraper/run", api_views.run_scraper, name="api-scraper-run"),
 ]
@@ -1,57 +1,63 @@
+import functools
 import itertools
 import math
-import re
+import time
+import uuid
 from collections import Counter, defaultdict
 from datetime import datetime
 
+from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
-from django.db.models import Avg, Count, Q
-from django.db.models.functions import ExtractMonth
+from django.db.models import Exists, OuterRef, Q
 from django.utils import timezone
 from rest_framework import permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 
+from . import admission
 from . import ai_analysis
+from . import db
+from . import dedup
+from . import escalations
+from . import ingest
+from . import metrics
+from . import peers
+from . import profiling
+from . import proxies
+from . import purge
 from . import scraper
+from . import snapshot
+from . import summaries
+from . import topics
+from . import trends
 
 from .auth import build_auth_response, generate_access_token
-from .models import AIResult, Business, Review, TrendLog
+from .models import AIResult, Business, BusinessPurge, Review, TrendLog
+from .records import ReviewBatch, parse_rating
 from .serializers import (
     AIResultSerializer,
     BusinessSerializer,
     ReviewSerializer,
     TrendLogSerializer,
+    serialize_values,
 )
 
 User = get_user_model()
 
 
-def _get_primary_business(user):
-    """Return the most recently created business for the user."""
-    return Business.objects.filter(owner=user).order_by("-created_at").first()
+def _review_datetime(date):
+    """Aware midnight of a scraped review's date, falling back to now."""
+    if date:
+        return timezone.make_aware(datetime.combine(date, datetime.min.time()))
+    return timezone.now()
 
 
-def _parse_rating(value):
-    """Extract an integer rating from mixed inputs."""
-    if isinstance(value, int):
-        return value
-    if isinstance(value, float):
-        return int(round(value))
-    if isinstance(value, str):
-        match = re.search(r"\d+", value)
-        if match:
-            try:
-                return int(match.group())
-            except (TypeError, ValueError):
-                return 0
-    return 0
-
-
-def _run_ai_pipeline(business, refresh=False):
+def _run_ai_pipeline(business, refresh=False, profile=False):
     """
     Run ai_analysis on the business reviews and persist TrendLog + AIResult.
     When refresh is False and an AIResult already exists, reuse it.
+    Per-stage timings go to the configured stats hook and are stored on
+    AIResult.pipeline_stats; profile=True also captures a cProfile summary.
     """
     if not business:
         return None, None
@@ -62,39 +68,64 @@ def _run_ai_pipeline(business, refresh=False):
         except AIResult.DoesNotExist:
             pass
 
-    reviews_qs = Review.objects.filter(business=business).order_by("-review_date")
+    reviews_qs = Review.objects.originals().filter(business=business).order_by("-review_date")
     if not reviews_qs.exists():
         return None, None
 
-    review_objects = [
-        {"text": r.text or "", "rating": f"{_parse_rating(r.rating)} stars"} for r in reviews_qs
-    ]
+    stats = profiling.PipelineStats(job=str(business.id))
+    with profiling.profile_job(stats, enabled=profile):
+        # Reviews are streamed from the database as columnar batches straight
+        # into the single-pass aggregator; the "aggregate" stage covers loading too.
+        batches = ReviewBatch.from_queryset(reviews_qs, with_dates=False)
+        trend_log_output, ai_result_output = ai_analysis.analyze_batches(str(business.id), batches, stats=stats)
 
-    trend_log_output, ai_result_output = ai_analysis.analyze_reviews(str(business.id), review_objects)
+        # TrendLogs are keyed by the reviews' own ISO year-week; only windows with
+        # reviews changed since the previous pipeline run are recomputed.
+        try:
+            last_run, previous_summary = business.ai_result.updated_at, business.ai_result.summary
+        except AIResult.DoesNotExist:
+            last_run, previous_summary = None, None
+        with stats.stage("trend_windows") as stage:
+            changed = trends.refresh_stale_windows(business, since=last_run)
+            stage["items"] = len(changed)
+
+        # Extractive summary: only the windows refreshed above are re-ranked.
+        with stats.stage("summary", items=len(changed)):
+            summary = summaries.refresh(business, previous_summary, changed=changed if previous_summary else None)
+
+        # Topics discovered by the business's online topic model are stored next
+        # to the fixed TOPIC_KEYWORDS counts (which peer benchmarks compare) and
+        # lead the insights once the model has seen enough reviews.
+        with stats.stage("topic_model", items=1):
+            discovered = topics.catch_up(business)
+        ai_result_output["ai_insights"] = ai_analysis.generate_ai_insights(
+            discovered or ai_result_output["top_topics"],
+            trend_log_output["sentiment_score"],
+            summary=summary["sentences"] if summary else None,
+        )
 
-    TrendLog.objects.update_or_create(
-        business=business,
-        week=trend_log_output.get("week"),
-        month=trend_log_output.get("month"),
-        defaults={
-            "sentiment_score": trend_log_output.get("sentiment_score"),
-            "topic_trends": trend_log_output.get("topic_trends"),
-        },
-    )
+        with stats.stage("persist_ai_result", items=1):
+            ai_result, _ = AIResult.objects.update_or_create(
+                business=business,
+                defaults={
+                    "sentiment_pos": ai_result_output.get("sentiment_pos"),
+                    "sentiment_neg": ai_result_output.get("sentiment_neg"),
+                    "sentiment_neu": ai_result_output.get("sentiment_neu"),
+                    "top_topics": ai_result_output.get("top_topics"),
+                    "discovered_topics": discovered,
+                    "aspect_sentiment": ai_result_output.get("aspect_sentiment"),
+                    "keywords": ai_result_output.get("keywords"),
+                    "top_complaints": ai_result_output.get("top_complaints"),
+                    "top_praises": ai_result_output.get("top_praises"),
+                    "ai_insights": ai_result_output.get("ai_insights"),
+                    "summary": summary,
+                },
+            )
 
-    ai_result, _ = AIResult.objects.update_or_create(
-        business=business,
-        defaults={
-            "sentiment_pos": ai_result_output.get("sentiment_pos"),
-            "sentiment_neg": ai_result_output.get("sentiment_neg"),
-            "sentiment_neu": ai_result_output.get("sentiment_neu"),
-            "top_topics": ai_result_output.get("top_topics"),
-            "keywords": ai_result_output.get("keywords"),
-            "top_complaints": ai_result_output.get("top_complaints"),
-            "top_praises": ai_result_output.get("top_praises"),
-            "ai_insights": ai_result_output.get("ai_insights"),
-        },
-    )
+    # Stored after emit so the stats include the persist stage and the run total;
+    # the AIResult row exists by now, so this is a single-column UPDATE by pk.
+    ai_result.pipeline_stats = profiling.emit(stats).as_dict()
+    AIResult.objects.filter(pk=ai_result.pk).update(pipeline_stats=ai_result.pipeline_stats)
 
     return trend_log_output, ai_result
 
@@ -146,11 +177,11 @@ def refresh_token(request):
 
 
 @api_view(["GET", "POST"])
+@db.read_replica
 def business_collection(request):
     if request.method == "GET":
-        businesses = Business.objects.filter(Q(owner=request.user) | Q(owner__isnull=True)).order_by("-created_at")
-        serializer = BusinessSerializer(businesses, many=True)
-        return Response(serializer.data)
+        businesses = Business.objects.for_owner(request.user, include_shared=True).order_by("-created_at")
+        return Response(serialize_values(businesses, BusinessSerializer))
 
     serializer = BusinessSerializer(data=request.data)
     if serializer.is_valid():
@@ -160,9 +191,11 @@ def business_collection(request):
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@db.read_replica
 def business_detail(request, pk):
+    """Shared (ownerless) businesses can be read by anyone but changed by no one."""
     try:
-        business = Business.objects.get(pk=pk)
+        business = Business.objects.for_owner(request.user, include_shared=request.method == "GET").get(pk=pk)
     except Business.DoesNotExist:
         return Response({"detail": "Business not found."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -176,8 +209,19 @@ def business_detail(request, pk):
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    business.delete()
-    return Response({"deleted": True})
+    # Soft delete: the business disappears now, its rows are purged in the background.
+    job = purge.soft_delete(business, owner=request.user)
+    return Response({"deleted": True, "purge": purge.progress(job)})
+
+
+@api_view(["GET"])
+def business_purge(request, pk):
+    """Progress of a business deletion started by DELETE /business/<id>."""
+    try:
+        job = BusinessPurge.objects.get(pk=pk, owner=request.user)
+    except BusinessPurge.DoesNotExist:
+        return Response({"detail": "Purge not found."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(purge.progress(job))
 
 
 # --------------------------
@@ -186,13 +230,14 @@ def business_detail(request, pk):
 
 
 @api_view(["GET", "POST"])
+@db.read_replica
 def reviews_collection(request):
     if request.method == "GET":
         business_id = request.query_params.get("business_id")
         search_term = request.query_params.get("search")
         sentiment = request.query_params.get("sentiment")
 
-        qs = Review.objects.all().order_by("-review_date")
+        qs = Review.objects.for_owner(request.user, include_shared=True).order_by("-review_date")
         if business_id:
             qs = qs.filter(business_id=business_id)
         if search_term:
@@ -205,12 +250,28 @@ def reviews_collection(request):
             elif sentiment == "neutral":
                 qs = qs.filter(rating=3)
         total = qs.count()
-        serializer = ReviewSerializer(qs, many=True)
-        return Response({"reviews": serializer.data, "total": total})
+        if "limit" not in request.query_params:
+            return Response({"reviews": serialize_values(qs, ReviewSerializer), "total": total})
+
+        # Keyset pages over the time-ordered UUIDv7 keys, newest first: pass the
+        # returned `next` as ?before= for the following page. No OFFSET scans.
+        try:
+            limit = min(max(int(request.query_params["limit"]), 1), getattr(settings, "REVIEWS_PAGE_MAX_SIZE", 500))
+            before = request.query_params.get("before")
+            if before:
+                qs = qs.filter(pk__lt=uuid.UUID(before))
+        except ValueError:
+            return Response({"detail": "Invalid limit or cursor."}, status=status.HTTP_400_BAD_REQUEST)
+        page = serialize_values(qs.order_by("-pk")[: limit + 1], ReviewSerializer)
+        next_cursor = page[limit - 1]["id"] if len(page) > limit else None
+        return Response({"reviews": page[:limit], "total": total, "next": next_cursor})
 
     serializer = ReviewSerializer(data=request.data)
     if serializer.is_valid():
+        if serializer.validated_data["business"].owner_id != request.user.pk:
+            return Response({"detail": "Business not found."}, status=status.HTTP_404_NOT_FOUND)
         review = serializer.save()
+        ingest.reviews_added(review.business, [review])
         return Response(ReviewSerializer(review).data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -218,29 +279,125 @@ def reviews_collection(request):
 @api_view(["DELETE"])
 def review_detail(request, pk):
     try:
-        review = Review.objects.get(pk=pk)
+        review = Review.objects.for_owner(request.user).get(pk=pk)
     except Review.DoesNotExist:
         return Response({"detail": "Review not found."}, status=status.HTTP_404_NOT_FOUND)
+    # A deleted original hands its place to its oldest duplicate, whose window now counts it.
+    promoted = dedup.promote_duplicates(review)
     review.delete()
+    changed_dates = [review.review_date] + ([promoted.review_date] if promoted else [])
+    ingest.reviews_removed(review.business, changed_dates)
     return Response({"deleted": True})
 
 
+@api_view(["POST"])
+@throttle_classes([admission.ReviewsAnalyzeThrottle])
+@admission.limit_concurrency("reviews_analyze")
+def reviews_analyze(request):
+    """
+    Score ad-hoc texts without saving them. Accepts `texts` (strings),
+    `items` ({"text", "rating"}) or `reviewIds` of the caller's reviews.
+    Identical inputs are scored once; the batch is capped by
+    REVIEWS_ANALYZE_MAX_TEXTS / REVIEWS_ANALYZE_MAX_CHARS and scoring stops
+    after REVIEWS_ANALYZE_CPU_SECONDS, leaving the remaining results null.
+    """
+    max_texts = getattr(settings, "REVIEWS_ANALYZE_MAX_TEXTS", 500)
+    max_chars = getattr(settings, "REVIEWS_ANALYZE_MAX_CHARS", 200_000)
+    cpu_budget = getattr(settings, "REVIEWS_ANALYZE_CPU_SECONDS", 2.0)
+
+    review_ids = request.data.get("reviewIds")
+    if review_ids is not None:
+        if not isinstance(review_ids, list) or len(review_ids) > max_texts:
+            return Response(
+                {"detail": f"'reviewIds' must be a list of at most {max_texts} ids."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            review_ids = [uuid.UUID(str(pk)) for pk in review_ids]
+        except ValueError:
+            return Response({"detail": "Invalid review id."}, status=status.HTTP_400_BAD_REQUEST)
+        owned = Review.objects.for_owner(request.user).filter(pk__in=review_ids)
+        rows = {pk: (text or "", rating) for pk, text, rating in owned.values_list("pk", "text", "rating")}
+        ids = [pk for pk in review_ids if pk in rows]
+        items = [rows[pk] for pk in ids]
+    else:
+        ids = None
+        raw = request.data.get("items")
+        if raw is None:
+            raw = request.data.get("texts")
+        if not isinstance(raw, list) or not raw:
+            return Response(
+                {"detail": "Provide a non-empty 'texts' or 'items' list, or 'reviewIds'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        items = []
+        for entry in raw:
+            if isinstance(entry, str):
+                entry = {"text": entry}
+            if not isinstance(entry, dict) or not isinstance(entry.get("text", ""), str):
+                return Response({"detail": "Each item needs a string 'text'."}, status=status.HTTP_400_BAD_REQUEST)
+            # A rating without a number in it ("great!") counts as missing, not as 0 stars.
+            items.append((entry.get("text") or "", parse_rating(entry.get("rating"), default=None)))
+
+    if len(items) > max_texts:
+        return Response(
+            {"detail": f"At most {max_texts} texts per request."}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    if sum(len(text) for text, _ in items) > max_chars:
+        return Response(
+            {"detail": f"At most {max_chars} characters per request."},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    # Deduplicate: each distinct (text, rating) is scored once.
+    unique = list(dict.fromkeys(items))
+    started = time.perf_counter()
+    scored = ai_analysis.analyze_texts(unique, budget_seconds=cpu_budget)
+    elapsed = time.perf_counter() - started
+    by_item = dict(zip(unique, scored))
+
+    results = []
+    for index, item in enumerate(items):
+        result = by_item.get(item)
+        entry = {"index": index, **result} if result else {"index": index, "error": "cpu_budget_exceeded"}
+        if ids is not None:
+            entry["review_id"] = str(ids[index])
+        results.append(entry)
+
+    return Response(
+        {
+            "results": results,
+            "meta": {
+                "count": len(items),
+                "unique": len(unique),
+                "scored": len(scored),
+                "complete": len(scored) == len(unique),
+                "seconds": round(elapsed, 4),
+                "texts_per_sec": round(len(scored) / elapsed, 1) if elapsed else None,
+            },
+        }
+    )
+
+
 # --------------------------
 # TREND LOGS
 # --------------------------
 
 
 @api_view(["GET", "POST"])
+@db.read_replica
 def trend_collection(request):
     if request.method == "GET":
         business_id = request.query_params.get("business_id")
-        qs = TrendLog.objects.all().order_by("-created_at")
+        qs = TrendLog.objects.for_owner(request.user, include_shared=True).order_by("-year", "-week", "-created_at")
         if business_id:
             qs = qs.filter(business_id=business_id)
-        return Response(TrendLogSerializer(qs, many=True).data)
+        return Response(serialize_values(qs, TrendLogSerializer))
 
     serializer = TrendLogSerializer(data=request.data)
     if serializer.is_valid():
+        if serializer.validated_data["business"].owner_id != request.user.pk:
+            return Response({"detail": "Business not found."}, status=status.HTTP_404_NOT_FOUND)
         log = serializer.save()
         return Response(TrendLogSerializer(log).data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -249,7 +406,7 @@ def trend_collection(request):
 @api_view(["DELETE"])
 def trend_detail(request, pk):
     try:
-        log = TrendLog.objects.get(pk=pk)
+        log = TrendLog.objects.for_owner(request.user).get(pk=pk)
     except TrendLog.DoesNotExist:
         return Response({"detail": "Trend log not found."}, status=status.HTTP_404_NOT_FOUND)
     log.delete()
@@ -262,9 +419,10 @@ def trend_detail(request, pk):
 
 
 @api_view(["GET", "POST"])
+@db.read_replica
 def ai_results(request, business_id):
     try:
-        business = Business.objects.get(pk=business_id)
+        business = Business.objects.for_owner(request.user, include_shared=request.method == "GET").get(pk=business_id)
     except Business.DoesNotExist:
         return Response({"detail": "Business not found."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -291,67 +449,183 @@ def _aggregate_keywords(reviews):
     return Counter(words).most_common(5)
 
 
+def _narrow_to_selection(request, qs, field):
+    business_id = request.query_params.get("business_id")
+    if business_id and business_id != "all" and request.query_params.get("all") != "1":
+        try:
+            return qs.filter(**{field: uuid.UUID(business_id)})
+        except ValueError:
+            return qs.none()
+    return qs
+
+
+def _dashboard_businesses(request):
+    """
+    Businesses a dashboard request covers: `?business_id=<id>` narrows to one
+    of the owner's businesses, otherwise (or with `?all=1` /
+    `?business_id=all`) every business the owner has.
+    """
+    return _narrow_to_selection(request, Business.objects.for_owner(request.user), "pk")
+
+
+def _dashboard_reviews(request):
+    """The selection's reviews by Review.owner, so the query needs no join to Business."""
+    return _narrow_to_selection(request, Review.objects.for_owner(request.user).originals(), "business_id")
+
+
+def _merge_ai_results(pairs):
+    """
+    Combine per-business AIResults into one unsaved AIResult: sentiment and
+    topic counts (fixed and discovered kept apart) and aspect sentiment are summed, keywords re-ranked,
+    praises/complaints and summary sentences interleaved.
+    """
+    if len(pairs) == 1:
+        return pairs[0][1]
+
+    topics = Counter()
+    discovered = Counter()
+    aspects = ai_analysis.AspectSentiment()
+    keyword_scores = Counter()
+    for _, result in pairs:
+        topics.update(result.top_topics or {})
+        discovered.update(result.discovered_topics or {})
+        aspects.merge(ai_analysis.AspectSentiment.from_result(result.aspect_sentiment))
+        keywords = result.keywords or []
+        for rank, word in enumerate(keywords):
+            keyword_scores[word] += len(keywords) - rank
+
+    def interleave(columns, limit=10):
+        merged = [item for row in itertools.zip_longest(*columns) for item in row if item]
+        return merged[:limit]
+
+    def column(field):
+        return [getattr(result, field) or [] for _, result in pairs]
+
+    return AIResult(
+        sentiment_pos=sum(result.sentiment_pos or 0 for _, result in pairs),
+        sentiment_neg=sum(result.sentiment_neg or 0 for _, result in pairs),
+        sentiment_neu=sum(result.sentiment_neu or 0 for _, result in pairs),
+        top_topics=dict(topics),
+        discovered_topics=dict(discovered) or None,
+        aspect_sentiment=aspects.result(),
+        keywords=[word for word, _ in keyword_scores.most_common(10)],
+        top_praises=interleave(column("top_praises")),
+        top_complaints=interleave(column("top_complaints")),
+        summary={
+            "sentences": interleave(
+                [(result.summary or {}).get("sentences") or [] for _, result in pairs],
+                limit=summaries.summary_sentences(),
+            )
+        },
+        ai_insights=" ".join(
+            f"{business.name}: {result.ai_insights}" for business, result in pairs if result.ai_insights
+        ),
+    )
+
+
+def _admitted_ai_pipeline(business, refresh=False, profile=False):
+    # The pipeline reads the reviews it persists results for: keep it off the replica.
+    with db.use_primary():
+        if not refresh:
+            return _run_ai_pipeline(business, profile=profile)
+        with admission.slot("insights_refresh"):
+            return _run_ai_pipeline(business, refresh=True, profile=profile)
+
+
+def _dashboard_ai_result(request, refresh=False):
+    """
+    (has_business, merged AIResult or None) for the dashboard selection.
+    AIResults come in with the businesses via select_related, so the pipeline
+    only runs for businesses that have none yet (or on refresh) and the query
+    count does not grow with the number of businesses. Concurrent runs for the
+    same business are coalesced and refreshes hold an admission slot.
+    """
+    profile = profiling.profiling_enabled(request)
+    businesses = list(
+        _dashboard_businesses(request)
+        .select_related("ai_result")
+        .annotate(has_reviews=Exists(Review.objects.filter(business=OuterRef("pk"))))
+        .order_by("-created_at")
+    )
+    pairs = []
+    computed = False
+    for business in businesses:
+        if not business.has_reviews:
+            continue
+        (trend_log_output, ai_result), _ = admission.coalesce(
+            ("ai_pipeline", business.pk, refresh),
+            functools.partial(_admitted_ai_pipeline, business, refresh=refresh, profile=profile),
+        )
+        computed = computed or trend_log_output is not None
+        if ai_result:
+            pairs.append((business, ai_result))
+    metrics.mark_cache(request, hit=not computed)
+    return bool(businesses), (_merge_ai_results(pairs) if pairs else None)
+
+
+def _dashboard_columns(request):
+    """Columnar review data (see myapp/snapshot.py) across the dashboard selection."""
+    business_ids = list(_dashboard_businesses(request).values_list("pk", flat=True))
+    return snapshot.combine(snapshot.for_businesses(business_ids))
+
+
 @api_view(["GET"])
+@db.read_replica
 def dashboard_stats(request):
-    qs = Review.objects.filter(business__owner=request.user)
-    positive = qs.filter(rating__gte=4).count()
-    negative = qs.filter(rating__lte=2).count()
-    neutral = qs.filter(rating=3).count()
-    total = qs.count()
-    avg_rating = qs.aggregate(avg=Avg("rating"))["avg"] or 0
-    detractors = qs.filter(rating__lte=6).count()
-    promoters = qs.filter(rating__gte=9).count()
-    nps = round(((promoters - detractors) / total) * 100, 2) if total else 0
+    business_ids = list(_dashboard_businesses(request).values_list("pk", flat=True))
+    columns, _ = snapshot.combine(snapshot.for_businesses(business_ids))
+    counts = snapshot.stats(columns)
+    total = counts["total"]
+    negative = counts["negative"]
+    avg_rating = counts["avg_rating"] or 0
+    nps = round(((counts["promoters"] - counts["detractors"]) / total) * 100, 2) if total else 0
 
     data = {
-        "positiveMentions": positive,
+        "positiveMentions": counts["positive"],
         "negativeMentions": negative,
-        "neutralMentions": neutral,
+        "neutralMentions": counts["neutral"],
         "reviewsCount": total,
         "avgRating": round(avg_rating, 2),
         "nps": nps,
         "avgResponseTime": "N/A",
-        "escalations": max(0, negative // 2),
+        "escalations": escalations.recent_count(business_ids),
     }
     return Response(data)
 
 
 @api_view(["GET"])
+@db.read_replica
 def dashboard_sentiment(request):
-    qs = Review.objects.filter(business__owner=request.user)
-    data = {
-        "positive": qs.filter(rating__gte=4).count(),
-        "negative": qs.filter(rating__lte=2).count(),
-        "neutral": qs.filter(rating=3).count(),
-        "total": qs.count(),
-    }
+    columns, _ = _dashboard_columns(request)
+    counts = snapshot.stats(columns)
+    data = {key: counts[key] for key in ("positive", "negative", "neutral", "total")}
     return Response(data)
 
 
 @api_view(["GET"])
+@db.read_replica
 def dashboard_trends(request):
-    qs = Review.objects.filter(business__owner=request.user)
-    grouped = qs.annotate(month=ExtractMonth("review_date")).values("month").annotate(
-        avg_rating=Avg("rating"), count=Count("id")
-    ).order_by("month")
-    data = [
-        {
-            "month": item["month"],
-            "avg_rating": round(item["avg_rating"] or 0, 2),
-            "count": item["count"],
-        }
-        for item in grouped
-    ]
-    return Response(data)
+    """
+    Rating trend of the selection. Without `?group` reviews are grouped by
+    calendar month number; `?group=day|week|month` with an optional
+    `?period=30d|12w|6m|1y|all` lookback returns a dated series instead.
+    """
+    columns, _ = _dashboard_columns(request)
+    group = request.query_params.get("group")
+    if group not in ("day", "week", "month"):
+        return Response(snapshot.month_of_year_trends(columns))
+    since_day = snapshot.since_day_for(request.query_params.get("period"))
+    return Response(snapshot.trends(columns, group=group, since_day=since_day))
 
 
 @api_view(["GET"])
+@throttle_classes([admission.InsightsRefreshThrottle])
+@db.read_replica
 def dashboard_insights(request):
-    business = _get_primary_business(request.user)
     refresh = request.query_params.get("refresh") == "1"
-    _, ai_result = _run_ai_pipeline(business, refresh=refresh)
+    has_business, ai_result = _dashboard_ai_result(request, refresh=refresh)
 
-    if not business:
+    if not has_business:
         return Response([{"title": "Add a business", "description": "Create a business to generate AI insights."}])
 
     if not ai_result:
@@ -359,10 +633,16 @@ def dashboard_insights(request):
             [{"title": "Add reviews", "description": "Add or import reviews to unlock AI-generated insights."}]
         )
 
-    top_topics = ai_result.top_topics or {}
+    top_topics = ai_result.discovered_topics or ai_result.top_topics or {}
     keywords = ai_result.keywords or []
     praises = ai_result.top_praises or []
     complaints = ai_result.top_complaints or []
+    summary = (ai_result.summary or {}).get("sentences") or []
+    aspects = sorted(
+        ((topic, values) for topic, values in (ai_result.aspect_sentiment or {}).items() if values["mentions"]),
+        key=lambda item: item[1]["mentions"],
+        reverse=True,
+    )
 
     insights = [
         {
@@ -379,6 +659,17 @@ def dashboard_insights(request):
     if keywords:
         insights.append({"title": "Keywords", "description": ", ".join(keywords[:5])})
 
+    if aspects:
+        formatted_aspects = "; ".join(
+            f"{topic}: {values['positive'] * 100 // values['mentions']}% positive, "
+            f"{values['negative'] * 100 // values['mentions']}% negative"
+            for topic, values in aspects[:3]
+        )
+        insights.append({"title": "Topic Sentiment", "description": formatted_aspects})
+
+    if summary:
+        insights.append({"title": "What Reviewers Say", "description": " ".join(s["text"] for s in summary)})
+
     if praises:
         insights.append({"title": "Praises", "description": "; ".join(praises[:3])})
 
@@ -389,54 +680,64 @@ def dashboard_insights(request):
 
 
 @api_view(["GET"])
+@db.read_replica
 def dashboard_topics(request):
-    business = _get_primary_business(request.user)
-    _, ai_result = _run_ai_pipeline(business)
+    _, ai_result = _dashboard_ai_result(request)
 
-    if ai_result and ai_result.top_topics:
-        data = [{"label": label, "value": value} for label, value in ai_result.top_topics.items()]
+    top_topics = ai_result and (ai_result.discovered_topics or ai_result.top_topics)
+    if top_topics:
+        data = [{"label": label, "value": value} for label, value in top_topics.items()]
         return Response({"items": data})
 
-    qs = Review.objects.filter(business__owner=request.user)
+    qs = _dashboard_reviews(request).only("text")
     keywords = _aggregate_keywords(qs)
     data = [{"label": word, "value": count} for word, count in keywords]
     return Response({"items": data})
 
 
 @api_view(["GET"])
+@db.read_replica
 def dashboard_top_praises(request):
-    business = _get_primary_business(request.user)
-    _, ai_result = _run_ai_pipeline(business)
+    _, ai_result = _dashboard_ai_result(request)
 
     if ai_result and ai_result.top_praises:
         return Response({"items": ai_result.top_praises})
 
-    qs = Review.objects.filter(business__owner=request.user, rating__gte=4)
+    qs = _dashboard_reviews(request).filter(rating__gte=4).only("text")
     keywords = _aggregate_keywords(qs)
     items = [word for word, _ in keywords]
     return Response({"items": items})
 
 
 @api_view(["GET"])
+@db.read_replica
 def dashboard_top_complaints(request):
-    business = _get_primary_business(request.user)
-    _, ai_result = _run_ai_pipeline(business)
+    _, ai_result = _dashboard_ai_result(request)
 
     if ai_result and ai_result.top_complaints:
         return Response({"items": ai_result.top_complaints})
 
-    qs = Review.objects.filter(business__owner=request.user, rating__lte=2)
+    qs = _dashboard_reviews(request).filter(rating__lte=2).only("text")
     keywords = _aggregate_keywords(qs)
     items = [word for word, _ in keywords]
     return Response({"items": items})
 
 
 @api_view(["GET"])
+@db.read_replica
 def dashboard_review_analysis(request):
-    qs = Review.objects.filter(business__owner=request.user)
-    by_platform = qs.values("platform").annotate(count=Count("id")).order_by("-count")
-    data = [{"platform": item["platform"] or "Unknown", "count": item["count"]} for item in by_platform]
-    return Response({"platforms": data, "total": qs.count()})
+    columns, platforms = _dashboard_columns(request)
+    data = [{"platform": name, "count": count} for name, count in snapshot.platform_split(columns, platforms)]
+    return Response({"platforms": data, "total": sum(item["count"] for item in data)})
+
+
+@api_view(["GET"])
+@db.read_replica
+def dashboard_competitor_comparison(request):
+    business = _dashboard_businesses(request).order_by("-created_at").first()
+    if not business:
+        return Response({"business": None, "peer_group": None, "metrics": []})
+    return Response(peers.compare(business))
 
 
 # --------------------------
@@ -446,6 +747,8 @@ def dashboard_review_analysis(request):
 
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
+@throttle_classes([admission.ScraperThrottle])
+@admission.limit_concurrency("scraper")
 def run_scraper(request):
     url = request.data.get("url")
     business_id = request.data.get("business_id")
@@ -455,7 +758,12 @@ def run_scraper(request):
         return Response({"detail": "A 'url' is required to scrape reviews."}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        reviews, review_meta = scraper.scrape_google_reviews(url, max_scrolls=max_scrolls)
+        reviews, review_meta = scraper.scrape_google_reviews(
+            url,
+            max_scrolls=max_scrolls,
+            pool=proxies.get_pool(),
+            proxy_attempts=getattr(settings, "SCRAPER_PROXY_ATTEMPTS", 3),
+        )
     except Exception as exc:  # pragma: no cover - defensive: selenium may not be installed in test env
         return Response({"detail": f"Scrape failed: {exc}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -467,31 +775,37 @@ def run_scraper(request):
             business = None
 
     saved_count = 0
+    saved_reviews = []
     normalized_reviews = []
+    batch = scraper.normalize_reviews(reviews)
+    platform = review_meta.get("Platform") or "Google Maps"
+    today = timezone.now().date()
 
-    for rev in reviews:
-        rating_value = _parse_rating(rev.get("rating"))
+    for rev, author, text, rating_value, date in zip(reviews, batch.authors, batch.texts, batch.ratings, batch.dates):
         normalized_reviews.append(
             {
-                "date": str(rev.get("date") or rev.get("date_raw") or timezone.now().date()),
-                "source": review_meta.get("Platform") or "Google Maps",
+                "date": str(date or rev.get("date_raw") or today),
+                "source": platform,
                 "rating": rating_value,
-                "text": rev.get("text") or "",
+                "text": text,
                 "sentiment": "positive" if rating_value >= 4 else "negative" if rating_value <= 2 else "neutral",
                 "topics": [],
             }
         )
 
         if business:
-            Review.objects.create(
+            review = Review.objects.create(
                 business=business,
-                reviewer_name=rev.get("author") or "",
-                rating=rating_value or 0,
-                text=rev.get("text") or "",
-                platform=review_meta.get("Platform") or "Google Maps",
-                review_date=timezone.now(),
+                reviewer_name=author,
+                rating=rating_value,
+                text=text,
+                platform=platform,
+                review_date=_review_datetime(date),
             )
+            saved_reviews.append(review)
             saved_count += 1
 
+    ingest.reviews_added(business, saved_reviews)
+
     return Response({"reviews": normalized_reviews, "meta": review_meta, "saved": saved_count})
 
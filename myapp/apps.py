@@ -1,7 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class MyappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myapp'
 
+    def ready(self):
+        from .db import configure_sqlite
+
+        connection_created.connect(configure_sqlite, dispatch_uid="myapp.configure_sqlite")
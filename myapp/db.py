@@ -0,0 +1,108 @@
+"""
+Database routing, read-your-writes pinning and SQLite tuning.
+
+Views decorated with `read_replica` run their GET/HEAD queries against
+`settings.DATABASE_REPLICA_ALIAS` when that alias is configured in DATABASES;
+everything else, and all writes, go to the primary ("default").
+
+A replica may lag behind, so after a successful write request
+`ReplicaPinMiddleware` sets a short-lived cookie and requests carrying it
+read from the primary until it expires: a client always sees its own
+writes. `use_primary()` forces primary reads for code that must see the
+latest rows, such as the AI pipeline before it persists results.
+"""
+
+import contextlib
+import contextvars
+import functools
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_read_alias = contextvars.ContextVar("db_read_alias", default=None)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_COOKIE = "db_pin"
+DEFAULT_SQLITE_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "busy_timeout=5000",
+    "temp_store=MEMORY",
+    "cache_size=-20000",
+)
+
+
+def replica_alias():
+    """The configured replica alias, or None when DATABASES has no such entry."""
+    alias = getattr(settings, "DATABASE_REPLICA_ALIAS", "replica")
+    return alias if alias and alias in settings.DATABASES else None
+
+
+class ReplicaRouter:
+    """Reads go wherever the current request context says; writes always to the primary."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # the replica holds the same data as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
+
+
+@contextlib.contextmanager
+def use_alias(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def use_primary():
+    """Read from the primary inside the block, even within a `read_replica` view."""
+    return use_alias(DEFAULT_DB_ALIAS)
+
+
+def read_replica(view):
+    """Serve the view's safe-method requests from the replica unless the client is pinned to the primary."""
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = replica_alias()
+        if alias is None or request.method not in SAFE_METHODS or request.COOKIES.get(PIN_COOKIE):
+            return view(request, *args, **kwargs)
+        with use_alias(alias):
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaPinMiddleware:
+    """Pin a client to the primary for DATABASE_REPLICA_PIN_SECONDS after each successful write."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 15)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_alias():
+            response.set_cookie(PIN_COOKIE, "1", max_age=self.pin_seconds, httponly=True, samesite="Lax")
+        return response
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created receiver: apply `settings.SQLITE_PRAGMAS` to every new SQLite connection."""
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", DEFAULT_SQLITE_PRAGMAS)
+    with connection.cursor() as cursor:
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
@@ -0,0 +1,272 @@
+"""
+Near-duplicate and templated-spam detection with MinHash LSH.
+
+Every review gets a MinHash signature of its character shingles
+(`NUM_PERM` values; two signatures agree in a position with probability
+equal to the Jaccard similarity of the texts). The signature is cut into
+`BANDS` bands of `ROWS` values and each band is hashed into a
+ReviewLSHBand row, scoped to the business. Reviews sharing any band key are
+candidates; a candidate whose estimated similarity reaches
+REVIEW_DEDUP_THRESHOLD makes the new review a duplicate of it.
+
+Checking a new review is one indexed lookup of its band keys plus a
+comparison with the few candidates found, whatever the size of the table.
+Only originals are indexed: copies of a review add no further candidates.
+Duplicates keep their row but are left out of analysis aggregates
+(`Review.objects.originals()`). Deleting an original promotes its oldest
+duplicate in its place (`promote_duplicates`).
+
+Texts shorter than REVIEW_DEDUP_MIN_CHARS (after normalising) are signed
+with an empty signature and never flagged: "Great food!" from two customers
+is not spam.
+"""
+
+import hashlib
+import itertools
+import re
+import zlib
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .lazy import lazy_import
+from .models import Review, ReviewLSHBand
+
+np = lazy_import("numpy")
+
+SHINGLE_CHARS = 5
+BANDS = 16
+ROWS = 8  # 16 x 8 puts the LSH threshold near 0.7: pairs at 0.8 collide 95% of the time, at 0.4 about 1%
+NUM_PERM = BANDS * ROWS
+PRIME = (1 << 31) - 1  # keeps a * h + b below 2**62, so uint64 arithmetic never overflows
+BATCH_SIZE = 500
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_coefficients = None
+
+
+def enabled():
+    return getattr(settings, "REVIEW_DEDUP_ENABLED", True)
+
+
+def _threshold():
+    return getattr(settings, "REVIEW_DEDUP_THRESHOLD", 0.8)
+
+
+def _min_chars():
+    return getattr(settings, "REVIEW_DEDUP_MIN_CHARS", 50)
+
+
+def _hash_coefficients():
+    """(a, b) arrays of the NUM_PERM hash functions a * h + b mod PRIME, derived from fixed seeds."""
+    global _coefficients
+    if _coefficients is None:
+        values = [
+            int.from_bytes(hashlib.blake2b(f"minhash-{i}".encode(), digest_size=8).digest(), "little")
+            for i in range(2 * NUM_PERM)
+        ]
+        a = np.array([1 + v % (PRIME - 1) for v in values[:NUM_PERM]], dtype=np.uint64)
+        b = np.array([v % PRIME for v in values[NUM_PERM:]], dtype=np.uint64)
+        _coefficients = (a[:, None], b[:, None])
+    return _coefficients
+
+
+def normalize(text):
+    return " ".join(_NON_WORD.sub(" ", (text or "").lower()).split())
+
+
+def signature(text):
+    """MinHash signature (uint32 array) of a text, or None when it is too short to judge."""
+    text = normalize(text)
+    if len(text) < max(_min_chars(), SHINGLE_CHARS):
+        return None
+    shingles = {zlib.crc32(text[i : i + SHINGLE_CHARS].encode()) for i in range(len(text) - SHINGLE_CHARS + 1)}
+    h = np.fromiter(shingles, dtype=np.uint64, count=len(shingles)) % PRIME
+    a, b = _hash_coefficients()
+    return ((a * h + b) % PRIME).min(axis=1).astype(np.uint32)
+
+
+def band_keys(sig):
+    """One signed 64-bit key per band; the band number is part of the hashed bytes."""
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(
+            bytes([band]) + sig[band * ROWS : (band + 1) * ROWS].tobytes(), digest_size=8
+        ).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def _load(blob):
+    return np.frombuffer(bytes(blob), dtype="<u4") if blob else None
+
+
+# --------------------------
+# INDEXING
+# --------------------------
+
+
+def index_reviews(business_id, reviews):
+    """
+    Sign the given (already saved) reviews of one business, flag those that
+    nearly duplicate an earlier review and add their band keys to the index.
+    Reviews are compared with the stored index and with each other in
+    (created_at, id) order. Returns the reviews flagged as duplicates.
+    """
+    if not business_id or not reviews or not enabled():
+        return []
+    reviews = sorted(reviews, key=lambda r: (r.created_at, str(r.pk)))
+    signatures = {r.pk: signature(r.text) for r in reviews}
+    keys = {pk: band_keys(sig) for pk, sig in signatures.items() if sig is not None}
+
+    # Existing reviews sharing a band with any of the batch, in one query.
+    buckets = {}
+    wanted = {key for review_keys in keys.values() for key in review_keys}
+    for key, review_id in ReviewLSHBand.objects.filter(business_id=business_id, key__in=wanted).values_list(
+        "key", "review_id"
+    ):
+        buckets.setdefault(key, []).append(review_id)
+    candidates = {review_id for ids in buckets.values() for review_id in ids}
+    known = {
+        pk: (_load(blob), duplicate_of)
+        for pk, blob, duplicate_of in Review.objects.filter(pk__in=candidates).values_list(
+            "pk", "minhash", "duplicate_of_id"
+        )
+    }
+
+    threshold = _threshold()
+    flagged = []
+    bands = []
+    for review in reviews:
+        sig = signatures[review.pk]
+        review.minhash = sig.astype("<u4").tobytes() if sig is not None else b""
+        if sig is None:
+            continue
+        best, best_score = None, threshold
+        for key in keys[review.pk]:
+            for other in buckets.get(key, ()):
+                other_sig = known.get(other, (None, None))[0]
+                score = similarity(sig, other_sig) if other_sig is not None else 0.0
+                if score >= best_score:
+                    best, best_score = other, score
+        if best is not None:
+            review.duplicate_of_id = known[best][1] or best
+            flagged.append(review)
+            continue
+        # Only originals are indexed, so a flood of copies adds no candidates.
+        known[review.pk] = (sig, None)
+        for key in keys[review.pk]:
+            buckets.setdefault(key, []).append(review.pk)
+            bands.append((review.pk, key))
+
+    _write(business_id, reviews, bands)
+    return flagged
+
+
+def _write(business_id, reviews, bands):
+    """
+    Store signatures, duplicate links and (review id, key) band rows with two
+    executemany statements; bulk_update's CASE expressions and building a
+    model instance per band row dominated indexing time.
+    """
+    connection = connections[router.db_for_write(Review)]
+    quote = connection.ops.quote_name
+    review_meta, band_meta = Review._meta, ReviewLSHBand._meta
+
+    def prep(field, value):
+        return None if value is None else field.get_db_prep_value(value, connection)
+
+    pk = review_meta.pk
+    minhash, duplicate_of = review_meta.get_field("minhash"), review_meta.get_field("duplicate_of")
+    band_review, band_business, band_key = (band_meta.get_field(name) for name in ("review", "business", "key"))
+    business = prep(band_business.target_field, business_id)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {quote(review_meta.db_table)} SET {quote(minhash.column)} = %s, "
+            f"{quote(duplicate_of.column)} = %s WHERE {quote(pk.column)} = %s",
+            [
+                (prep(minhash, r.minhash), prep(duplicate_of.target_field, r.duplicate_of_id), prep(pk, r.pk))
+                for r in reviews
+            ],
+        )
+        if bands:
+            cursor.executemany(
+                f"INSERT INTO {quote(band_meta.db_table)} ({quote(band_review.column)}, "
+                f"{quote(band_business.column)}, {quote(band_key.column)}) VALUES (%s, %s, %s)",
+                [(prep(band_review.target_field, review_id), business, key) for review_id, key in bands],
+            )
+
+
+def backfill(business_ids=None, batch_size=BATCH_SIZE, log=None):
+    """
+    Sign and index every review that has no signature yet, `batch_size`
+    reviews at a time in (business, created_at, id) order; each batch is a
+    keyset query, so memory stays flat however large the table is.
+    Returns {business_id: [review_date of each newly flagged review]}.
+    """
+    pending = Review.objects.filter(minhash__isnull=True).order_by("business_id", "created_at", "id")
+    if business_ids:
+        pending = pending.filter(business_id__in=business_ids)
+    pending = pending.only("id", "business_id", "text", "created_at", "review_date", "duplicate_of_id")
+
+    flagged = {}
+    processed = 0
+    last = None
+    while True:
+        qs = pending
+        if last is not None:
+            qs = qs.filter(
+                Q(business_id__gt=last.business_id)
+                | Q(business_id=last.business_id, created_at__gt=last.created_at)
+                | Q(business_id=last.business_id, created_at=last.created_at, id__gt=last.id)
+            )
+        batch = list(qs[:batch_size])
+        if not batch:
+            break
+        for business_id, group in itertools.groupby(batch, key=lambda r: r.business_id):
+            for review in index_reviews(business_id, list(group)):
+                flagged.setdefault(business_id, []).append(review.review_date)
+        processed += len(batch)
+        last = batch[-1]
+        if log:
+            log(f"{processed} reviews indexed")
+    return flagged
+
+
+# --------------------------
+# DELETION
+# --------------------------
+
+
+def promote_duplicates(review):
+    """
+    Call before deleting an original review: its oldest duplicate becomes
+    the new original, takes over the LSH index and is marked updated (so
+    pipeline runs see its window change), and the other duplicates point to
+    it. Returns the promoted review, or None when the review has no
+    duplicates. Without this, SET_NULL on duplicate_of would turn every
+    duplicate into an unindexed original.
+    """
+    if review.duplicate_of_id is not None:
+        return None
+    duplicates = Review.objects.filter(duplicate_of=review).order_by("created_at", "id")
+    heir = duplicates.only("id", "business_id", "minhash", "review_date").first()
+    if heir is None:
+        return None
+    sig = _load(heir.minhash)
+    with transaction.atomic():
+        duplicates.exclude(pk=heir.pk).update(duplicate_of=heir)
+        Review.objects.filter(pk=heir.pk).update(duplicate_of=None, updated_at=timezone.now())
+        if sig is not None:
+            ReviewLSHBand.objects.bulk_create(
+                ReviewLSHBand(review_id=heir.pk, business_id=heir.business_id, key=key) for key in band_keys(sig)
+            )
+    heir.duplicate_of = None
+    return heir
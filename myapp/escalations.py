@@ -0,0 +1,237 @@
+"""
+Streaming detection of sudden rating / sentiment drops.
+
+Reviews are grouped into daily windows by review_date. For each business a
+SentimentMonitor row keeps, per metric (star rating and text polarity):
+
+    mean, var     EWMA baseline of per-review values over closed windows
+    cusum         one-sided CUSUM of window z-scores below the baseline
+    sum, sumsq    running totals of the open window
+
+so folding in a review is O(1) whatever the history. The open window is
+scored on every insert: its z-score is (baseline - window mean) / standard
+error, and when the CUSUM including it exceeds ESCALATION_CUSUM_H an
+Escalation is recorded for that business, metric and day (updated, not
+duplicated, as more reviews land in the same window). A small drift shows
+up after a few low windows, a wave of one-star reviews within the day.
+
+Reviews dated before the open window (late arrivals) are counted in it.
+No escalations are raised until the baseline has ESCALATION_WARMUP_REVIEWS
+reviews; `replay` rebuilds monitors (and past escalations) from history.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import ai_analysis
+from .models import Escalation, Review, SentimentMonitor
+
+METRICS = ("rating", "polarity")
+# Lower bounds on the baseline variance so a business with only five-star
+# reviews is not escalated by a single 4-star one.
+VARIANCE_FLOOR = {"rating": 1.0, "polarity": 0.04}
+
+
+def enabled():
+    return getattr(settings, "ESCALATION_ENABLED", True)
+
+
+def _params():
+    return (
+        getattr(settings, "ESCALATION_EWMA_ALPHA", 0.1),
+        getattr(settings, "ESCALATION_CUSUM_K", 0.5),
+        getattr(settings, "ESCALATION_CUSUM_H", 5.0),
+        getattr(settings, "ESCALATION_WARMUP_REVIEWS", 20),
+    )
+
+
+def review_day(review_date):
+    if isinstance(review_date, datetime.datetime):
+        if timezone.is_aware(review_date):
+            review_date = timezone.localtime(review_date)
+        return review_date.date()
+    return review_date
+
+
+# --------------------------
+# DETECTOR
+# --------------------------
+
+
+def _close_window(monitor, alpha, k, h):
+    """Fold the open window into the EWMA baselines and CUSUMs, then empty it."""
+    n = monitor.window_count
+    if not n:
+        return
+    first = monitor.baseline_windows == 0
+    weight = max(alpha, 1 / (monitor.baseline_windows + 1))  # plain average while the baseline is young
+    for metric in METRICS:
+        total = getattr(monitor, f"{metric}_sum")
+        squares = getattr(monitor, f"{metric}_sumsq")
+        window_mean = total / n
+        if first:
+            setattr(monitor, f"{metric}_mean", window_mean)
+            setattr(monitor, f"{metric}_var", max(squares / n - window_mean**2, 0.0))
+        else:
+            mean = getattr(monitor, f"{metric}_mean")
+            var = getattr(monitor, f"{metric}_var")
+            z = (mean - window_mean) / (max(var, VARIANCE_FLOOR[metric]) / n) ** 0.5
+            cusum = max(0.0, getattr(monitor, f"{metric}_cusum") + z - k)
+            setattr(monitor, f"{metric}_cusum", 0.0 if cusum > h else cusum)  # restart after an alarm
+            deviation = squares / n - 2 * mean * window_mean + mean**2  # mean squared distance from the baseline
+            setattr(monitor, f"{metric}_mean", mean + weight * (window_mean - mean))
+            setattr(monitor, f"{metric}_var", var + weight * (deviation - var))
+        setattr(monitor, f"{metric}_sum", 0.0)
+        setattr(monitor, f"{metric}_sumsq", 0.0)
+    monitor.baseline_windows += 1
+    monitor.baseline_reviews += n
+    monitor.window_count = 0
+
+
+def _open_window_alarms(monitor, k, h, warmup):
+    """Escalation values for each metric whose CUSUM, including the open window, is past h."""
+    n = monitor.window_count
+    if not n or monitor.baseline_windows == 0 or monitor.baseline_reviews < warmup:
+        return []
+    alarms = []
+    for metric in METRICS:
+        mean = getattr(monitor, f"{metric}_mean")
+        window_mean = getattr(monitor, f"{metric}_sum") / n
+        z = (mean - window_mean) / (max(getattr(monitor, f"{metric}_var"), VARIANCE_FLOOR[metric]) / n) ** 0.5
+        score = getattr(monitor, f"{metric}_cusum") + z - k
+        if score > h:
+            alarms.append(
+                {
+                    "metric": metric,
+                    "window_start": monitor.window_start,
+                    "review_count": n,
+                    "observed": window_mean,
+                    "expected": mean,
+                    "score": score,
+                }
+            )
+    return alarms
+
+
+def observe(monitor, day, rating, polarity, params=None):
+    """Fold one review into the monitor (unsaved); returns the alarms of its window."""
+    alpha, k, h, warmup = params or _params()
+    if monitor.window_start is None:
+        monitor.window_start = day
+    elif day > monitor.window_start:
+        _close_window(monitor, alpha, k, h)
+        monitor.window_start = day
+    monitor.window_count += 1
+    for metric, value in (("rating", rating), ("polarity", polarity)):
+        setattr(monitor, f"{metric}_sum", getattr(monitor, f"{metric}_sum") + value)
+        setattr(monitor, f"{metric}_sumsq", getattr(monitor, f"{metric}_sumsq") + value * value)
+    return _open_window_alarms(monitor, k, h, warmup)
+
+
+def _record(business_id, alarms):
+    for alarm in alarms:
+        Escalation.objects.update_or_create(
+            business_id=business_id,
+            metric=alarm["metric"],
+            window_start=alarm["window_start"],
+            defaults={key: alarm[key] for key in ("review_count", "observed", "expected", "score")},
+        )
+
+
+def observe_reviews(business, reviews, polarities=None):
+    """
+    Fold newly created reviews of one business into its monitor and record
+    any escalations. `polarities` maps review pk to an already computed
+    get_sentiment_score of its text. Returns the alarms raised.
+    """
+    if not business or not reviews or not enabled():
+        return []
+    params = _params()
+    polarities = polarities or {}
+    scored = sorted(
+        (
+            review_day(r.review_date),
+            r.rating or 0,
+            polarities[r.pk] if r.pk in polarities else ai_analysis.get_sentiment_score(r.text),
+        )
+        for r in reviews
+    )
+    with transaction.atomic():
+        monitor, _ = SentimentMonitor.objects.select_for_update().get_or_create(business=business)
+        alarms = {}
+        for day, rating, polarity in scored:
+            for alarm in observe(monitor, day, rating, polarity, params):
+                alarms[(alarm["metric"], alarm["window_start"])] = alarm  # keep the latest per window
+        monitor.save()
+        _record(business.pk, alarms.values())
+    return list(alarms.values())
+
+
+def recent_count(business_ids, days=None):
+    """Distinct (business, day) windows escalated within the last `days` days."""
+    if days is None:
+        days = getattr(settings, "ESCALATION_LOOKBACK_DAYS", 30)
+    since = timezone.localdate() - datetime.timedelta(days=days)
+    return (
+        Escalation.objects.filter(business_id__in=business_ids, window_start__gte=since)
+        .values("business_id", "window_start")
+        .distinct()
+        .count()
+    )
+
+
+# --------------------------
+# REPLAY
+# --------------------------
+
+
+def replay(business_ids=None, chunk_size=2000, log=None):
+    """
+    Rebuild monitors and escalations from the review history in one pass
+    over Review ordered by (business, review_date). Returns the number of
+    escalations recorded.
+    """
+    params = _params()
+    reviews = Review.objects.originals().order_by("business_id", "review_date")
+    monitors = SentimentMonitor.objects.all()
+    escalations = Escalation.objects.all()
+    if business_ids:
+        reviews = reviews.filter(business_id__in=business_ids)
+        monitors = monitors.filter(business_id__in=business_ids)
+        escalations = escalations.filter(business_id__in=business_ids)
+    rows = reviews.values_list("business_id", "review_date", "rating", "text").iterator(chunk_size=chunk_size)
+
+    recorded = 0
+    processed = 0
+    monitor = None
+    alarms = {}
+
+    def flush():
+        nonlocal recorded
+        monitor.save()
+        Escalation.objects.bulk_create(
+            [Escalation(business_id=monitor.business_id, **alarm) for alarm in alarms.values()]
+        )
+        recorded += len(alarms)
+        alarms.clear()
+
+    with transaction.atomic():
+        monitors.delete()
+        escalations.delete()
+        for business_id, review_date, rating, text in rows:
+            if monitor is None or monitor.business_id != business_id:
+                if monitor is not None:
+                    flush()
+                monitor = SentimentMonitor(business_id=business_id)
+            day = review_day(review_date)
+            for alarm in observe(monitor, day, rating or 0, ai_analysis.get_sentiment_score(text), params):
+                alarms[(alarm["metric"], alarm["window_start"])] = alarm
+            processed += 1
+            if log and processed % chunk_size == 0:
+                log(f"{processed} reviews replayed")
+        if monitor is not None:
+            flush()
+    return recorded
@@ -0,0 +1,354 @@
+"""
+Streaming review import (`manage.py import_reviews`).
+
+A format is a Parser subclass registered in PARSERS with two halves:
+
+    records(fh)               yields raw records (CSV rows, NDJSON lines)
+                              while reading the file once, in the
+                              importing process
+    normalize(chunk, tzinfo)  turns a list of raw records into Review
+                              values and can run in a worker process
+
+Chunks of CHUNK_SIZE records are normalized inline or, with workers > 1,
+by a process pool with a bounded number in flight, and the results are
+inserted in order with one executemany transaction per batch, so memory
+stays flat whatever the file size. Ratings follow `records.parse_rating` (the API's rules); dates may be
+ISO dates/datetimes or the scraper's relative dates ("3 weeks ago"). A record
+without a date is stored with the import time; one whose date cannot be
+parsed is skipped, or stops the import when `strict`.
+
+Parsers import nothing from Django, so spawned workers need no settings.
+"""
+
+import collections
+import concurrent.futures
+import csv
+import datetime
+import gzip
+import itertools
+import json
+import time
+
+from .records import parse_rating
+from .scraper import convert_relative_date
+
+CHUNK_SIZE = 5000
+BATCH_SIZE = 1000
+# Parsing inline keeps up with the inserts for the built-in formats; worker
+# processes only pay off for formats whose normalize is expensive.
+WORKERS = 1
+
+# Column / key names accepted for each Review value, lower case, in Parser.values order.
+ALIASES = {
+    "reviewer_name": ("reviewer_name", "author", "reviewer", "name", "user"),
+    "rating": ("rating", "stars", "star_rating", "score"),
+    "text": ("text", "review", "comment", "content", "body"),
+    "platform": ("platform", "source"),
+    "review_date": ("review_date", "date", "time", "created_at", "timestamp"),
+}
+
+PARSERS = {}
+
+
+def register(cls):
+    PARSERS[cls.name] = cls
+    return cls
+
+
+def parse_date(value, tzinfo):
+    """
+    Aware datetime from a date/datetime, an ISO string or a relative date
+    ending in "ago"; None when there is no date, ValueError when unparseable.
+    """
+    if value is None:
+        return None
+    raw = value
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            # "01/02/2023" must not be read as today, nor "Sunday brunch" as "N days ago".
+            value = convert_relative_date(value) if value.lower().endswith("ago") else None
+    if isinstance(value, datetime.datetime):
+        return value if value.tzinfo else value.replace(tzinfo=tzinfo)
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time(), tzinfo)
+    raise ValueError(f"unparseable review date {raw!r}")
+
+
+class Parser:
+    """Base format: subclasses read raw records and map one to (name, rating, text, platform, date)."""
+
+    name = None
+    platform = "Import"
+
+    def __init__(self, platform=None, strict=False):
+        if platform:
+            self.platform = platform
+        self.strict = strict  # raise on an unparseable date instead of skipping the record
+
+    def records(self, fh):
+        raise NotImplementedError
+
+    def values(self, record):
+        """(reviewer_name, rating, text, platform, review_date) raw values of one record, or None to skip."""
+        raise NotImplementedError
+
+    def normalize(self, chunk, tzinfo):
+        """(rows, skipped): normalized value tuples of the chunk and how many records were unusable."""
+        rows = []
+        for record in chunk:
+            try:
+                values = self.values(record)
+            except (ValueError, TypeError, KeyError, AttributeError):
+                values = None
+            if values is None:
+                continue
+            name, rating, text, platform, date = values
+            if not text and rating in (None, ""):
+                continue
+            try:
+                date = parse_date(date, tzinfo)
+            except ValueError:
+                if self.strict:
+                    raise
+                continue
+            rows.append((str(name or ""), parse_rating(rating), str(text or ""), str(platform or self.platform), date))
+        return rows, len(chunk) - len(rows)
+
+
+@register
+class CSVParser(Parser):
+    """Comma separated values with a header row; columns are matched by ALIASES."""
+
+    name = "csv"
+
+    def __init__(self, platform=None, strict=False):
+        super().__init__(platform, strict)
+        self.columns = {}
+
+    def records(self, fh):
+        reader = csv.reader(fh)
+        header = [column.strip().lower() for column in next(reader, [])]
+        for field, names in ALIASES.items():
+            index = next((header.index(name) for name in names if name in header), None)
+            if index is not None:
+                self.columns[field] = index
+        if "text" not in self.columns and "rating" not in self.columns:
+            raise ValueError(f"CSV header has no text or rating column: {header}")
+        yield from reader
+
+    def values(self, record):
+        return tuple(
+            record[self.columns[field]] if field in self.columns and self.columns[field] < len(record) else None
+            for field in ALIASES
+        )
+
+
+@register
+class NDJSONParser(Parser):
+    """One JSON object per line; keys are matched by ALIASES (case-insensitively)."""
+
+    name = "ndjson"
+
+    def records(self, fh):
+        for line in fh:
+            if line.strip():
+                yield line
+
+    def values(self, record):
+        obj = {key.lower(): value for key, value in json.loads(record).items()}
+        return tuple(next((obj[name] for name in names if name in obj), None) for names in ALIASES.values())
+
+
+@register
+class YelpParser(NDJSONParser):
+    """review.json of the Yelp Open Dataset: stars, text, date, user_id."""
+
+    name = "yelp"
+    platform = "Yelp"
+
+    def values(self, record):
+        obj = json.loads(record)
+        return obj.get("user_id"), obj.get("stars"), obj.get("text"), None, obj.get("date")
+
+
+@register
+class GoogleParser(NDJSONParser):
+    """Google Business Profile review resources, one per line: starRating, comment, createTime, reviewer."""
+
+    name = "google"
+    platform = "Google Maps"
+    STARS = {"ONE": 1, "TWO": 2, "THREE": 3, "FOUR": 4, "FIVE": 5}
+
+    def values(self, record):
+        obj = json.loads(record)
+        rating = obj.get("starRating")
+        return (
+            (obj.get("reviewer") or {}).get("displayName"),
+            self.STARS.get(rating, rating),
+            obj.get("comment"),
+            None,
+            obj.get("createTime"),
+        )
+
+
+def guess_format(path):
+    name = path.lower().removesuffix(".gz")
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    return None
+
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, encoding="utf-8-sig", newline="")
+
+
+def _normalized(parser, records, tzinfo, chunk_size, workers):
+    """(rows, skipped) per chunk, in file order; at most 2 * workers chunks are in flight."""
+    chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield parser.normalize(chunk, tzinfo)
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.submit(parser.normalize, chunk, tzinfo))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# Columns written by _insert, in its row tuple order.
+_COLUMNS = (
+    "id", "created_at", "updated_at", "business", "owner", "reviewer_name", "rating", "text", "platform", "review_date"
+)
+
+
+def _insert(business, rows, now):
+    """
+    Insert (name, rating, text, platform, date) rows with one executemany,
+    in one transaction, and return their keys. Only the key and date columns
+    need database preparation; bulk_create's per-field preparation of every
+    value took most of the import time.
+    """
+    from django.db import connections, router, transaction
+
+    from . import ids
+    from .models import Review
+
+    connection = connections[router.db_for_write(Review)]
+    quote = connection.ops.quote_name
+    fields = [Review._meta.get_field(name) for name in _COLUMNS]
+    pk, review_date = fields[0], fields[-1]
+    stamp = fields[1].get_db_prep_value(now, connection)
+    business_id = fields[3].target_field.get_db_prep_value(business.pk, connection)
+    owner_id = business.owner_id
+    if owner_id is not None:
+        owner_id = fields[4].target_field.get_db_prep_value(owner_id, connection)
+    keys = [ids.uuid7() for _ in rows]
+    params = [
+        (
+            pk.get_db_prep_value(key, connection),
+            stamp,
+            stamp,
+            business_id,
+            owner_id,
+            name,
+            rating,
+            text,
+            source,
+            review_date.get_db_prep_value(date or now, connection),
+        )
+        for key, (name, rating, text, source, date) in zip(keys, rows)
+    ]
+    columns = ", ".join(quote(field.column) for field in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {quote(Review._meta.db_table)} ({columns}) VALUES ({placeholders})", params)
+    return keys
+
+
+def import_file(
+    path,
+    business,
+    fmt=None,
+    platform=None,
+    batch_size=BATCH_SIZE,
+    chunk_size=CHUNK_SIZE,
+    workers=WORKERS,
+    defer_analysis=False,
+    strict=False,
+    log=None,
+):
+    """
+    Import the reviews of one file into a business. Each batch is inserted
+    in one transaction (see _insert) and passed to ingest.reviews_added; with
+    defer_analysis the derived structures are rebuilt once at the end
+    instead, which is faster for large files. With strict an unparseable
+    date raises ValueError (batches already inserted stay) instead of
+    skipping the record. Returns (imported, skipped).
+    """
+    # Django is only needed here, in the importing process.
+    from django.utils import timezone
+
+    from . import dedup, escalations, ingest, snapshot, topics, trends
+    from .models import Review
+
+    fmt = fmt or guess_format(path)
+    if fmt not in PARSERS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(PARSERS)}")
+    parser = PARSERS[fmt](platform=platform, strict=strict)
+    tzinfo = timezone.get_current_timezone()
+
+    imported = skipped = 0
+    started = time.perf_counter()
+    with _open(path) as fh:
+        for rows, chunk_skipped in _normalized(parser, parser.records(fh), tzinfo, chunk_size, workers):
+            skipped += chunk_skipped
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start : start + batch_size]
+                now = timezone.now()
+                keys = _insert(business, batch, now)
+                if not defer_analysis:
+                    reviews = [
+                        Review(
+                            id=key,
+                            created_at=now,
+                            updated_at=now,
+                            business=business,
+                            owner_id=business.owner_id,
+                            reviewer_name=name,
+                            rating=rating,
+                            text=text,
+                            platform=source,
+                            review_date=date or now,
+                        )
+                        for key, (name, rating, text, source, date) in zip(keys, batch)
+                    ]
+                    ingest.reviews_added(business, reviews)
+                imported += len(batch)
+            if log:
+                elapsed = time.perf_counter() - started
+                log(f"{imported} rows imported, {skipped} skipped ({imported / elapsed:.0f} rows/s)")
+
+    if defer_analysis and imported:
+        if log:
+            log("Rebuilding duplicates, trend logs and escalations...")
+        dedup.backfill([business.pk])
+        trends.backfill([business.pk])
+        escalations.replay([business.pk])
+        snapshot.invalidate(business.pk)
+    if imported:
+        # The topic model catches up once per file rather than once per batch.
+        topics.catch_up(business)
+    return imported, skipped
@@ -0,0 +1,36 @@
+"""
+Hooks run when reviews are added or removed, so every derived structure
+(duplicate index, TrendLog windows, escalation monitors, dashboard
+snapshots) is kept in step from one place instead of at each
+call site.
+"""
+
+from . import ai_analysis
+from . import dedup
+from . import escalations
+from . import snapshot
+from . import trends
+
+
+def reviews_added(business, reviews):
+    """Call after creating reviews of one business."""
+    if not business or not reviews:
+        return
+    # Near-duplicates are flagged first so they never reach the aggregates.
+    duplicates = {review.pk for review in dedup.index_reviews(business.pk, reviews)}
+    reviews = [review for review in reviews if review.pk not in duplicates]
+    # Each text is scored once; trend windows and escalation monitors share it.
+    scored = {review.pk: ai_analysis.aspect_mentions(review.text) for review in reviews}
+    trends.add_reviews(business, reviews, scored=scored)
+    escalations.observe_reviews(business, reviews, polarities={pk: s[0] for pk, s in scored.items()})
+    # Topic models are not caught up per insert: the AI pipeline and the
+    # importer fold new reviews in with topics.catch_up in larger batches.
+    # Snapshots pick up new reviews by themselves on their next read.
+
+
+def reviews_removed(business, review_dates):
+    """Call after deleting reviews of one business, or excluding them from aggregates."""
+    if not business:
+        return
+    trends.refresh_review_dates(business, review_dates)
+    snapshot.invalidate(business.pk)
@@ -0,0 +1,31 @@
+"""
+Deferred imports for heavy dependencies.
+
+TextBlob/NLTK, NumPy, Selenium and swiftshadow together cost several hundred
+milliseconds to import, which every `manage.py` command and worker boot would
+otherwise pay. Modules bind them with `lazy_import` instead and the real
+import happens on first attribute access. `myapp.warmup` can load them ahead
+of the first request.
+"""
+
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Placeholder that imports the named module on first attribute access."""
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        # Copy the real namespace in so later lookups never reach __getattr__.
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def is_loaded(name):
+    return name in sys.modules
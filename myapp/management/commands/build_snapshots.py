@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from myapp import snapshot
+from myapp.models import Business
+
+
+class Command(BaseCommand):
+    help = "Build or extend the columnar review snapshots used by the dashboard aggregations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business", action="append", dest="business_ids", help="Limit to this business id (repeatable).")
+        parser.add_argument("--rebuild", action="store_true", help="Drop existing snapshots first.")
+
+    def handle(self, *args, **options):
+        business_ids = options["business_ids"] or list(Business.objects.values_list("pk", flat=True))
+        rows = 0
+        for business_id in business_ids:
+            if options["rebuild"]:
+                snapshot.drop(business_id)
+            (snap,) = snapshot.for_businesses([business_id])
+            rows += snap.count
+        self.stdout.write(self.style.SUCCESS(f"Snapshots hold {rows} reviews across {len(business_ids)} businesses."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from myapp import peers
+
+
+class Command(BaseCommand):
+    help = "Recompute per category/location peer percentiles used by the competitor comparison endpoint."
+
+    def handle(self, *args, **options):
+        groups = peers.compute_benchmarks()
+        self.stdout.write(self.style.SUCCESS(f"Stored benchmarks for {groups} peer groups."))
@@ -0,0 +1,61 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import importers
+from myapp.models import Business
+
+
+class Command(BaseCommand):
+    help = (
+        "Import reviews for one business from a CSV, NDJSON or platform export file (optionally .gz), "
+        "streaming it in constant memory with batched inserts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument("--business", required=True, help="Id of the business the reviews belong to.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(importers.PARSERS),
+            help="File format; guessed from the extension (.csv, .ndjson/.jsonl/.json) when omitted.",
+        )
+        parser.add_argument("--platform", help="Platform stored on reviews whose records do not name one.")
+        parser.add_argument("--batch-size", type=int, default=importers.BATCH_SIZE, help="Reviews per transaction.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=importers.CHUNK_SIZE, help="Records parsed per worker task."
+        )
+        parser.add_argument(
+            "--workers", type=int, default=importers.WORKERS, help="Parser processes (1 parses inline)."
+        )
+        parser.add_argument(
+            "--defer-analysis",
+            action="store_true",
+            help="Skip per-batch duplicate/trend/escalation updates and rebuild them once at the end.",
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Stop at the first unparseable review date instead of skipping the record.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            business = Business.objects.get(pk=options["business"])
+        except (Business.DoesNotExist, ValidationError) as exc:
+            raise CommandError(f"Business {options['business']} not found.") from exc
+        try:
+            imported, skipped = importers.import_file(
+                options["path"],
+                business,
+                fmt=options["format"],
+                platform=options["platform"],
+                batch_size=options["batch_size"],
+                chunk_size=options["chunk_size"],
+                workers=options["workers"],
+                defer_analysis=options["defer_analysis"],
+                strict=options["strict"],
+                log=lambda msg: self.stdout.write(msg),
+            )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} reviews into {business.name}, skipped {skipped}."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from myapp import purge
+
+
+class Command(BaseCommand):
+    help = "Run pending, failed or stalled purges of soft-deleted businesses in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Rows deleted per transaction.")
+
+    def handle(self, *args, **options):
+        done = 0
+        for purge_id in purge.pending():
+            result = purge.run(purge_id, batch_size=options["batch_size"], log=lambda msg: self.stdout.write(msg))
+            if result is not None:
+                done += 1
+                self.stdout.write(f"Purged {result.business_name} ({result.rows_deleted} rows).")
+        self.stdout.write(self.style.SUCCESS(f"Finished {done} purges."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from myapp import rekey
+
+
+class Command(BaseCommand):
+    help = (
+        "Replace the random uuid4 keys of reviews, trend logs and AI results with time-ordered UUIDv7 keys "
+        "derived from created_at. Old ids stop resolving; resumable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            dest="models",
+            choices=[model.__name__ for model in rekey.MODELS],
+            help="Limit to a model (repeatable).",
+        )
+        parser.add_argument("--batch-size", type=int, default=rekey.BATCH_SIZE, help="Rows rekeyed per transaction.")
+
+    def handle(self, *args, **options):
+        models = [model for model in rekey.MODELS if not options["models"] or model.__name__ in options["models"]]
+        counts = rekey.run(models, batch_size=options["batch_size"], log=lambda msg: self.stdout.write(msg))
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Rekeyed {summary} rows."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from myapp import escalations
+
+
+class Command(BaseCommand):
+    help = "Rebuild sentiment monitors and escalations from review history in one streaming pass."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business", action="append", dest="business_ids", help="Limit to a business id (repeatable).")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per batch.")
+
+    def handle(self, *args, **options):
+        recorded = escalations.replay(
+            business_ids=options["business_ids"],
+            chunk_size=options["chunk_size"],
+            log=lambda msg: self.stdout.write(msg),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Recorded {recorded} escalations."))
@@ -0,0 +1,243 @@
+"""
+In-process request metrics, exposed in Prometheus text format on /metrics.
+
+`RequestMetricsMiddleware` records, per URL name (e.g. "api-dashboard-stats"),
+request counts by method/status and, for a sampled share of requests
+(`settings.METRICS_SAMPLE_RATE`), a latency histogram, DB query count and
+time, response bytes and cache hits/misses reported by views via
+`mark_cache`.
+
+Writes go to a per-thread shard, so the request path never takes a lock;
+`render` sums the shards when /metrics is scraped. When a thread exits its
+shard is folded into a retired total and dropped, so servers that recycle
+worker threads keep a bounded number of shards.
+"""
+
+import bisect
+import contextlib
+import random
+import threading
+import time
+import weakref
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RouteStats:
+    __slots__ = (
+        "buckets",
+        "latency_sum",
+        "sampled",
+        "db_queries",
+        "db_seconds",
+        "response_bytes",
+        "cache_hits",
+        "cache_misses",
+    )
+
+    def __init__(self):
+        # One slot per LATENCY_BUCKETS bound plus +Inf; counts are not cumulative here.
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.sampled = 0
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.response_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def merge(self, other):
+        for i, count in enumerate(other.buckets):
+            self.buckets[i] += count
+        for field in self.__slots__[1:]:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+
+class _Shard:
+    __slots__ = ("requests", "routes")
+
+    def __init__(self):
+        self.requests = defaultdict(int)  # (route, method, status) -> count
+        self.routes = defaultdict(RouteStats)
+
+    def merge(self, other):
+        for key, count in list(other.requests.items()):
+            self.requests[key] += count
+        for route, stats in list(other.routes.items()):
+            self.routes[route].merge(stats)
+
+
+class _ShardOwner:
+    """Held only by a thread's local storage; collected, and its shard retired, when the thread exits."""
+
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self, shard):
+        self.shard = shard
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard()  # totals of threads that have exited
+        # Taken when a thread creates or retires its shard and when rendering, never per request.
+        self._shards_lock = threading.RLock()
+
+    def _shard(self):
+        owner = getattr(self._local, "owner", None)
+        if owner is None:
+            owner = self._local.owner = _ShardOwner(_Shard())
+            with self._shards_lock:
+                self._shards.append(owner.shard)
+            weakref.finalize(owner, self._retire, owner.shard)
+        return owner.shard
+
+    def _retire(self, shard):
+        with self._shards_lock:
+            if not any(live is shard for live in self._shards):
+                return  # dropped by reset()
+            self._shards = [live for live in self._shards if live is not shard]
+            self._retired.merge(shard)
+
+    def count_request(self, route, method, status):
+        self._shard().requests[(route, method, status)] += 1
+
+    def observe(self, route, seconds, db_queries, db_seconds, response_bytes, cache=None):
+        stats = self._shard().routes[route]
+        stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        stats.latency_sum += seconds
+        stats.sampled += 1
+        stats.db_queries += db_queries
+        stats.db_seconds += db_seconds
+        stats.response_bytes += response_bytes
+        if cache is True:
+            stats.cache_hits += 1
+        elif cache is False:
+            stats.cache_misses += 1
+
+    def snapshot(self):
+        total = _Shard()
+        with self._shards_lock:
+            shards = list(self._shards)
+            total.merge(self._retired)
+        for shard in shards:
+            total.merge(shard)
+        return total.requests, total.routes
+
+    def reset(self):
+        with self._shards_lock:
+            self._shards = []
+            self._retired = _Shard()
+        self._local = threading.local()
+
+    def render(self):
+        requests, routes = self.snapshot()
+        lines = [
+            "# HELP http_requests_total Requests handled, by route, method and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (route, method, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{{route="{route}",method="{method}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Latency of sampled requests.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for route, stats in sorted(routes.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), stats.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{route="{route}"}} {stats.latency_sum:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{route="{route}"}} {stats.sampled}')
+
+        counters = [
+            ("http_request_db_queries_total", "DB queries issued by sampled requests.", "db_queries", "{}"),
+            ("http_request_db_seconds_total", "DB time spent by sampled requests.", "db_seconds", "{:.6f}"),
+            ("http_response_bytes_total", "Response body bytes of sampled requests.", "response_bytes", "{}"),
+        ]
+        for name, help_text, field, fmt in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for route, stats in sorted(routes.items()):
+                lines.append(f'{name}{{route="{route}"}} {fmt.format(getattr(stats, field))}')
+
+        lines += [
+            "# HELP http_cache_requests_total Cache lookups reported by sampled requests.",
+            "# TYPE http_cache_requests_total counter",
+        ]
+        for route, stats in sorted(routes.items()):
+            lines.append(f'http_cache_requests_total{{route="{route}",result="hit"}} {stats.cache_hits}')
+            lines.append(f'http_cache_requests_total{{route="{route}",result="miss"}} {stats.cache_misses}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def mark_cache(request, hit):
+    """Let a view report whether it was served from a cached/precomputed result."""
+    request = getattr(request, "_request", request)  # DRF Request -> HttpRequest
+    request.metrics_cache = bool(hit)
+
+
+class _QueryCounter:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "METRICS_ENABLED", True)
+        self.sample_rate = getattr(settings, "METRICS_SAMPLE_RATE", 1.0)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            response = self.get_response(request)
+            registry.count_request(_route(request), request.method, response.status_code)
+            return response
+
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        route = _route(request)
+        registry.count_request(route, request.method, response.status_code)
+        registry.observe(
+            route,
+            elapsed,
+            counter.queries,
+            counter.seconds,
+            0 if response.streaming else len(response.content),
+            cache=getattr(request, "metrics_cache", None),
+        )
+        return response
+
+
+def _route(request):
+    match = getattr(request, "resolver_match", None)
+    return (match.url_name or match.view_name) if match else UNMATCHED_ROUTE
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trendlog',
+            name='review_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='trendlog',
+            name='year',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['business', 'review_date'], name='review_business_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='trendlog',
+            constraint=models.UniqueConstraint(fields=('business', 'year', 'week'), name='trendlog_business_year_week_uniq'),
+        ),
+    ]
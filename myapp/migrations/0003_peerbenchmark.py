@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:34
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0002_trendlog_iso_windows'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeerBenchmark',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.TextField(blank=True, default='')),
+                ('location', models.TextField(blank=True, default='')),
+                ('business_count', models.IntegerField(default=0)),
+                ('rating_quantiles', models.JSONField(default=list)),
+                ('sentiment_quantiles', models.JSONField(default=list)),
+                ('topic_share_quantiles', models.JSONField(default=dict)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category', 'location'), name='peerbenchmark_category_location_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0003_peerbenchmark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airesult',
+            name='pipeline_stats',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
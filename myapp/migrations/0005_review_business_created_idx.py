@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0004_airesult_pipeline_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['business', 'created_at'], name='review_business_created_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:20
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0005_review_business_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopicModel',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('dims', models.IntegerField()),
+                ('clusters', models.IntegerField()),
+                ('document_count', models.IntegerField(default=0)),
+                ('centroids', models.BinaryField(default=bytes)),
+                ('center_weights', models.BinaryField(default=bytes)),
+                ('document_frequency', models.BinaryField(default=bytes)),
+                ('vocabulary', models.JSONField(default=dict)),
+                ('watermark_created_at', models.DateTimeField(blank=True, null=True)),
+                ('watermark_id', models.UUIDField(blank=True, null=True)),
+                ('business', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='topic_model', to='myapp.business')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
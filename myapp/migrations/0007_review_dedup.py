@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_topicmodel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='myapp.review'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ReviewLSHBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='myapp.business')),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_bands', to='myapp.review')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['business', 'key'], name='reviewlshband_business_key_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:05
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_review_dedup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentimentMonitor',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('window_start', models.DateField(blank=True, null=True)),
+                ('window_count', models.IntegerField(default=0)),
+                ('baseline_windows', models.IntegerField(default=0)),
+                ('baseline_reviews', models.IntegerField(default=0)),
+                ('rating_sum', models.FloatField(default=0)),
+                ('rating_sumsq', models.FloatField(default=0)),
+                ('rating_mean', models.FloatField(default=0)),
+                ('rating_var', models.FloatField(default=0)),
+                ('rating_cusum', models.FloatField(default=0)),
+                ('polarity_sum', models.FloatField(default=0)),
+                ('polarity_sumsq', models.FloatField(default=0)),
+                ('polarity_mean', models.FloatField(default=0)),
+                ('polarity_var', models.FloatField(default=0)),
+                ('polarity_cusum', models.FloatField(default=0)),
+                ('business', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sentiment_monitor', to='myapp.business')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Escalation',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('metric', models.TextField(choices=[('rating', 'Rating'), ('polarity', 'Polarity')])),
+                ('window_start', models.DateField()),
+                ('review_count', models.IntegerField(default=0)),
+                ('observed', models.FloatField()),
+                ('expected', models.FloatField()),
+                ('score', models.FloatField()),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='escalations', to='myapp.business')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['business', 'window_start'], name='escalation_business_window_idx')],
+                'constraints': [models.UniqueConstraint(fields=('business', 'metric', 'window_start'), name='escalation_business_metric_window_uniq')],
+            },
+        ),
+    ]
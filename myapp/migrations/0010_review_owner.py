@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_business_owner(apps, schema_editor):
+    Business = apps.get_model('myapp', 'Business')
+    Review = apps.get_model('myapp', 'Review')
+    # One UPDATE ... SET owner_id = (SELECT owner_id FROM business ...) for the whole table.
+    Review.objects.using(schema_editor.connection.alias).update(
+        owner_id=Subquery(Business.objects.filter(pk=OuterRef('business_id')).values('owner_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_business_soft_delete'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='owner',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(copy_business_owner, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['owner', 'review_date'], name='review_owner_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['owner', 'rating', 'review_date'], name='review_owner_rating_date_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:40
+
+import myapp.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0010_review_owner'),
+    ]
+
+    # Only the Python-side default changes. Leaving the schema alone spares
+    # SQLite a full copy of each table; existing keys are moved to UUIDv7
+    # separately by `manage.py rekey_uuid7`.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='airesult',
+                    name='id',
+                    field=models.UUIDField(default=myapp.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='review',
+                    name='id',
+                    field=models.UUIDField(default=myapp.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='trendlog',
+                    name='id',
+                    field=models.UUIDField(default=myapp.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0011_uuid7_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airesult',
+            name='summary',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0012_airesult_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airesult',
+            name='aspect_sentiment',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trendlog',
+            name='aspect_sentiment',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
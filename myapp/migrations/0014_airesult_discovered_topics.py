@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0013_aspect_sentiment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airesult',
+            name='discovered_topics',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_airesult_discovered_topics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trendlog',
+            name='sentiment_sum',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+def delete_legacy_trend_logs(apps, schema_editor):
+    TrendLog = apps.get_model('myapp', 'TrendLog')
+    # Rows from before ISO-week windows summarise all of a business's reviews at the time of a
+    # pipeline run, not one window, so they cannot be given a year; backfill_trends rebuilds them.
+    TrendLog.objects.using(schema_editor.connection.alias).filter(year__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_trendlog_sentiment_sum'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_legacy_trend_logs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='trendlog',
+            name='year',
+            field=models.IntegerField(),
+        ),
+    ]
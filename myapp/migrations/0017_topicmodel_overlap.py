@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:50
+
+from django.db import migrations, models
+
+
+def seed_recent_ids(apps, schema_editor):
+    TopicModel = apps.get_model('myapp', 'TopicModel')
+    Review = apps.get_model('myapp', 'Review')
+    alias = schema_editor.connection.alias
+    # The old watermark row, and any folded-in review sharing its created_at,
+    # would be read again from the new floor on: list them as already seen.
+    for topic_model in TopicModel.objects.using(alias).exclude(watermark_id=None):
+        seen = Review.objects.using(alias).filter(
+            business_id=topic_model.business_id,
+            created_at=topic_model.watermark_created_at,
+            id__lte=topic_model.watermark_id,
+        )
+        topic_model.recent_ids = [str(pk) for pk in seen.values_list('id', flat=True)]
+        topic_model.save(update_fields=['recent_ids'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0016_trendlog_year_required'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicmodel',
+            name='recent_ids',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(seed_recent_ids, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='topicmodel',
+            name='watermark_id',
+        ),
+        migrations.RenameField(
+            model_name='topicmodel',
+            old_name='watermark_created_at',
+            new_name='floor',
+        ),
+    ]
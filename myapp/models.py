@@ -2,8 +2,11 @@ import uuid
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
+from . import ids
+
 
 class TimeStampedModel(models.Model):
     """Abstract base with UUID PK and audit timestamps."""
@@ -16,6 +19,23 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
+def _owned(user, include_shared):
+    """Filter on an `owner` column; shared rows are those with no owner, listed to every user."""
+    return Q(owner=user) | Q(owner__isnull=True) if include_shared else Q(owner=user)
+
+
+class BusinessQuerySet(models.QuerySet):
+    def for_owner(self, user, include_shared=False):
+        return self.filter(_owned(user, include_shared))
+
+
+class LiveBusinessManager(models.Manager.from_queryset(BusinessQuerySet)):
+    """Businesses that have not been deleted; soft-deleted ones wait for their purge (see myapp/purge.py)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Business(TimeStampedModel):
     name = models.TextField()
     category = models.TextField(blank=True, null=True)
@@ -28,45 +48,290 @@ class Business(TimeStampedModel):
         null=True,
         blank=True,
     )
+    deleted_at = models.DateTimeField(blank=True, null=True, editable=False)
+
+    objects = LiveBusinessManager()
+    all_objects = models.Manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        business = super().from_db(db, field_names, values)
+        business._saved_owner_id = business.__dict__.get("owner_id")
+        return business
+
+    def save(self, *args, **kwargs):
+        """Save, then move the business's reviews to the new owner if ownership changed (Review.owner)."""
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding and getattr(self, "_saved_owner_id", None) != self.owner_id:
+            Review.objects.filter(business=self).exclude(owner_id=self.owner_id).update(owner_id=self.owner_id)
+        self._saved_owner_id = self.owner_id
 
     def __str__(self) -> str:
         return self.name
 
 
+class ReviewQuerySet(models.QuerySet):
+    def originals(self):
+        """Reviews that are not near-duplicates of another one; what analysis aggregates count."""
+        return self.filter(duplicate_of__isnull=True)
+
+    def live(self):
+        """Reviews of businesses that have not been (soft-)deleted."""
+        return self.filter(business__deleted_at__isnull=True)
+
+    def for_owner(self, user, include_shared=False):
+        """
+        The user's reviews by the denormalized owner column, one index range
+        with no join to Business. The user's soft-deleted businesses awaiting
+        purge (usually none) are excluded with a NOT IN subquery over their
+        few Business rows, so no extra query is made per call.
+        """
+        owned = _owned(user, include_shared)
+        deleted = Business.all_objects.filter(owned, deleted_at__isnull=False).values("pk")
+        return self.filter(owned).exclude(business_id__in=deleted)
+
+
 class Review(TimeStampedModel):
+    # Time-ordered UUIDv7 keys (myapp/ids.py): inserts append to the primary key index.
+    id = models.UUIDField(primary_key=True, default=ids.uuid7, editable=False)
     business = models.ForeignKey(Business, related_name="reviews", on_delete=models.CASCADE)
+    # Copy of business.owner so tenant queries need no join; set on save and by Business.save on an
+    # ownership change. bulk_create and queryset update() callers must set it themselves.
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="+", on_delete=models.CASCADE, null=True, blank=True, editable=False
+    )
     reviewer_name = models.TextField(blank=True, null=True)
     rating = models.IntegerField()
     text = models.TextField(blank=True, null=True)
     platform = models.TextField(blank=True, null=True)
     review_date = models.DateTimeField(default=timezone.now)
+    # MinHash signature (see myapp/dedup.py); NULL until indexed, empty for texts too short to compare.
+    minhash = models.BinaryField(blank=True, null=True, editable=False)
+    # Deleting an original must go through dedup.promote_duplicates first (as review_detail does);
+    # SET_NULL alone would leave its duplicates as unindexed originals.
+    duplicate_of = models.ForeignKey(
+        "self", related_name="duplicates", on_delete=models.SET_NULL, null=True, blank=True, editable=False
+    )
+
+    objects = ReviewQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["business", "review_date"], name="review_business_date_idx"),
+            models.Index(fields=["business", "created_at"], name="review_business_created_idx"),
+            models.Index(fields=["owner", "review_date"], name="review_owner_date_idx"),
+            models.Index(fields=["owner", "rating", "review_date"], name="review_owner_rating_date_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        review = super().from_db(db, field_names, values)
+        review._saved_business_id = review.__dict__.get("business_id")
+        return review
+
+    def save(self, *args, **kwargs):
+        """Save, copying business.owner into owner only for a new review without one or a moved review."""
+        if self.business_id is not None and (
+            (self._state.adding and self.owner_id is None)
+            or (not self._state.adding and getattr(self, "_saved_business_id", None) != self.business_id)
+        ):
+            self.owner_id = self.business.owner_id
+        super().save(*args, **kwargs)
+        self._saved_business_id = self.business_id
 
     def __str__(self) -> str:
         return f"{self.business.name} - {self.rating}/5"
 
 
+class ReviewLSHBand(models.Model):
+    """
+    One LSH band key of a review's MinHash signature, scoped to its business.
+    Kept lean (no UUID or timestamps) as there are dedup.BANDS rows per review.
+    """
+
+    review = models.ForeignKey(Review, related_name="lsh_bands", on_delete=models.CASCADE)
+    business = models.ForeignKey(Business, related_name="+", on_delete=models.CASCADE)
+    key = models.BigIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["business", "key"], name="reviewlshband_business_key_idx")]
+
+
+class TrendLogQuerySet(models.QuerySet):
+    def for_owner(self, user, include_shared=False):
+        """Trend logs of the user's live businesses."""
+        return self.filter(business__in=Business.objects.for_owner(user, include_shared))
+
+
 class TrendLog(TimeStampedModel):
+    """Sentiment/topic snapshot for one ISO year-week window of a business's reviews."""
+
+    id = models.UUIDField(primary_key=True, default=ids.uuid7, editable=False)
     business = models.ForeignKey(Business, related_name="trend_logs", on_delete=models.CASCADE)
+    year = models.IntegerField()
     week = models.IntegerField(blank=True, null=True)
     month = models.IntegerField(blank=True, null=True)
+    review_count = models.IntegerField(default=0)
     sentiment_score = models.FloatField(blank=True, null=True)
+    # Unrounded polarity total, so new reviews are folded in without rounding drift.
+    sentiment_sum = models.FloatField(blank=True, null=True)
     topic_trends = models.JSONField(blank=True, null=True)
+    # {topic: {"mentions", "positive", "negative", "polarity", "polarity_sum"}} (ai_analysis.AspectSentiment)
+    aspect_sentiment = models.JSONField(blank=True, null=True)
+
+    objects = TrendLogQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["business", "year", "week"], name="trendlog_business_year_week_uniq")
+        ]
 
     def __str__(self) -> str:
         return f"TrendLog {self.business.name}"
 
 
 class AIResult(TimeStampedModel):
+    id = models.UUIDField(primary_key=True, default=ids.uuid7, editable=False)
     business = models.OneToOneField(Business, related_name="ai_result", on_delete=models.CASCADE)
     sentiment_pos = models.IntegerField(blank=True, null=True)
     sentiment_neg = models.IntegerField(blank=True, null=True)
     sentiment_neu = models.IntegerField(blank=True, null=True)
     top_topics = models.JSONField(blank=True, null=True)
+    # Topics of the business's online topic model (myapp/topics.py); top_topics keeps the TOPIC_KEYWORDS counts.
+    discovered_topics = models.JSONField(blank=True, null=True)
+    aspect_sentiment = models.JSONField(blank=True, null=True)
     keywords = models.JSONField(blank=True, null=True)
     top_complaints = models.JSONField(blank=True, null=True)
     top_praises = models.JSONField(blank=True, null=True)
     ai_insights = models.TextField(blank=True, null=True)
+    # Extractive summary sentences plus the per-window candidates they were ranked from (myapp/summaries.py).
+    summary = models.JSONField(blank=True, null=True)
+    pipeline_stats = models.JSONField(blank=True, null=True)
 
     def __str__(self) -> str:
         return f"AIResult {self.business.name}"
 
+
+
+class PeerBenchmark(TimeStampedModel):
+    """
+    Precomputed percentiles for one category/location peer group.
+    An empty category or location means "any"; quantile lists hold the
+    0th, 5th, ..., 100th percentiles (21 values).
+    """
+
+    category = models.TextField(blank=True, default="")
+    location = models.TextField(blank=True, default="")
+    business_count = models.IntegerField(default=0)
+    rating_quantiles = models.JSONField(default=list)
+    sentiment_quantiles = models.JSONField(default=list)
+    topic_share_quantiles = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["category", "location"], name="peerbenchmark_category_location_uniq")
+        ]
+
+    def __str__(self) -> str:
+        return f"PeerBenchmark {self.category or '*'} / {self.location or '*'}"
+
+
+class TopicModel(TimeStampedModel):
+    """
+    Online topic model of one business (see myapp/topics.py). Arrays are raw
+    little-endian bytes: centroids float16 (clusters x dims), center_weights
+    float32 (clusters), document_frequency float32 (dims). Every review
+    created before `floor` has been folded in, and so have the ones in
+    `recent_ids` (review ids created at or after it).
+    """
+
+    business = models.OneToOneField(Business, related_name="topic_model", on_delete=models.CASCADE)
+    dims = models.IntegerField()
+    clusters = models.IntegerField()
+    document_count = models.IntegerField(default=0)
+    centroids = models.BinaryField(default=bytes)
+    center_weights = models.BinaryField(default=bytes)
+    document_frequency = models.BinaryField(default=bytes)
+    vocabulary = models.JSONField(default=dict)
+    floor = models.DateTimeField(blank=True, null=True)
+    recent_ids = models.JSONField(default=list)
+
+    def __str__(self) -> str:
+        return f"TopicModel {self.business.name}"
+
+
+class SentimentMonitor(TimeStampedModel):
+    """
+    Streaming rating / polarity statistics of one business (see
+    myapp/escalations.py): EWMA baselines and CUSUMs over closed daily
+    windows plus the running totals of the open window.
+    """
+
+    business = models.OneToOneField(Business, related_name="sentiment_monitor", on_delete=models.CASCADE)
+    window_start = models.DateField(blank=True, null=True)
+    window_count = models.IntegerField(default=0)
+    baseline_windows = models.IntegerField(default=0)
+    baseline_reviews = models.IntegerField(default=0)
+    rating_sum = models.FloatField(default=0)
+    rating_sumsq = models.FloatField(default=0)
+    rating_mean = models.FloatField(default=0)
+    rating_var = models.FloatField(default=0)
+    rating_cusum = models.FloatField(default=0)
+    polarity_sum = models.FloatField(default=0)
+    polarity_sumsq = models.FloatField(default=0)
+    polarity_mean = models.FloatField(default=0)
+    polarity_var = models.FloatField(default=0)
+    polarity_cusum = models.FloatField(default=0)
+
+    def __str__(self) -> str:
+        return f"SentimentMonitor {self.business.name}"
+
+
+class Escalation(TimeStampedModel):
+    """A daily window whose rating or polarity fell significantly below the business's baseline."""
+
+    METRIC_CHOICES = [("rating", "Rating"), ("polarity", "Polarity")]
+
+    business = models.ForeignKey(Business, related_name="escalations", on_delete=models.CASCADE)
+    metric = models.TextField(choices=METRIC_CHOICES)
+    window_start = models.DateField()
+    review_count = models.IntegerField(default=0)
+    observed = models.FloatField()
+    expected = models.FloatField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["business", "metric", "window_start"], name="escalation_business_metric_window_uniq"
+            )
+        ]
+        indexes = [models.Index(fields=["business", "window_start"], name="escalation_business_window_idx")]
+
+    def __str__(self) -> str:
+        return f"Escalation {self.business.name} {self.metric} {self.window_start}"
+
+
+class BusinessPurge(TimeStampedModel):
+    """
+    Progress of the background removal of a soft-deleted business and its
+    rows (see myapp/purge.py). Kept after the business row itself is gone.
+    """
+
+    STATUS_CHOICES = [("pending", "Pending"), ("running", "Running"), ("done", "Done"), ("failed", "Failed")]
+
+    business_id = models.UUIDField(db_index=True)
+    business_name = models.TextField(blank=True, default="")
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="+", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    status = models.TextField(choices=STATUS_CHOICES, default="pending")
+    total_rows = models.IntegerField(default=0)
+    rows_deleted = models.IntegerField(default=0)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    error = models.TextField(blank=True, default="")
+
+    def __str__(self) -> str:
+        return f"BusinessPurge {self.business_name} ({self.status})"
@@ -0,0 +1,220 @@
+"""
+Peer benchmarks for the competitor comparison dashboard.
+
+`compute_benchmarks` (run periodically via `manage.py compute_peer_benchmarks`)
+aggregates every business once and stores fixed-size percentile arrays per
+category/location peer group. `compare` then only reads one PeerBenchmark row
+and bisects those arrays, so a comparison costs the same no matter how many
+businesses exist.
+"""
+
+import bisect
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+
+from . import ai_analysis
+from .models import Business, PeerBenchmark
+
+QUANTILE_STEP = 5
+QUANTILE_PERCENTS = list(range(0, 101, QUANTILE_STEP))
+
+
+def _min_peers():
+    return getattr(settings, "PEER_BENCHMARK_MIN_PEERS", 3)
+
+
+def normalize_key(value):
+    return (value or "").strip().lower()
+
+
+def quantiles(values):
+    """Linearly interpolated 0..100 percentiles (every QUANTILE_STEP) of values."""
+    data = sorted(values)
+    if not data:
+        return []
+    last = len(data) - 1
+    points = []
+    for pct in QUANTILE_PERCENTS:
+        pos = last * pct / 100
+        lo = int(pos)
+        hi = min(lo + 1, last)
+        points.append(round(data[lo] + (data[hi] - data[lo]) * (pos - lo), 4))
+    return points
+
+
+def percentile_rank(value, points):
+    """Approximate percentile of value within a stored quantile array."""
+    if value is None or not points:
+        return None
+    if points[0] == points[-1]:
+        return 50.0
+    if value <= points[0]:
+        return 0.0
+    if value >= points[-1]:
+        return 100.0
+    hi = bisect.bisect_right(points, value)
+    lo = hi - 1
+    span = points[hi] - points[lo]
+    frac = (value - points[lo]) / span if span else 0
+    return round((lo + frac) * QUANTILE_STEP, 1)
+
+
+def _net_sentiment(pos, neg, neu):
+    total = (pos or 0) + (neg or 0) + (neu or 0)
+    if not total:
+        return None
+    return ((pos or 0) - (neg or 0)) / total
+
+
+def _topic_shares(top_topics):
+    total = sum((top_topics or {}).values())
+    if not total:
+        return {}
+    return {topic: count / total for topic, count in top_topics.items()}
+
+
+def business_metrics(row):
+    """Comparable metrics for one business from its aggregated values() row."""
+    sentiment = _net_sentiment(
+        row.get("ai_result__sentiment_pos"), row.get("ai_result__sentiment_neg"), row.get("ai_result__sentiment_neu")
+    )
+    if sentiment is None:
+        # No AI result yet: fall back to star-rating polarity.
+        neutral = row["review_total"] - row["pos_reviews"] - row["neg_reviews"]
+        sentiment = _net_sentiment(row["pos_reviews"], row["neg_reviews"], neutral)
+    return {
+        "rating": row["avg_rating"],
+        "sentiment": sentiment,
+        "topic_share": _topic_shares(row.get("ai_result__top_topics")),
+    }
+
+
+def _metric_rows(businesses):
+    counted = Q(reviews__duplicate_of__isnull=True)  # near-duplicates are left out, see dedup.py
+    return (
+        businesses.annotate(
+            avg_rating=Avg("reviews__rating", filter=counted),
+            review_total=Count("reviews", filter=counted),
+            pos_reviews=Count("reviews", filter=counted & Q(reviews__rating__gte=4)),
+            neg_reviews=Count("reviews", filter=counted & Q(reviews__rating__lte=2)),
+        )
+        .filter(review_total__gt=0)
+        .values(
+            "id",
+            "category",
+            "location",
+            "avg_rating",
+            "review_total",
+            "pos_reviews",
+            "neg_reviews",
+            "ai_result__sentiment_pos",
+            "ai_result__sentiment_neg",
+            "ai_result__sentiment_neu",
+            "ai_result__top_topics",
+        )
+    )
+
+
+def compute_benchmarks():
+    """
+    Rebuild all PeerBenchmark rows in a single grouped pass over businesses.
+    Each business counts towards its (category, location), (category, any)
+    and (any, any) groups. Returns the number of peer groups stored.
+    """
+    groups = defaultdict(lambda: {"rating": [], "sentiment": [], "topic_share": defaultdict(list)})
+
+    for row in _metric_rows(Business.objects.all()).iterator():
+        metrics = business_metrics(row)
+        category = normalize_key(row["category"])
+        location = normalize_key(row["location"])
+        for key in {(category, location), (category, ""), ("", "")}:
+            group = groups[key]
+            group["rating"].append(metrics["rating"])
+            if metrics["sentiment"] is not None:
+                group["sentiment"].append(metrics["sentiment"])
+            for topic in ai_analysis.TOPIC_KEYWORDS:
+                group["topic_share"][topic].append(metrics["topic_share"].get(topic, 0.0))
+
+    benchmarks = [
+        PeerBenchmark(
+            category=category,
+            location=location,
+            business_count=len(group["rating"]),
+            rating_quantiles=quantiles(group["rating"]),
+            sentiment_quantiles=quantiles(group["sentiment"]),
+            topic_share_quantiles={topic: quantiles(shares) for topic, shares in group["topic_share"].items()},
+        )
+        for (category, location), group in groups.items()
+    ]
+
+    with transaction.atomic():
+        PeerBenchmark.objects.all().delete()
+        PeerBenchmark.objects.bulk_create(benchmarks)
+    return len(benchmarks)
+
+
+def peer_group_for(business):
+    """Most specific stored peer group with enough businesses, or None."""
+    category = normalize_key(business.category)
+    location = normalize_key(business.location)
+    candidates = [(category, location), (category, ""), ("", "")]
+    rows = {
+        (b.category, b.location): b
+        for b in PeerBenchmark.objects.filter(
+            Q(category=category, location__in=[location, ""]) | Q(category="", location="")
+        )
+    }
+    for key in candidates:
+        benchmark = rows.get(key)
+        if benchmark and benchmark.business_count >= _min_peers():
+            return benchmark
+    return None
+
+
+def _describe(metric, value, points):
+    return {
+        "metric": metric,
+        "value": round(value, 4) if value is not None else None,
+        "percentile": percentile_rank(value, points),
+        "p25": points[5] if points else None,
+        "median": points[10] if points else None,
+        "p75": points[15] if points else None,
+    }
+
+
+def compare(business):
+    """Competitor comparison payload for a business against its peer group."""
+    row = (
+        _metric_rows(Business.objects.filter(pk=business.pk)).first()
+        or {"avg_rating": None, "review_total": 0, "pos_reviews": 0, "neg_reviews": 0}
+    )
+    metrics = business_metrics(row)
+    benchmark = peer_group_for(business)
+
+    data = {
+        "business": {
+            "id": str(business.id),
+            "name": business.name,
+            "category": business.category,
+            "location": business.location,
+        },
+        "peer_group": None,
+        "metrics": [],
+    }
+    if not benchmark:
+        return data
+
+    data["peer_group"] = {
+        "category": benchmark.category or None,
+        "location": benchmark.location or None,
+        "business_count": benchmark.business_count,
+        "computed_at": benchmark.updated_at.isoformat(),
+    }
+    data["metrics"].append(_describe("rating", metrics["rating"], benchmark.rating_quantiles))
+    data["metrics"].append(_describe("sentiment", metrics["sentiment"], benchmark.sentiment_quantiles))
+    for topic, points in benchmark.topic_share_quantiles.items():
+        data["metrics"].append(_describe(f"topic:{topic}", metrics["topic_share"].get(topic, 0.0), points))
+    return data
@@ -0,0 +1,223 @@
+"""
+Per-stage timings for the AI pipeline.
+
+`PipelineStats` collects wall-clock seconds and item counts per stage of one
+pipeline run. When the run finishes the stats go to the hook selected by
+`settings.AI_PIPELINE_STATS_HOOK`:
+
+    "none"        drop them (default)
+    "log"         one structured log line per run on the `myapp.pipeline` logger
+    "prometheus"  accumulate counters; see `render_prometheus()`
+    "pkg.Class"   any class with an `emit(stats)` method
+
+`profile_job` optionally wraps a run in cProfile and attaches the hottest
+functions to the stats.
+"""
+
+import contextlib
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger("myapp.pipeline")
+
+PROFILE_TOP_N = 25
+
+
+class PipelineStats:
+    """Stage timings and item counts for one pipeline job."""
+
+    def __init__(self, job=None):
+        self.job = job
+        self.stages = []
+        self.profile = None
+        self._started = time.perf_counter()
+        self.total_seconds = None
+
+    @contextlib.contextmanager
+    def stage(self, name, items=None):
+        """Time the enclosed block; the yielded record's "items" may be set inside it."""
+        record = {"stage": name, "seconds": None, "items": items}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 6)
+            self.stages.append(record)
+
+    def record(self, name, seconds, items=None):
+        """Add a stage timed elsewhere, e.g. a sub-stage accumulated inside a loop."""
+        self.stages.append({"stage": name, "seconds": round(seconds, 6), "items": items})
+
+    def finish(self):
+        self.total_seconds = round(time.perf_counter() - self._started, 6)
+        return self
+
+    def as_dict(self):
+        data = {"job": self.job, "total_seconds": self.total_seconds, "stages": self.stages}
+        if self.profile:
+            data["profile"] = self.profile
+        return data
+
+
+# --------------------------
+# HOOKS
+# --------------------------
+
+
+class NullHook:
+    def emit(self, stats):
+        pass
+
+
+class LoggingHook:
+    def emit(self, stats):
+        summary = " ".join(f"{s['stage']}={s['seconds'] * 1000:.1f}ms/{s['items']}" for s in stats.stages)
+        logger.info(
+            "pipeline job=%s total=%.3fs %s",
+            stats.job,
+            stats.total_seconds or 0,
+            summary,
+            extra={"pipeline_stats": stats.as_dict()},
+        )
+
+
+class PrometheusHook:
+    """
+    Accumulates per-stage counters in process. When
+    `settings.AI_PIPELINE_PROMETHEUS_FILE` is set the exposition text is also
+    rewritten there after every run (node_exporter textfile collector style).
+    """
+
+    _lock = threading.Lock()
+    _runs = 0
+    _seconds = defaultdict(float)
+    _items = defaultdict(int)
+    _calls = defaultdict(int)
+
+    def emit(self, stats):
+        cls = type(self)
+        with cls._lock:
+            cls._runs += 1
+            for s in stats.stages:
+                cls._seconds[s["stage"]] += s["seconds"]
+                cls._calls[s["stage"]] += 1
+                cls._items[s["stage"]] += s["items"] or 0
+
+        path = getattr(settings, "AI_PIPELINE_PROMETHEUS_FILE", None)
+        if path:
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(self.render())
+            os.replace(tmp, path)
+
+    @classmethod
+    def render(cls):
+        with cls._lock:
+            runs = cls._runs
+            seconds = dict(cls._seconds)
+            calls = dict(cls._calls)
+            items = dict(cls._items)
+
+        lines = [
+            "# HELP ai_pipeline_runs_total AI pipeline jobs completed.",
+            "# TYPE ai_pipeline_runs_total counter",
+            f"ai_pipeline_runs_total {runs}",
+            "# HELP ai_pipeline_stage_seconds_total Wall-clock seconds spent per pipeline stage.",
+            "# TYPE ai_pipeline_stage_seconds_total counter",
+        ]
+        lines += [
+            f'ai_pipeline_stage_seconds_total{{stage="{name}"}} {value:.6f}' for name, value in sorted(seconds.items())
+        ]
+        lines += [
+            "# HELP ai_pipeline_stage_calls_total Times each pipeline stage ran.",
+            "# TYPE ai_pipeline_stage_calls_total counter",
+        ]
+        lines += [f'ai_pipeline_stage_calls_total{{stage="{name}"}} {value}' for name, value in sorted(calls.items())]
+        lines += [
+            "# HELP ai_pipeline_stage_items_total Items processed per pipeline stage.",
+            "# TYPE ai_pipeline_stage_items_total counter",
+        ]
+        lines += [f'ai_pipeline_stage_items_total{{stage="{name}"}} {value}' for name, value in sorted(items.items())]
+        return "\n".join(lines) + "\n"
+
+
+HOOKS = {
+    "none": NullHook,
+    "log": LoggingHook,
+    "prometheus": PrometheusHook,
+}
+
+_hook = None
+
+
+def get_hook():
+    global _hook
+    if _hook is None:
+        name = getattr(settings, "AI_PIPELINE_STATS_HOOK", "none") or "none"
+        _hook = (HOOKS.get(name) or import_string(name))()
+    return _hook
+
+
+def render_prometheus():
+    return PrometheusHook.render()
+
+
+def emit(stats):
+    """Finish the stats and hand them to the configured hook."""
+    stats.finish()
+    try:
+        get_hook().emit(stats)
+    except Exception:  # instrumentation must never break the pipeline
+        logger.exception("pipeline stats hook failed")
+    return stats
+
+
+# --------------------------
+# cPROFILE
+# --------------------------
+
+
+def profiling_enabled(request=None):
+    """Profile everything via settings, or one job via ?profile=1 from a staff user."""
+    if getattr(settings, "AI_PIPELINE_PROFILE", False):
+        return True
+    if request is None:
+        return False
+    user = getattr(request, "user", None)
+    return request.query_params.get("profile") == "1" and bool(user and user.is_staff)
+
+
+@contextlib.contextmanager
+def profile_job(stats, enabled=False):
+    """
+    cProfile the enclosed block when enabled. The top functions by cumulative
+    time are stored on stats.profile; the raw .prof file is also written to
+    `settings.AI_PIPELINE_PROFILE_DIR` when configured.
+    """
+    if not enabled:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+        stats.profile = out.getvalue()
+
+        profile_dir = getattr(settings, "AI_PIPELINE_PROFILE_DIR", None)
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(profile_dir, f"{stats.job}-{int(time.time())}.prof"))
@@ -0,0 +1,301 @@
+"""
+Proxy pool for the scraper.
+
+The pool fetches a list of proxies once, keeps it for
+`SCRAPER_PROXY_REFRESH_SECONDS` and tracks every proxy's latency (EWMA of
+successful page loads or probes) and failure rate. `acquire()` hands out the
+fastest healthy proxy; a failed proxy is put on an exponential cooldown and
+the caller rotates to the next one.
+
+The list is fetched outside the pool lock by one thread at a time while the
+others keep using the current list. A failed fetch is retried with the same
+exponential backoff as a failed proxy, and a pool whose proxies are all
+cooling down fetches again at most every BASE_COOLDOWN seconds.
+
+Where proxies come from (`settings.SCRAPER_PROXY_SOURCE`):
+
+    "swiftshadow"   free proxy providers via swiftshadow (default)
+    "none"          no proxy; the scraper connects directly
+    a list          ["http://127.0.0.1:8899", ...] e.g. a local stub proxy
+    a file path     one proxy URL (or host:port) per line
+"""
+
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from .lazy import lazy_import
+
+swiftshadow = lazy_import("swiftshadow")
+firefox = lazy_import("selenium.webdriver.firefox.options")
+
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.3
+MIN_SAMPLES = 3
+MAX_FAILURE_RATE = 0.5
+BASE_COOLDOWN = 30.0
+MAX_COOLDOWN = 30 * 60.0
+
+
+class ProxyState:
+    """One proxy plus its observed health."""
+
+    __slots__ = (
+        "host",
+        "port",
+        "protocol",
+        "successes",
+        "failures",
+        "consecutive_failures",
+        "latency",
+        "cooldown_until",
+    )
+
+    def __init__(self, host, port, protocol="http"):
+        self.host = host
+        self.port = int(port)
+        self.protocol = protocol
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency = None  # EWMA seconds
+        self.cooldown_until = 0.0
+
+    @property
+    def url(self):
+        return f"{self.protocol}://{self.host}:{self.port}"
+
+    @property
+    def failure_rate(self):
+        attempts = self.successes + self.failures
+        return self.failures / attempts if attempts else 0.0
+
+    def healthy(self, now):
+        if now < self.cooldown_until:
+            return False
+        return self.successes + self.failures < MIN_SAMPLES or self.failure_rate <= MAX_FAILURE_RATE
+
+    def score(self):
+        """Lower is better: latency inflated by the failure rate; untried proxies rank after measured fast ones."""
+        latency = self.latency if self.latency is not None else 5.0
+        return latency * (1 + 2 * self.failure_rate)
+
+    def as_dict(self, now):
+        return {
+            "proxy": self.url,
+            "successes": self.successes,
+            "failures": self.failures,
+            "failure_rate": round(self.failure_rate, 3),
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "cooling_down": now < self.cooldown_until,
+        }
+
+
+def parse_proxy(value, default_protocol="http"):
+    """ProxyState from "protocol://host:port" or "host:port"."""
+    value = value.strip()
+    if "://" not in value:
+        value = f"{default_protocol}://{value}"
+    parts = urlsplit(value)
+    if not parts.hostname or not parts.port:
+        raise ValueError(f"invalid proxy {value!r}")
+    return ProxyState(parts.hostname, parts.port, parts.scheme)
+
+
+# --------------------------
+# SOURCES
+# --------------------------
+
+
+def swiftshadow_source(limit=50, protocol="http"):
+    """Proxies from swiftshadow's free providers, stopping once `limit` are collected."""
+    found = []
+    for provider in swiftshadow.Providers.values():
+        if protocol not in provider.protocols:
+            continue
+        try:
+            proxies = swiftshadow.run(provider.providerFunction([], protocol))
+        except Exception:
+            continue
+        found += [ProxyState(p.ip, p.port, p.protocol) for p in proxies or []]
+        if len(found) >= limit:
+            break
+    return found[:limit]
+
+
+def configured_source():
+    """Callable returning fresh ProxyStates for `settings.SCRAPER_PROXY_SOURCE`, or None for no proxy."""
+    source = getattr(settings, "SCRAPER_PROXY_SOURCE", "swiftshadow")
+    if not source or source == "none":
+        return None
+    if source == "swiftshadow":
+        limit = getattr(settings, "SCRAPER_PROXY_POOL_SIZE", 50)
+        return lambda: swiftshadow_source(limit=limit)
+    if isinstance(source, (list, tuple)):
+        return lambda: [parse_proxy(value) for value in source]
+
+    def read_file():
+        with open(os.fspath(source), encoding="utf-8") as fh:
+            return [parse_proxy(line) for line in fh if line.strip() and not line.lstrip().startswith("#")]
+
+    return read_file
+
+
+# --------------------------
+# POOL
+# --------------------------
+
+
+class ProxyPool:
+    def __init__(self, source, refresh_seconds=600.0, clock=time.monotonic):
+        self.source = source
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()  # single-flight guard around source()
+        self._proxies = {}
+        self._fetched_at = None
+        self._fetch_failures = 0
+        self._retry_at = 0.0
+
+    def _due(self, now, forced=False):
+        """Whether the list should be fetched again; forced when every proxy is unusable. Caller holds _lock."""
+        if now < self._retry_at:
+            return False
+        if self._fetched_at is None:
+            return True
+        return now - self._fetched_at >= (BASE_COOLDOWN if forced else self.refresh_seconds)
+
+    def _refresh(self, forced=False):
+        """Re-fetch the list, keeping the stats of proxies that are still listed."""
+        with self._lock:
+            waiting = not self._proxies
+        # Callers with a list to fall back on skip a fetch already in flight; an empty pool waits for it.
+        if not self._fetch_lock.acquire(blocking=waiting):
+            return
+        try:
+            with self._lock:
+                if not self._due(self.clock(), forced):
+                    return
+            try:
+                fresh = self.source()
+            except Exception:
+                with self._lock:
+                    self._fetch_failures += 1
+                    backoff = min(BASE_COOLDOWN * 2 ** (self._fetch_failures - 1), MAX_COOLDOWN)
+                    self._retry_at = self.clock() + backoff
+                logger.warning("proxy list fetch failed, retrying in %.0fs", backoff, exc_info=True)
+                return
+            with self._lock:
+                self._proxies = {p.url: self._proxies.get(p.url, p) for p in fresh}
+                self._fetched_at = self.clock()
+                self._fetch_failures = 0
+                self._retry_at = 0.0
+        finally:
+            self._fetch_lock.release()
+
+    def _candidates(self, now, exclude):
+        with self._lock:
+            return [p for p in self._proxies.values() if p.url not in exclude and p.healthy(now)]
+
+    def acquire(self, exclude=()):
+        """Fastest healthy proxy not in `exclude`; None when none is left."""
+        now = self.clock()
+        with self._lock:
+            due = self._due(now)
+        if due:
+            self._refresh()
+        candidates = self._candidates(now, exclude)
+        if not candidates and not exclude:
+            # Everything is cooling down or failing: fetch again rather than give up.
+            with self._lock:
+                due = self._due(now, forced=True)
+            if due:
+                self._refresh(forced=True)
+                candidates = self._candidates(now, exclude)
+        return min(candidates, key=ProxyState.score) if candidates else None
+
+    def report_success(self, proxy, latency):
+        with self._lock:
+            proxy.successes += 1
+            proxy.consecutive_failures = 0
+            proxy.cooldown_until = 0.0
+            proxy.latency = latency if proxy.latency is None else (
+                EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * proxy.latency
+            )
+
+    def report_failure(self, proxy):
+        with self._lock:
+            proxy.failures += 1
+            proxy.consecutive_failures += 1
+            cooldown = min(BASE_COOLDOWN * 2 ** (proxy.consecutive_failures - 1), MAX_COOLDOWN)
+            proxy.cooldown_until = self.clock() + cooldown
+
+    def probe(self, proxy, url, timeout=10.0):
+        """Fetch `url` through the proxy and record the outcome; True on success."""
+        handler = urllib.request.ProxyHandler({"http": proxy.url, "https": proxy.url})
+        opener = urllib.request.build_opener(handler)
+        start = time.perf_counter()
+        try:
+            with opener.open(url, timeout=timeout) as response:
+                response.read(1024)
+        except (OSError, urllib.error.URLError):
+            self.report_failure(proxy)
+            return False
+        self.report_success(proxy, time.perf_counter() - start)
+        return True
+
+    def stats(self):
+        with self._lock:
+            proxies = list(self._proxies.values())
+        now = self.clock()
+        return sorted((p.as_dict(now) for p in proxies), key=lambda d: d["proxy"])
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide pool for the configured source; None when proxies are disabled."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            source = configured_source()
+            if source is None:
+                return None
+            _pool = ProxyPool(source, refresh_seconds=getattr(settings, "SCRAPER_PROXY_REFRESH_SECONDS", 600))
+        return _pool
+
+
+def reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+# --------------------------
+# WEBDRIVER
+# --------------------------
+
+
+def firefox_options(proxy=None, headless=True):
+    """Firefox options routing HTTP and HTTPS through `proxy` (a ProxyState) when given."""
+    options = firefox.Options()
+    if headless:
+        options.add_argument("--headless")
+    if proxy is not None:
+        options.set_preference("network.proxy.type", 1)  # manual proxy configuration
+        options.set_preference("network.proxy.http", proxy.host)
+        options.set_preference("network.proxy.http_port", proxy.port)
+        options.set_preference("network.proxy.ssl", proxy.host)
+        options.set_preference("network.proxy.ssl_port", proxy.port)
+        options.set_preference("network.proxy.no_proxies_on", "")
+    return options
@@ -0,0 +1,169 @@
+"""
+Soft delete and background purge of businesses.
+
+Deleting a business through the API only stamps `deleted_at` (the default
+`Business.objects` manager hides it from then on) and queues a
+BusinessPurge. The purge then removes the business's rows table by table
+in batches of PURGE_BATCH_SIZE, each batch one short transaction of a
+plain `DELETE ... WHERE id IN (...)`: Django's delete collector, which
+loads every related row into memory, only ever sees the empty business
+at the end. Progress is saved after every batch.
+
+Purges run in a daemon thread started when the deleting request commits
+(BUSINESS_PURGE_IN_PROCESS); `manage.py purge_businesses` runs or resumes
+any that are pending or were interrupted.
+"""
+
+import datetime
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import snapshot
+from .models import (
+    AIResult,
+    Business,
+    BusinessPurge,
+    Escalation,
+    Review,
+    ReviewLSHBand,
+    SentimentMonitor,
+    TopicModel,
+    TrendLog,
+)
+
+logger = logging.getLogger(__name__)
+
+# (model, filter) in deletion order: rows referencing reviews first, and
+# near-duplicates before the originals they point to.
+STEPS = (
+    (ReviewLSHBand, {}),
+    (Review, {"duplicate_of__isnull": False}),
+    (Review, {}),
+    (TrendLog, {}),
+    (Escalation, {}),
+    (SentimentMonitor, {}),
+    (TopicModel, {}),
+    (AIResult, {}),
+)
+
+
+def _batch_size():
+    return getattr(settings, "PURGE_BATCH_SIZE", 1000)
+
+
+def soft_delete(business, owner=None):
+    """Hide the business at once and queue the removal of its rows. Returns the BusinessPurge."""
+    with transaction.atomic():
+        Business.all_objects.filter(pk=business.pk).update(deleted_at=timezone.now())
+        purge = BusinessPurge.objects.create(business_id=business.pk, business_name=business.name, owner=owner)
+        if getattr(settings, "BUSINESS_PURGE_IN_PROCESS", True):
+            transaction.on_commit(lambda: start(purge.pk))
+    snapshot.drop(business.pk)
+    return purge
+
+
+def _runnable():
+    """Purges still to run: pending, failed, or "running" with no progress for PURGE_STALE_SECONDS (interrupted)."""
+    stale = timezone.now() - datetime.timedelta(seconds=getattr(settings, "PURGE_STALE_SECONDS", 300))
+    return Q(status__in=("pending", "failed")) | Q(status="running", updated_at__lt=stale)
+
+
+def start(purge_id):
+    thread = threading.Thread(target=_run_in_thread, args=(purge_id,), name=f"purge-{purge_id}", daemon=True)
+    thread.start()
+    return thread
+
+
+def _run_in_thread(purge_id):
+    try:
+        run(purge_id)
+    except Exception:
+        logger.exception("purge %s failed", purge_id)
+    finally:
+        close_old_connections()
+
+
+def _delete_batch(model, business_id, filters, batch_size):
+    """Delete up to batch_size rows of the business from model's table; returns how many went."""
+    ids = list(
+        model._base_manager.filter(business_id=business_id, **filters).values_list("pk", flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+    connection = connections[router.db_for_write(model)]
+    pk = model._meta.pk
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)} "
+            f"WHERE {connection.ops.quote_name(pk.column)} IN ({', '.join(['%s'] * len(ids))})",
+            [pk.get_db_prep_value(value, connection) for value in ids],
+        )
+    return len(ids)
+
+
+def run(purge_id, batch_size=None, log=None):
+    """
+    Remove every row of the purge's business in bounded batches, then the
+    business itself. Returns the finished BusinessPurge, or None when the
+    purge is done or being run elsewhere.
+    """
+    batch_size = batch_size or _batch_size()
+    now = timezone.now()
+    claimed = (
+        BusinessPurge.objects.filter(_runnable(), pk=purge_id)
+        .update(status="running", started_at=now, updated_at=now, error="")
+    )
+    if not claimed:
+        return None
+    purge = BusinessPurge.objects.get(pk=purge_id)
+    business_id = purge.business_id
+    try:
+        counted = dict.fromkeys(model for model, _ in STEPS if model is not ReviewLSHBand)
+        purge.total_rows = purge.rows_deleted + sum(
+            model._base_manager.filter(business_id=business_id).count() for model in counted
+        )
+        purge.save(update_fields=["total_rows", "updated_at"])
+
+        for model, filters in STEPS:
+            while True:
+                deleted = _delete_batch(model, business_id, filters, batch_size)
+                if not deleted:
+                    break
+                if model is not ReviewLSHBand:  # band rows are bookkeeping, not counted
+                    purge.rows_deleted += deleted
+                    purge.save(update_fields=["rows_deleted", "updated_at"])
+                    if log:
+                        log(f"{purge.rows_deleted}/{purge.total_rows} rows deleted")
+
+        Business.all_objects.filter(pk=business_id).delete()
+        snapshot.drop(business_id)
+    except Exception as exc:
+        purge.status, purge.error = "failed", f"{exc.__class__.__name__}: {exc}"
+        purge.save(update_fields=["status", "error", "updated_at"])
+        raise
+    purge.status, purge.finished_at = "done", timezone.now()
+    purge.save(update_fields=["status", "finished_at", "updated_at"])
+    return purge
+
+
+def pending():
+    """Ids of purges that still need running."""
+    return list(BusinessPurge.objects.filter(_runnable()).order_by("created_at").values_list("pk", flat=True))
+
+
+def progress(purge):
+    return {
+        "id": str(purge.pk),
+        "business_id": str(purge.business_id),
+        "status": purge.status,
+        "rows_deleted": purge.rows_deleted,
+        "total_rows": purge.total_rows,
+        "started_at": purge.started_at,
+        "finished_at": purge.finished_at,
+        "error": purge.error or None,
+    }
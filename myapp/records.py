@@ -0,0 +1,78 @@
+"""
+Compact review records passed from the ORM (or the scraper) to ai_analysis.
+
+A ReviewBatch holds one column per attribute instead of one object per
+review: texts and dates as lists, star ratings as an `array("i")` of
+machine ints. Batches are built from `values_list` rows with a single
+`zip(*rows)` transpose, so no per-review Python code runs between the
+database cursor and the analysis loop.
+"""
+
+import itertools
+import math
+import re
+from array import array
+
+FIELDS = ("text", "rating", "review_date")
+BATCH_SIZE = 2000
+
+_DIGITS = re.compile(r"\d+")
+
+
+def parse_rating(value, default=0):
+    """Integer rating from mixed inputs: ints, floats, "4 stars" / "Rated 4.0"; `default` when there is none."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(round(value)) if math.isfinite(value) else default
+    if isinstance(value, str):
+        match = _DIGITS.search(value)
+        if match:
+            try:
+                return int(match.group())
+            except (TypeError, ValueError):
+                return default
+    return default
+
+
+class ReviewBatch:
+    """Columns of up to BATCH_SIZE reviews; `dates` and `authors` may be None when not loaded."""
+
+    __slots__ = ("texts", "ratings", "dates", "authors")
+
+    def __init__(self, texts=(), ratings=(), dates=None, authors=None):
+        self.texts = list(texts)
+        self.ratings = array("i", ratings)
+        self.dates = list(dates) if dates is not None else None
+        self.authors = list(authors) if authors is not None else None
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        """(text, rating) pairs, the shape ai_analysis.analyze_stream takes."""
+        return zip(self.texts, self.ratings)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """A batch from (text, rating[, review_date]) tuples, e.g. a values_list chunk."""
+        if not rows:
+            return cls()
+        columns = list(zip(*rows))
+        return cls(columns[0], columns[1], columns[2] if len(columns) > 2 else None)
+
+    @classmethod
+    def from_queryset(cls, queryset, size=BATCH_SIZE, with_dates=True):
+        """
+        Yield batches of a Review queryset (in its ordering) read with
+        `values_list(text, rating[, review_date]).iterator()`, so at most one
+        batch of reviews is in memory. Ratings must be non-null integers, as
+        the Review.rating column guarantees.
+        """
+        fields = FIELDS if with_dates else FIELDS[:2]
+        rows = queryset.values_list(*fields).iterator(chunk_size=size)
+        while True:
+            chunk = list(itertools.islice(rows, size))
+            if not chunk:
+                return
+            yield cls.from_rows(chunk)
@@ -0,0 +1,89 @@
+"""
+Move rows created with random uuid4 keys to time-ordered UUIDv7 keys.
+
+Each old key is replaced by `ids.uuid7_at(created_at)`, so after a full run
+key order is creation order for every row. Rows are walked in
+(created_at, id) batches; each batch is one transaction that rewrites the
+keys and every column pointing at them (foreign keys, deferred until
+commit, and the review ids TopicModels keep for their catch-up overlap).
+Snapshots of businesses whose reviews were rekeyed are dropped, since they
+hold review ids.
+
+Rows that already have UUIDv7 keys are left alone, so the run can be
+interrupted and resumed. Old ids stop resolving: links and API clients
+holding them will see 404s.
+"""
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from . import ids
+from . import snapshot
+from .models import AIResult, Review, TopicModel, TrendLog
+
+MODELS = (Review, TrendLog, AIResult)
+BATCH_SIZE = 1000
+
+
+def _references(model):
+    """(model, column) pairs holding keys of `model`."""
+    refs = [
+        (rel.related_model, rel.field.column)
+        for rel in model._meta.related_objects
+        if rel.field.concrete and rel.field.target_field.primary_key
+    ]
+    return refs
+
+
+def _rewrite_recent_ids(pairs):
+    """Map rekeyed review ids in TopicModel.recent_ids (see topics.catch_up)."""
+    new_keys = {str(old): str(new) for old, new in pairs}
+    for pk, recent_ids in TopicModel.objects.exclude(recent_ids=[]).values_list("pk", "recent_ids"):
+        rekeyed = [new_keys.get(review_id, review_id) for review_id in recent_ids]
+        if rekeyed != recent_ids:
+            TopicModel.objects.filter(pk=pk).update(recent_ids=rekeyed)
+
+
+def _rewrite(model, pairs):
+    """Replace (old, new) keys of one batch and every reference to them, in one transaction."""
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    pk = model._meta.pk
+    params = [(pk.get_db_prep_value(new, connection), pk.get_db_prep_value(old, connection)) for old, new in pairs]
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for table_model, column in [(model, pk.column), *_references(model)]:
+            cursor.executemany(
+                f"UPDATE {quote(table_model._meta.db_table)} SET {quote(column)} = %s WHERE {quote(column)} = %s",
+                params,
+            )
+        if model is Review:
+            _rewrite_recent_ids(pairs)
+
+
+def run(models=MODELS, batch_size=BATCH_SIZE, log=None):
+    """Rekey every uuid4 row of the given models; returns {model name: rows rekeyed}."""
+    counts = {}
+    for model in models:
+        fields = ["pk", "created_at"] + (["business_id"] if model is Review else [])
+        rows = model._base_manager.order_by("created_at", "pk")
+        rekeyed = 0
+        last = None
+        while True:
+            qs = rows
+            if last is not None:
+                qs = qs.filter(Q(created_at__gt=last[1]) | Q(created_at=last[1], pk__gt=last[0]))
+            batch = list(qs.values_list(*fields)[:batch_size])
+            if not batch:
+                break
+            last = batch[-1]
+            stale = [row for row in batch if row[0].version != 7]
+            if not stale:
+                continue
+            _rewrite(model, [(row[0], ids.uuid7_at(row[1])) for row in stale])
+            for business_id in {row[2] for row in stale} if model is Review else ():
+                snapshot.drop(business_id)
+            rekeyed += len(stale)
+            if log:
+                log(f"{model.__name__}: {rekeyed} rows rekeyed")
+        counts[model.__name__] = rekeyed
+    return counts
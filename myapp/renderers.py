@@ -0,0 +1,55 @@
+"""
+JSON rendering with orjson when it is installed.
+
+`FastJSONRenderer` produces the same bytes as DRF's JSONRenderer for compact
+UTF-8 output (the project's REST_FRAMEWORK defaults): orjson hands every
+type it would format differently (datetimes, dates, times, dataclasses)
+to DRF's encoder, so UTC datetimes keep their trailing `Z`. orjson spells
+very large and very small floats without Python's exponent form
+(`1e-05` -> `0.00001`, `1e+16` -> `1e16`); bodies with such a number are
+rendered again by JSONRenderer. NaN and infinity render as null instead
+of raising. Without orjson, or for indented or ASCII output, JSONRenderer
+does the work.
+"""
+
+import re
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # optional: plain JSONRenderer output
+    orjson = None
+
+# Where orjson and float.__repr__ spell a number differently: exponents (also
+# matched inside strings, which only costs a re-render) and 0.0000x decimals.
+_EXPONENT = re.compile(rb"e[-+]?\d+[,\]}]")
+_LINE_SEPARATORS = (("\u2028".encode(), b"\\u2028"), ("\u2029".encode(), b"\\u2029"))
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=encoders.JSONEncoder().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:  # integers past 64 bits, deep nesting, unsupported types
+            return super().render(data, accepted_media_type, renderer_context)
+        if b"0.0000" in ret or _EXPONENT.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        # As JSONRenderer: keep the output a strict JavaScript subset.
+        for separator, escaped in _LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
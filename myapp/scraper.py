@@ -1,18 +1,17 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.firefox.options import Options
-from swiftshadow import QuickProxy
 import time
 import random
 import datetime
 import re
 
-class ProxyInput:
-    def __init__(self, ip, protocol, port):
-        self.ip = ip
-        self.protocol = protocol
-        self.port = port
+from . import proxies
+from .lazy import lazy_import
+from .records import ReviewBatch, parse_rating
+
+webdriver = lazy_import("selenium.webdriver")
+by = lazy_import("selenium.webdriver.common.by")
+selenium_exceptions = lazy_import("selenium.common.exceptions")
+
+_DIGITS = re.compile(r"\d+")
 
 def wait(a=1.0, b=2.0):
     time.sleep(random.uniform(a, b))
@@ -24,7 +23,7 @@ def convert_relative_date(raw):
     today = datetime.date.today()
 
     try:
-        match = re.search(r'\d+', raw)
+        match = _DIGITS.search(raw)
         if match:
             num = int(match.group())
         else:
@@ -52,29 +51,45 @@ def convert_relative_date(raw):
 # Main Scraper
 # --------------------------
 
-def scrape_google_reviews(url, max_scrolls=2):
-    # The variable you have:
-    my_proxy_data = QuickProxy()
-    # 2. Extract data from that specific object structure
-    PROXY_IP = my_proxy_data.ip
-    PROXY_PORT = my_proxy_data.port # Already an integer
-
-    options = Options()
+def open_page(url, pool=None, attempts=3, direct_fallback=True, page_load_timeout=30):
+    """
+    Start Firefox on `url` through the pool's fastest healthy proxy. A proxy
+    that fails to load the page is reported to the pool and the next one is
+    tried; after `attempts` failures the page is loaded without a proxy
+    (unless direct_fallback is False). Returns (driver, proxy or None).
+    """
+    tried = set()
+    for _ in range(attempts if pool else 0):
+        proxy = pool.acquire(exclude=tried)
+        if proxy is None:
+            break
+        driver = webdriver.Firefox(options=proxies.firefox_options(proxy))
+        driver.set_page_load_timeout(page_load_timeout)
+        start = time.perf_counter()
+        try:
+            driver.get(url)
+        except selenium_exceptions.WebDriverException as e:
+            print(f"Proxy {proxy.url} failed: {e.__class__.__name__}")
+            driver.quit()
+            pool.report_failure(proxy)
+            tried.add(proxy.url)
+            continue
+        pool.report_success(proxy, time.perf_counter() - start)
+        return driver, proxy
+
+    if pool and not direct_fallback:
+        raise RuntimeError(f"No working proxy after trying {len(tried)}")
+    driver = webdriver.Firefox(options=proxies.firefox_options(None))
+    driver.set_page_load_timeout(page_load_timeout)
+    driver.get(url)
+    return driver, None
 
-    # 3. Use the extracted data to set Firefox internal preferences
-    options.set_preference("network.proxy.type", 1) # Manual proxy settings
 
-    # We use the same IP/Port for both HTTP and SSL (HTTPS) traffic
-    options.set_preference("network.proxy.http", PROXY_IP)
-    options.set_preference("network.proxy.http_port", PROXY_PORT)
-    options.set_preference("network.proxy.ssl", PROXY_IP)
-    options.set_preference("network.proxy.ssl_port", PROXY_PORT)
-    options.set_preference("network.proxy.no_proxies_on", "")
-    opts = Options()
-    opts.add_argument("--headless")
-    driver = webdriver.Firefox(options=opts)
+def scrape_google_reviews(url, max_scrolls=2, pool=None, proxy_attempts=3):
+    By = by.By
 
-    driver.get(url)
+    driver, proxy = open_page(url, pool=pool, attempts=proxy_attempts)
+    print("Using proxy:", proxy.url if proxy else "none")
     wait(3, 4)
 
     # ----------------------------------
@@ -112,79 +127,118 @@ def scrape_google_reviews(url, max_scrolls=2):
     print("Scrolling reviews...")
     old_count = 0
     for _ in range(max_scrolls):
-        driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight;", scroll_box)
+        driver.execute_script(SCROLL_JS, scroll_box)
         time.sleep(5)
 
-        new_count = len(driver.find_elements(By.CSS_SELECTOR, "div.jftiEf"))
+        new_count = driver.execute_script(COUNT_REVIEWS_JS)
         if new_count == old_count:
             print("No more new reviews. Done.")
             break
 
         old_count = new_count
 
-
     # ----------------------------------
-    # 5. EXTRACT REVIEWS
+    # 5. EXPAND + EXTRACT REVIEWS
     # ----------------------------------
-    print("Extracting reviews...")
-
-    review_blocks = driver.find_elements(By.CLASS_NAME, "jJc9Ad")
-    print("Found reviews:", len(review_blocks))
-    # print('review block:',review_blocks.text)
-    rows = driver.find_elements(By.CSS_SELECTOR, "div[jslog='126926']")
-
-    review_data = {}
-
-    for row in rows:
-        try:
-            spans = row.find_elements(By.CSS_SELECTOR, "[jslog='127691']")
-            if len(spans) >= 2:
-                label = spans[0].text.strip().replace(":", "")
-                value = spans[1].text.strip()
-                review_data[label] = value
-        except:
-            pass
-
-    reviews = []
+    expanded = expand_truncated_reviews(driver)
+    print("Expanded truncated reviews:", expanded)
 
-    for r in review_blocks:
-            # author
-        try:
-            author = r.find_element(By.CSS_SELECTOR, "div.d4r55").text
-        except:
-            author = None
-
-        # rating
-        try:
-            rating = r.find_element(By.CSS_SELECTOR, "span[aria-label*='star']").get_attribute("aria-label")
-        except:
-            rating = None
+    print("Extracting reviews...")
+    reviews, review_data = extract_reviews(driver)
+    print("Found reviews:", len(reviews))
 
-        # text
-        try:
-            text = r.find_element(By.CSS_SELECTOR, "span.wiI7pd").text
-        except:
-            text = None
+    driver.quit()
+    return reviews, review_data
 
-        # date
-        try:
-            date_raw = r.find_element(By.CLASS_NAME, "rsqaWe").text
-        except:
-            date_raw = None
 
-        date_parsed = convert_relative_date(date_raw)
+# --------------------------
+# In-browser extraction
+# --------------------------
+# Every find_element / .text / get_attribute is one WebDriver HTTP round trip,
+# so the DOM is walked inside the browser and returned in a single call.
+
+SCROLL_JS = "arguments[0].scrollTop = arguments[0].scrollHeight;"
+
+COUNT_REVIEWS_JS = "return document.querySelectorAll('div.jftiEf').length;"
+
+# Click every collapsed "More" button at once; returns how many were clicked.
+EXPAND_MORE_JS = """
+const buttons = document.querySelectorAll(
+  "div.jJc9Ad button.w8nwRe[aria-expanded='false'], div.jJc9Ad button.w8nwRe:not([aria-expanded])"
+);
+buttons.forEach((button) => button.click());
+return buttons.length;
+"""
+
+EXTRACT_REVIEWS_JS = """
+const text = (root, selector) => {
+  const el = root.querySelector(selector);
+  return el ? el.innerText.trim() : null;
+};
+const reviews = Array.from(document.querySelectorAll("div.jJc9Ad"), (block) => {
+  const stars = block.querySelector("span[aria-label*='star']");
+  const rating = stars && (stars.getAttribute("aria-label") || "").match(/\d+/);
+  return {
+    author: text(block, "div.d4r55"),
+    rating: rating ? Number(rating[0]) : null,
+    text: text(block, "span.wiI7pd"),
+    date_raw: text(block, ".rsqaWe"),
+  };
+});
+const meta = {};
+document.querySelectorAll("div[jslog='126926']").forEach((row) => {
+  const spans = row.querySelectorAll("[jslog='127691']");
+  if (spans.length >= 2) {
+    meta[spans[0].innerText.trim().replace(/:/g, "")] = spans[1].innerText.trim();
+  }
+});
+return {reviews: reviews, meta: meta};
+"""
+
+
+def expand_truncated_reviews(driver):
+    """Expand every truncated review text with one script call; returns the number expanded."""
+    try:
+        return driver.execute_script(EXPAND_MORE_JS) or 0
+    except selenium_exceptions.WebDriverException as e:
+        print("❌ Failed to expand reviews:", e)
+        return 0
 
 
+def extract_reviews(driver):
+    """(reviews, review_data) for every loaded review block, read in one execute_script round trip."""
+    payload = driver.execute_script(EXTRACT_REVIEWS_JS) or {}
+    reviews = []
+    for r in payload.get("reviews", []):
         reviews.append({
-            "author": author,
-            "rating": rating,
-            "text": text,
-            "date_raw": date_raw,
-            "date": str(date_parsed) if date_parsed else None
+            "author": r.get("author"),
+            "rating": r.get("rating"),
+            "text": r.get("text"),
+            "date_raw": r.get("date_raw"),
+            "date": convert_relative_date(r.get("date_raw"))
         })
-
-    driver.quit()
-    return reviews, review_data
+    return reviews, payload.get("meta", {})
+
+
+def normalize_reviews(reviews):
+    """
+    ReviewBatch of scraped reviews: integer ratings (0 when missing), texts,
+    dates (datetime.date or None) and authors. extract_reviews already gives
+    numbers and dates; "4 stars" / "YYYY-MM-DD" strings are still accepted.
+    """
+    texts, ratings, dates, authors = [], [], [], []
+    for r in reviews:
+        date = r.get("date")
+        if isinstance(date, str):
+            try:
+                date = datetime.date.fromisoformat(date)
+            except ValueError:
+                date = None
+        texts.append(r.get("text") or "")
+        ratings.append(parse_rating(r.get("rating")))
+        dates.append(date or None)
+        authors.append(r.get("author") or "")
+    return ReviewBatch(texts, ratings, dates, authors)
 
 
 # ------------------------------------------
@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from rest_framework import serializers
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 
 from .models import AIResult, Business, Review, TrendLog
 
@@ -30,15 +33,29 @@ class ReviewSerializer(serializers.ModelSerializer):
             "text",
             "platform",
             "review_date",
+            "duplicate_of",
             "created_at",
             "updated_at",
         ]
+        read_only_fields = ["duplicate_of"]
 
 
 class TrendLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = TrendLog
-        fields = ["id", "business", "week", "month", "sentiment_score", "topic_trends", "created_at", "updated_at"]
+        fields = [
+            "id",
+            "business",
+            "year",
+            "week",
+            "month",
+            "review_count",
+            "sentiment_score",
+            "topic_trends",
+            "aspect_sentiment",
+            "created_at",
+            "updated_at",
+        ]
 
 
 class AIResultSerializer(serializers.ModelSerializer):
@@ -51,11 +68,93 @@ class AIResultSerializer(serializers.ModelSerializer):
             "sentiment_neg",
             "sentiment_neu",
             "top_topics",
+            "discovered_topics",
+            "aspect_sentiment",
             "keywords",
             "top_complaints",
             "top_praises",
             "ai_insights",
+            "summary",
+            "pipeline_stats",
             "created_at",
             "updated_at",
         ]
 
+
+
+# --------------------------
+# Values-based list serialization
+# --------------------------
+# ModelSerializer(many=True) builds a model instance per row and calls every
+# field's to_representation. For large lists, serialize_values() reads the same
+# columns with values_list() and only converts the ones DRF would actually
+# change (datetimes, UUIDs), using the serializer's own field objects so the
+# rendered JSON stays byte-identical.
+
+# Fields whose to_representation returns the database value unchanged.
+_PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.FloatField,
+    serializers.BooleanField,
+    serializers.JSONField,
+    serializers.PrimaryKeyRelatedField,  # UUID pks are stringified by the JSON encoder, as with DRF
+)
+
+_ISO_DATETIME = object()  # placeholder for a converter bound to the request's current timezone
+
+_value_plans = {}
+
+
+def _value_converter(field):
+    if isinstance(field, _PASSTHROUGH_FIELDS) and not getattr(field, "binary", False):
+        return None
+    if isinstance(field, serializers.DateTimeField) and not hasattr(field, "timezone"):
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if output_format and output_format.lower() == ISO_8601:
+            return _ISO_DATETIME
+    return field.to_representation
+
+
+def _value_plan(serializer_class):
+    """(field names, values_list lookups, converters) of a ModelSerializer class, built once."""
+    plan = _value_plans.get(serializer_class)
+    if plan is None:
+        fields = [f for f in serializer_class().fields.values() if not f.write_only]
+        plan = ([f.field_name for f in fields], [f.source for f in fields], [_value_converter(f) for f in fields])
+        _value_plans[serializer_class] = plan
+    return plan
+
+
+def _iso_datetime_converter():
+    """DateTimeField.to_representation for ISO 8601 output, with the timezone looked up once."""
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    slow = serializers.DateTimeField().to_representation
+
+    def convert(value):
+        if tz is None or value.tzinfo is None:
+            return slow(value)
+        value = value.astimezone(tz).isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return convert
+
+
+def serialize_values(queryset, serializer_class):
+    """The same list as `serializer_class(queryset, many=True).data`, built from values_list()."""
+    names, lookups, converters = _value_plan(serializer_class)
+    iso_datetime = _iso_datetime_converter() if _ISO_DATETIME in converters else None
+    converted = [
+        (i, iso_datetime if convert is _ISO_DATETIME else convert)
+        for i, convert in enumerate(converters)
+        if convert is not None
+    ]
+
+    rows = []
+    for values in queryset.values_list(*lookups):
+        values = list(values)
+        for i, convert in converted:
+            if values[i] is not None:
+                values[i] = convert(values[i])
+        rows.append(dict(zip(names, values)))
+    return rows
@@ -0,0 +1,545 @@
+"""
+Columnar per-business review snapshots for dashboard aggregations.
+
+A snapshot keeps one NumPy column per review attribute:
+
+    rating    int8     star rating
+    day       int32    review_date as days since 1970-01-01, in the project timezone
+    polarity  float32  TextBlob polarity of the text
+    platform  int16    index into the snapshot's platform list
+    id        S16      review primary key bytes, to reconcile after deletes
+
+Columns are stored as raw binary files under ANALYTICS_SNAPSHOT_DIR/<business>/
+and opened with np.memmap; new reviews are appended to the files, so the
+snapshot is built once and then only extended. A `meta.json` next to the
+columns holds the row count, a created_at floor below which every review is
+in the snapshot, and the ids of the reviews appended at or after the floor.
+Each catch-up re-reads reviews from the floor on and skips those ids, so a
+review whose transaction commits after that of a newer one is still picked
+up; the floor trails the last catch-up by CATCH_UP_OVERLAP_SECONDS, the time
+a review may take to commit. Loaded snapshots sit in an in-process LRU cache.
+
+`invalidate` marks a snapshot stale rather than deleting it: on its next
+use the rows of reviews that are gone are dropped and originals it lacks
+are added, so the remaining reviews are not scored again. `drop` deletes
+it outright (business purged, review keys rewritten).
+
+Dashboard reductions (`stats`, `trends`, `platform_split`) work on the
+concatenated columns of one or more snapshots.
+"""
+
+import contextlib
+import datetime
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import ai_analysis
+from . import db
+from .lazy import lazy_import
+from .models import Review
+
+np = lazy_import("numpy")
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: no cross-process append lock
+    fcntl = None
+
+SCHEMA_VERSION = 3
+COLUMNS = {
+    "rating": "int8",
+    "day": "int32",
+    "polarity": "float32",
+    "platform": "int16",
+    "id": "S16",
+}
+REDUCED = [name for name in COLUMNS if name != "id"]  # ids only serve reconcile()
+EPOCH = datetime.date(1970, 1, 1)
+FETCH_CHUNK = 2000
+ROW_FIELDS = ("created_at", "id", "review_date", "rating", "text", "platform")
+
+
+def _snapshot_dir():
+    return getattr(settings, "ANALYTICS_SNAPSHOT_DIR", settings.BASE_DIR / "var" / "snapshots")
+
+
+def _overlap():
+    return datetime.timedelta(seconds=getattr(settings, "CATCH_UP_OVERLAP_SECONDS", 60))
+
+
+def epoch_day(value):
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        value = value.date()
+    return (value - EPOCH).days
+
+
+class BusinessSnapshot:
+    """Columns for one business plus the floor and recent ids they were built up to."""
+
+    def __init__(self, business_id, path):
+        self.business_id = str(business_id)
+        self.path = path
+        self.count = 0
+        self.platforms = []
+        self.floor = None  # every review created before this is in the snapshot
+        self.recent = {}  # review id -> created_at of the rows at or after the floor
+        self.generation = 0  # bumped on every write of meta.json
+        self.signature = None  # stat of the meta.json the columns were loaded from
+        self.stale = False  # set by invalidate(): reconcile with the database before use
+        self.columns = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+    # -------------------- persistence --------------------
+
+    def _meta_path(self):
+        return os.path.join(self.path, "meta.json")
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _disk_signature(self):
+        try:
+            st = os.stat(self._meta_path())
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _read_meta(self):
+        """(meta, signature) of the usable meta.json on disk, or (None, None)."""
+        try:
+            with open(self._meta_path(), encoding="utf-8") as fh:
+                st = os.fstat(fh.fileno())
+                meta = json.load(fh)
+        except (OSError, ValueError):
+            return None, None
+        if meta.get("version") != SCHEMA_VERSION:
+            return None, None
+        return meta, (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _adopt(self, meta, signature):
+        """Take over the state recorded in `meta`; an empty snapshot when meta is None."""
+        self.signature = signature
+        self.count = meta["count"] if meta else 0
+        self.platforms = list(meta["platforms"]) if meta else []
+        self.generation = meta.get("generation", 0) if meta else 0
+        self.stale = bool(meta.get("stale")) if meta else False
+        self.floor = parse_datetime(meta["floor"]) if meta and meta.get("floor") else None
+        self.recent = {}
+        for created_at, review_id in meta["recent"] if meta else ():
+            self.recent[review_id] = parse_datetime(created_at)
+
+    def load(self):
+        """Open the persisted columns memory-mapped; False when nothing usable is on disk."""
+        meta, signature = self._read_meta()
+        self._adopt(meta, signature)
+        try:
+            self._map_columns()
+        except (OSError, ValueError):  # files dropped or rewritten after meta.json was read
+            self._adopt(None, None)
+            self._map_columns()
+            return False
+        return meta is not None
+
+    def sync(self):
+        """Reload when another process (or store) has written meta.json since this one was loaded."""
+        if self._disk_signature() != self.signature:
+            self.load()
+        return self
+
+    def _map_columns(self):
+        for name, dtype in COLUMNS.items():
+            if self.count:
+                self.columns[name] = np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=(self.count,))
+            else:
+                self.columns[name] = np.empty(0, dtype=dtype)
+
+    def _write_meta(self):
+        self.generation += 1
+        meta = {
+            "version": SCHEMA_VERSION,
+            "generation": self.generation,
+            "stale": self.stale,
+            "count": self.count,
+            "platforms": self.platforms,
+            "floor": self.floor.isoformat() if self.floor else None,
+            "recent": [[created_at.isoformat(), review_id] for review_id, created_at in self.recent.items()],
+        }
+        tmp = self._meta_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, self._meta_path())
+        self.signature = self._disk_signature()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, ".lock"), "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _unseen(self, row):
+        return (self.floor is None or row[0] >= self.floor) and str(row[1]) not in self.recent
+
+    def append(self, rows, settled):
+        """
+        Append the reviews among ROW_FIELDS tuples that the snapshot lacks.
+        `settled` is a time before which every review was committed when the
+        rows were read; the floor moves up to it. Under the directory lock
+        the on-disk count, floor and recent ids are re-read first, so rows
+        another process appended in the meantime are neither cut off nor
+        added twice. When the snapshot was dropped since the rows were
+        fetched as a delta, nothing is written and it is left empty, to be
+        rebuilt.
+        """
+        base = self.floor
+        rows = [row for row in rows if self._unseen(row)]  # the re-read overlap
+        if not rows and not any(created_at < settled for created_at in self.recent.values()):
+            return 0
+        new = _score(rows)  # the slow part, done outside the lock
+
+        with self._locked():
+            meta, signature = self._read_meta()
+            self._adopt(meta, signature)
+            if self.dropped_since(base):
+                keep, floor = [], self.floor  # these rows are only the delta from `base`
+            else:
+                keep = [i for i, row in enumerate(rows) if self._unseen(row)]
+                floor = settled if self.floor is None else max(self.floor, settled)
+            recent = {**self.recent, **{str(rows[i][1]): rows[i][0] for i in keep}}
+            recent = {review_id: created_at for review_id, created_at in recent.items() if created_at >= floor}
+            if keep:
+                new = {name: column[keep] for name, column in new.items()}
+                new["platform"] = self._platform_codes([rows[i][5] for i in keep])
+                for name, dtype in COLUMNS.items():
+                    with open(self._column_path(name), "ab") as fh:
+                        # Drop bytes of an append whose meta.json was never written.
+                        fh.truncate(self.count * np.dtype(dtype).itemsize)
+                        fh.write(new[name].tobytes())
+                self.count += len(keep)
+            if keep or len(recent) < len(self.recent):
+                self.floor, self.recent = floor, recent
+                self._write_meta()
+        self._map_columns()
+        return len(keep)
+
+    def _platform_codes(self, names):
+        """Codes for platform names, extending the snapshot's platform list as needed."""
+        codes = {name: i for i, name in enumerate(self.platforms)}
+        platform = np.empty(len(names), dtype=COLUMNS["platform"])
+        for j, name in enumerate(names):
+            name = name or "Unknown"
+            if name not in codes:
+                codes[name] = len(self.platforms)
+                self.platforms.append(name)
+            platform[j] = codes[name]
+        return platform
+
+    def mark_stale(self):
+        """Flag the persisted snapshot for reconciling; every process sees it on its next use."""
+        with self._locked():
+            meta, signature = self._read_meta()
+            if meta is None:
+                return
+            self._adopt(meta, signature)
+            self.stale = True
+            self._write_meta()
+
+    def reconcile(self):
+        """
+        Drop rows of reviews that are no longer originals of this business and
+        add the originals created before the floor that the snapshot lacks.
+        Kept rows are not scored again; later reviews are left to append().
+        """
+        with self._locked():
+            meta, signature = self._read_meta()
+            self._adopt(meta, signature)
+            if not self.stale:
+                return  # another process got here first
+            self._map_columns()
+            # Read from the primary: a lagging replica would still list deleted reviews.
+            with db.use_primary():
+                originals = Review.objects.originals().filter(business_id=self.business_id)
+                pairs = list(originals.values_list("id", "created_at"))
+                present = np.array([pk.bytes for pk, _ in pairs], dtype=COLUMNS["id"])
+                settled = [pk.bytes for pk, created_at in pairs if created_at < self.floor]
+                settled = np.array(settled, dtype=COLUMNS["id"])
+                missing = [uuid.UUID(bytes=b.ljust(16, b"\0")) for b in np.setdiff1d(settled, self.columns["id"])]
+                rows = []
+                for start in range(0, len(missing), FETCH_CHUNK):
+                    rows += Review.objects.filter(pk__in=missing[start:start + FETCH_CHUNK]).values_list(*ROW_FIELDS)
+            keep = np.isin(self.columns["id"], present)
+            new = _score(rows)
+            new["platform"] = self._platform_codes([row[5] for row in rows])
+            for name in COLUMNS:
+                tmp = self._column_path(name) + ".tmp"
+                with open(tmp, "wb") as fh:
+                    fh.write(np.asarray(self.columns[name])[keep].tobytes())
+                    fh.write(new[name].tobytes())
+                os.replace(tmp, self._column_path(name))
+            self.count = int(np.count_nonzero(keep)) + len(rows)
+            live = {str(pk) for pk, _ in pairs}
+            self.recent = {review_id: created_at for review_id, created_at in self.recent.items() if review_id in live}
+            self.stale = False
+            self._write_meta()
+        self._map_columns()
+
+    def dropped_since(self, base):
+        """True when the snapshot no longer reaches floor `base` (it was dropped meanwhile)."""
+        return base is not None and (self.floor is None or self.floor < base)
+
+    def drop(self):
+        """Delete the persisted columns; other processes notice via meta.json on their next use."""
+        with self._locked():
+            for name in ["meta.json", *(f"{column}.bin" for column in COLUMNS)]:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.path, name))
+        self._adopt(None, None)
+        self._map_columns()
+
+    def delta_filter(self):
+        """Q matching this business's reviews created at or after the floor."""
+        q = Q(business_id=self.business_id)
+        if self.floor:
+            q &= Q(created_at__gte=self.floor)
+        return q
+
+
+# --------------------------
+# CACHE
+# --------------------------
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_size():
+    return getattr(settings, "ANALYTICS_SNAPSHOT_CACHE_SIZE", 128)
+
+
+def _cached(business_id):
+    business_id = str(business_id)
+    with _cache_lock:
+        snap = _cache.get(business_id)
+        if snap is not None:
+            _cache.move_to_end(business_id)
+    if snap is not None:
+        return snap.sync()
+
+    snap = BusinessSnapshot(business_id, os.path.join(_snapshot_dir(), business_id))
+    snap.load()
+
+    with _cache_lock:
+        snap = _cache.setdefault(business_id, snap)
+        _cache.move_to_end(business_id)
+        while len(_cache) > _cache_size():
+            _cache.popitem(last=False)
+    return snap
+
+
+def invalidate(business_id):
+    """Mark a snapshot for reconciling after reviews were deleted or stopped being originals."""
+    business_id = str(business_id)
+    BusinessSnapshot(business_id, os.path.join(_snapshot_dir(), business_id)).mark_stale()
+
+
+def drop(business_id):
+    """Delete a snapshot (business purged, review keys rewritten); it is rebuilt on next use."""
+    business_id = str(business_id)
+    with _cache_lock:
+        _cache.pop(business_id, None)
+    BusinessSnapshot(business_id, os.path.join(_snapshot_dir(), business_id)).drop()
+
+
+def for_businesses(business_ids):
+    """
+    Up-to-date snapshots for the given businesses. Reviews created since each
+    floor are fetched with a single query and the unseen ones appended.
+    """
+    snaps = [_cached(business_id) for business_id in business_ids]
+    for snap in snaps:
+        if snap.stale:
+            snap.reconcile()
+    pending = snaps
+    # A snapshot another process dropped while its delta was in flight is rebuilt once more.
+    for _ in range(2):
+        pending = _catch_up(pending)
+        if not pending:
+            break
+    return snaps
+
+
+def _catch_up(snaps):
+    """Append each snapshot's delta; returns the snapshots whose append was refused."""
+    if not snaps:
+        return []
+    settled = timezone.now() - _overlap()
+    delta = Q()
+    for snap in snaps:
+        delta |= snap.delta_filter()
+    rows = (
+        Review.objects.originals()
+        .filter(delta)
+        .order_by("created_at", "id")
+        .values_list("business_id", *ROW_FIELDS)
+        .iterator(chunk_size=FETCH_CHUNK)
+    )
+
+    # Deltas are read from the primary: a replica lagging by more than the
+    # overlap would hide reviews the floor then moves past, and could bake
+    # reviews deleted on the primary into the files.
+    pending = defaultdict(list)
+    with db.use_primary():
+        for business_id, *row in rows:
+            pending[str(business_id)].append(tuple(row))
+    by_id = {snap.business_id: snap for snap in snaps}
+    refused = []
+    for business_id, new_rows in pending.items():
+        snap = by_id[business_id]
+        base = snap.floor
+        snap.append(new_rows, settled)
+        if snap.dropped_since(base):
+            refused.append(snap)
+    return refused
+
+
+def _score(rows):
+    """Rating, day, polarity and id columns for rows in ROW_FIELDS order."""
+    return {
+        "rating": np.array([row[3] for row in rows], dtype=COLUMNS["rating"]),
+        "day": np.array([epoch_day(row[2]) for row in rows], dtype=COLUMNS["day"]),
+        "polarity": np.array([ai_analysis.get_sentiment_score(row[4]) for row in rows], dtype=COLUMNS["polarity"]),
+        "id": np.array([row[1].bytes for row in rows], dtype=COLUMNS["id"]),
+    }
+
+
+# --------------------------
+# REDUCTIONS
+# --------------------------
+
+
+def combine(snaps):
+    """Concatenated columns of several snapshots with platform codes remapped to one list."""
+    if len(snaps) == 1:
+        snap = snaps[0]
+        return {name: snap.columns[name] for name in REDUCED}, list(snap.platforms)
+
+    platforms = []
+    index = {}
+    parts = defaultdict(list)
+    for snap in snaps:
+        remap = np.empty(len(snap.platforms), dtype=COLUMNS["platform"])
+        for code, name in enumerate(snap.platforms):
+            if name not in index:
+                index[name] = len(platforms)
+                platforms.append(name)
+            remap[code] = index[name]
+        for name in REDUCED:
+            column = snap.columns[name]
+            parts[name].append(remap[column] if name == "platform" and len(column) else column)
+    columns = {name: np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype=COLUMNS[name]) for name in REDUCED}
+    return columns, platforms
+
+
+def stats(columns):
+    rating = columns["rating"]
+    total = int(rating.size)
+    return {
+        "total": total,
+        "positive": int(np.count_nonzero(rating >= 4)),
+        "negative": int(np.count_nonzero(rating <= 2)),
+        "neutral": int(np.count_nonzero(rating == 3)),
+        "detractors": int(np.count_nonzero(rating <= 6)),
+        "promoters": int(np.count_nonzero(rating >= 9)),
+        "avg_rating": float(rating.mean()) if total else None,
+        "avg_polarity": float(columns["polarity"].mean()) if total else None,
+    }
+
+
+def _period_keys(days, group):
+    if group == "day":
+        return days
+    if group == "week":
+        return (days + 3) // 7  # 1970-01-01 was a Thursday: shift so weeks start on Monday
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _period_label(key, group):
+    if group == "day":
+        return str(EPOCH + datetime.timedelta(days=int(key)))
+    if group == "week":
+        monday = EPOCH + datetime.timedelta(days=int(key) * 7 - 3)
+        iso = monday.isocalendar()
+        return f"{iso[0]}-W{iso[1]:02d}"
+    return str(np.datetime64(int(key), "M"))
+
+
+def trends(columns, group="month", since_day=None):
+    """Count, mean rating and mean polarity per day/week/month period, oldest first."""
+    days = columns["day"]
+    mask = days >= since_day if since_day is not None else slice(None)
+    days = days[mask]
+    if not days.size:
+        return []
+    rating = columns["rating"][mask].astype(np.float64)
+    polarity = columns["polarity"][mask].astype(np.float64)
+
+    keys, inverse = np.unique(_period_keys(days, group), return_inverse=True)
+    counts = np.bincount(inverse)
+    rating_sums = np.bincount(inverse, weights=rating)
+    polarity_sums = np.bincount(inverse, weights=polarity)
+    return [
+        {
+            "period": _period_label(key, group),
+            "count": int(count),
+            "avg_rating": round(float(r / count), 2),
+            "avg_polarity": round(float(p / count), 3),
+        }
+        for key, count, r, p in zip(keys, counts, rating_sums, polarity_sums)
+    ]
+
+
+def month_of_year_trends(columns):
+    """Legacy dashboard trend shape: reviews grouped by calendar month number (1-12)."""
+    days = columns["day"]
+    if not days.size:
+        return []
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) % 12 + 1
+    counts = np.bincount(months, minlength=13)
+    sums = np.bincount(months, weights=columns["rating"].astype(np.float64), minlength=13)
+    return [
+        {"month": month, "avg_rating": round(float(sums[month] / counts[month]), 2), "count": int(counts[month])}
+        for month in range(1, 13)
+        if counts[month]
+    ]
+
+
+def platform_split(columns, platforms):
+    """(platform, count) pairs, most common first."""
+    counts = np.bincount(columns["platform"], minlength=len(platforms)) if platforms else []
+    pairs = [(platforms[code], int(count)) for code, count in enumerate(counts) if count]
+    return sorted(pairs, key=lambda pair: pair[1], reverse=True)
+
+
+def since_day_for(period):
+    """Earliest epoch day for a lookback like '30d', '12w', '6m' or '1y'; None for 'all'/unknown."""
+    if not period or period == "all":
+        return None
+    unit = period[-1]
+    try:
+        amount = int(period[:-1])
+    except ValueError:
+        return None
+    days = {"d": 1, "w": 7, "m": 30, "y": 365}.get(unit)
+    if days is None:
+        return None
+    return epoch_day(timezone.now()) - amount * days + 1
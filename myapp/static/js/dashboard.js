@@ -79,14 +79,14 @@
       'Positive Mentions': stats.positiveMentions || 1248,
       'Customer NPS': stats.nps || 62,
       'Avg. Response Time': stats.avgResponseTime || '1.8h',
-      'Escalations': stats.escalations || 32
+      'Escalations': stats.escalations ?? 0
     };
 
     const statCardsElements = $$('.stat-card');
     statCardsElements.forEach((card, index) => {
       const label = card.querySelector('.label')?.textContent;
       const valueElement = card.querySelector('.value');
-      if (valueElement && label && statCards[label]) {
+      if (valueElement && label && statCards[label] !== undefined) {
         valueElement.textContent = statCards[label];
       }
     });
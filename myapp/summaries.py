@@ -0,0 +1,252 @@
+"""
+Extractive review summaries with TextRank over a sparse sentence graph.
+
+Reviews are split into sentences and each sentence becomes an L2-normalised
+TF-IDF vector of at most MAX_TERMS hashed words, stored as padded
+(ids, weights) arrays. Candidate neighbours come from random-hyperplane LSH:
+in each of TABLES tables sentences are sorted by their BITS-bit SimHash key
+and paired with the next NEIGHBORS sentences in that order, so similar
+sentences meet without comparing all pairs and every sentence gets at most
+2 * TABLES * NEIGHBORS candidates, even when thousands are identical. The
+exact cosine of each candidate pair above MIN_SIMILARITY becomes an edge,
+and PageRank power iteration over the edge list (a COO sparse matrix,
+multiplied with np.bincount) ranks the sentences. The summary is the
+highest ranked sentences, skipping any too similar to one already chosen.
+
+Per business, `refresh` ranks the sentences of each of the latest
+SUMMARY_WEEKS ISO-week windows (the TrendLog windows) and keeps the best
+CANDIDATES of each in AIResult.summary; a second TextRank over those
+candidates, weighted by window rank and size, gives the summary sentences.
+Windows whose reviews have not changed are reused, so a pipeline run only
+re-ranks the windows new reviews fell into.
+"""
+
+import re
+import zlib
+from collections import Counter
+
+from django.conf import settings
+
+from . import ai_analysis, topics, trends
+from .lazy import lazy_import
+from .models import Review, TrendLog
+
+np = lazy_import("numpy")
+
+MIN_WORDS = 4
+MIN_TERMS = 2
+MAX_TERMS = 12
+TABLES = 8
+BITS = 16
+NEIGHBORS = 3
+PROJECTION_DIMS = 4096  # word hashes share this many random projection rows
+MIN_SIMILARITY = 0.1
+REDUNDANCY = 0.5  # a sentence this similar to a chosen one is not chosen
+DAMPING = 0.85
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 100
+CANDIDATES = 8
+BLOCK = 4096  # sentences projected / pairs compared per numpy operation
+
+# Sentiment words are kept: "the service was slow" and "the service was great" must not look alike.
+STOPWORDS = topics.STOPWORDS - frozenset(ai_analysis.positive_words + ai_analysis.negative_words)
+
+_SENTENCE = re.compile(r"[^.!?\n]+[.!?]*")
+_WORD = re.compile(r"[a-z][a-z']{2,}")
+_projection = None
+
+
+def enabled():
+    return getattr(settings, "SUMMARY_ENABLED", True)
+
+
+def _weeks():
+    return getattr(settings, "SUMMARY_WEEKS", 26)
+
+
+def summary_sentences():
+    return getattr(settings, "SUMMARY_SENTENCES", 5)
+
+
+def split_sentences(text):
+    """Sentences of a review with at least MIN_WORDS words."""
+    return [s.strip() for s in _SENTENCE.findall(text or "") if len(s.split()) >= MIN_WORDS]
+
+
+def _terms(sentence):
+    return [w for w in _WORD.findall(ai_analysis.clean(sentence)) if w not in STOPWORDS]
+
+
+def _projection_matrix():
+    """Fixed random hyperplanes, one row per word-hash bucket."""
+    global _projection
+    if _projection is None:
+        rng = np.random.default_rng(20261019)
+        _projection = rng.standard_normal((PROJECTION_DIMS, TABLES * BITS)).astype(np.float32)
+    return _projection
+
+
+# -------------------- vectors --------------------
+
+
+def _vectors(term_lists):
+    """Padded (ids, weights) TF-IDF rows, weights L2-normalised; ids are -1 past a row's terms."""
+    n = len(term_lists)
+    ids = np.full((n, MAX_TERMS), -1, dtype=np.int64)
+    tf = np.zeros((n, MAX_TERMS), dtype=np.float32)
+    for row, terms in enumerate(term_lists):
+        for col, (word, count) in enumerate(Counter(terms).most_common(MAX_TERMS)):
+            ids[row, col] = zlib.crc32(word.encode())
+            tf[row, col] = count
+    present = ids >= 0
+    words, inverse = np.unique(ids[present], return_inverse=True)
+    df = np.bincount(inverse, minlength=len(words))
+    weights = np.zeros_like(tf)
+    weights[present] = (1 + np.log(tf[present])) * (np.log((1 + n) / (1 + df[inverse])) + 1)
+    weights /= np.linalg.norm(weights, axis=1, keepdims=True)
+    return ids, weights
+
+
+def _similarity(ids, weights, left, right):
+    """Cosine similarity of the row pairs (left[k], right[k])."""
+    out = np.empty(len(left), dtype=np.float32)
+    for start in range(0, len(left), BLOCK):
+        a, b = left[start : start + BLOCK], right[start : start + BLOCK]
+        same = (ids[a][:, :, None] == ids[b][:, None, :]) & (ids[a][:, :, None] >= 0)
+        out[start : start + BLOCK] = (weights[a][:, :, None] * weights[b][:, None, :] * same).sum(axis=(1, 2))
+    return out
+
+
+# -------------------- graph --------------------
+
+
+def _candidate_pairs(ids, weights):
+    """(left, right) row pairs that sort next to each other in some SimHash table, each pair once."""
+    n = len(ids)
+    projection = _projection_matrix()
+    powers = (1 << np.arange(BITS)).astype(np.int64)
+    keys = np.empty((TABLES, n), dtype=np.int64)
+    for start in range(0, n, BLOCK):
+        block_ids, block_weights = ids[start : start + BLOCK], weights[start : start + BLOCK]
+        projected = (block_weights[:, :, None] * projection[block_ids % PROJECTION_DIMS]).sum(axis=1)
+        bits = (projected > 0).reshape(len(block_ids), TABLES, BITS)
+        keys[:, start : start + BLOCK] = (bits @ powers).T
+    left, right = [], []
+    for table in keys:
+        order = np.argsort(table, kind="stable")
+        for offset in range(1, min(NEIGHBORS, n - 1) + 1):
+            left.append(order[:-offset])
+            right.append(order[offset:])
+    if not left:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    left, right = np.concatenate(left), np.concatenate(right)
+    # Sorting and dropping repeats is several times faster than np.unique's hash path here.
+    pairs = np.sort(np.minimum(left, right) * n + np.maximum(left, right))
+    pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+    return pairs // n, pairs % n
+
+
+def _rank(n, left, right, similarity, prior=None):
+    """PageRank of an undirected weighted graph given as an edge list; `prior` is the teleport distribution."""
+    source = np.concatenate([left, right])
+    target = np.concatenate([right, left])
+    weight = np.concatenate([similarity, similarity]).astype(np.float64)
+    out_weight = np.bincount(source, weight, minlength=n)
+    share = weight / out_weight[source] if len(source) else weight
+    dangling = out_weight == 0
+    teleport = prior / prior.sum() if prior is not None and prior.sum() > 0 else np.full(n, 1.0 / n)
+    rank = teleport.copy()
+    for _ in range(MAX_ITERATIONS):
+        spread = np.bincount(target, share * rank[source], minlength=n)
+        updated = (1 - DAMPING) * teleport + DAMPING * (spread + rank[dangling].sum() * teleport)
+        change = np.abs(updated - rank).sum()
+        rank = updated
+        if change < TOLERANCE:
+            break
+    return rank
+
+
+def summarize(texts, limit=None, weights=None):
+    """
+    The `limit` most central sentences of the texts as [{"text", "score"}];
+    score is the sentence's rank times the number of sentences, so 1.0 is
+    average. `weights` (one per text) bias the ranking towards heavier texts.
+    """
+    limit = summary_sentences() if limit is None else limit
+    sentences, term_lists, prior = [], [], []
+    for index, text in enumerate(texts):
+        for sentence in split_sentences(text):
+            terms = _terms(sentence)
+            if len(set(terms)) >= MIN_TERMS:
+                sentences.append(sentence)
+                term_lists.append(terms)
+                prior.append(1.0 if weights is None else float(weights[index]))
+    n = len(sentences)
+    if not n or limit <= 0:
+        return []
+    ids, vectors = _vectors(term_lists)
+    left, right = _candidate_pairs(ids, vectors)
+    similarity = _similarity(ids, vectors, left, right)
+    keep = similarity >= MIN_SIMILARITY
+    prior = np.array(prior) if weights is not None else None
+    rank = _rank(n, left[keep], right[keep], similarity[keep], prior)
+
+    chosen = []
+    for row in np.argsort(-rank, kind="stable"):
+        if chosen:
+            others = np.array(chosen)
+            if _similarity(ids, vectors, np.full(len(others), row), others).max() >= REDUNDANCY:
+                continue
+        chosen.append(int(row))
+        if len(chosen) == limit:
+            break
+    return [{"text": sentences[row], "score": round(float(rank[row] * n), 3)} for row in chosen]
+
+
+# --------------------------
+# PER-BUSINESS STATE
+# --------------------------
+
+
+def _window_key(year, week):
+    return f"{year}-W{week:02d}"
+
+
+def _window_texts(business, year, week):
+    start, end = trends.window_bounds(year, week)
+    reviews = Review.objects.originals().filter(business=business, review_date__gte=start, review_date__lt=end)
+    return reviews.values_list("text", flat=True).iterator()
+
+
+def refresh(business, previous=None, changed=None):
+    """
+    AIResult.summary for a business: {"sentences": [{"text", "score",
+    "polarity"}], "windows": {"YYYY-Www": {"reviews", "candidates"}}}.
+    Windows of `previous` are reused unless listed in `changed` (an iterable
+    of (year, week)) or their TrendLog review count moved; changed=None
+    re-ranks every window. Returns None when summaries are disabled.
+    """
+    if not enabled():
+        return None
+    old = (previous or {}).get("windows") or {}
+    changed = None if changed is None else set(changed)
+    # Rows without a year predate ISO-week windows and have no window to rank.
+    logs = TrendLog.objects.filter(business=business, year__isnull=False).order_by("-year", "-week")
+    windows = {}
+    for year, week, review_count in logs.values_list("year", "week", "review_count")[: _weeks()]:
+        key = _window_key(year, week)
+        kept = old.get(key)
+        if changed is None or (year, week) in changed or not kept or kept.get("reviews") != review_count:
+            candidates = summarize(_window_texts(business, year, week), limit=CANDIDATES)
+            kept = {"reviews": review_count, "candidates": [[c["text"], c["score"]] for c in candidates]}
+        windows[key] = kept
+
+    texts, weights = [], []
+    for window in windows.values():
+        for text, score in window["candidates"]:
+            texts.append(text)
+            weights.append(score * window["reviews"])
+    sentences = summarize(texts, weights=weights)
+    for sentence in sentences:
+        sentence["polarity"] = round(ai_analysis.get_sentiment_score(sentence["text"]), 3)
+    return {"sentences": sentences, "windows": windows}
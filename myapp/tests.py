@@ -0,0 +1,288 @@
+import datetime
+import tempfile
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import admission, ai_analysis, dedup, ingest, purge, snapshot, summaries, trends
+from .models import AIResult, Business, BusinessPurge, Review, ReviewLSHBand, TrendLog
+
+TEXTS = [
+    "The pasta was wonderful and the staff were friendly and quick to help.",
+    "Service was slow tonight but the food itself was tasty and well priced.",
+    "Dirty tables and a long wait, the manager never came over to apologise.",
+    "Great coffee, lovely music and a clean bright room to work in all day.",
+]
+
+
+def make_reviews(business, count, review_date=None):
+    review_date = review_date or timezone.now()
+    reviews = [
+        Review.objects.create(
+            business=business,
+            reviewer_name=f"Reviewer {i}",
+            rating=1 + i % 5,
+            text=f"{TEXTS[i % len(TEXTS)]} Visit number {i}.",
+            platform="Yelp",
+            review_date=review_date,
+        )
+        for i in range(count)
+    ]
+    ingest.reviews_added(business, reviews)
+    return reviews
+
+
+# The fixture texts repeat, so near-duplicate detection is off unless a test is about it.
+@override_settings(ANALYTICS_SNAPSHOT_DIR=tempfile.mkdtemp(prefix="snapshots-"), REVIEW_DEDUP_ENABLED=False)
+class TrendWindowTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="owner@example.com", password="x")
+        self.business = Business.objects.create(name="Cafe", owner=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_summary_covers_each_logged_window(self):
+        make_reviews(self.business, 8)
+        make_reviews(self.business, 4, review_date=timezone.now() - datetime.timedelta(weeks=3))
+
+        summary = summaries.refresh(self.business)
+        expected = {summaries._window_key(log.year, log.week) for log in TrendLog.objects.filter(business=self.business)}
+        self.assertEqual(set(summary["windows"]), expected)
+        self.assertEqual(len(expected), 2)
+
+        response = self.client.get("/api/dashboard/insights?refresh=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(AIResult.objects.filter(business=self.business).exists())
+
+    def test_incremental_window_matches_rebuild(self):
+        make_reviews(self.business, 12)
+        log = TrendLog.objects.get(business=self.business)
+        incremental = (log.review_count, log.sentiment_sum, log.topic_trends, log.aspect_sentiment)
+
+        trends.backfill([self.business.pk])
+        log = TrendLog.objects.get(business=self.business)
+        self.assertEqual(incremental, (log.review_count, log.sentiment_sum, log.topic_trends, log.aspect_sentiment))
+
+
+class LegacyTrendLogMigrationTests(TransactionTestCase):
+    before = [("myapp", "0015_trendlog_sentiment_sum")]
+    after = [("myapp", "0016_trendlog_year_required")]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_year_less_rows_are_dropped_before_year_becomes_required(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        old_apps = executor.loader.project_state(self.before).apps
+        business = old_apps.get_model("myapp", "Business").objects.create(name="Cafe")
+        OldTrendLog = old_apps.get_model("myapp", "TrendLog")
+        OldTrendLog.objects.create(business=business, week=42, year=None, review_count=3)
+        OldTrendLog.objects.create(business=business, week=42, year=2026, review_count=5)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+
+        self.assertEqual(list(TrendLog.objects.values_list("year", "review_count")), [(2026, 5)])
+        summary = summaries.refresh(Business.objects.get(pk=business.pk))
+        self.assertEqual(list(summary["windows"]), ["2026-W42"])
+
+
+@override_settings(ANALYTICS_SNAPSHOT_DIR=tempfile.mkdtemp(prefix="snapshots-"))
+class DuplicateTests(TestCase):
+    def setUp(self):
+        self.business = Business.objects.create(name="Cafe")
+
+    def add(self, text):
+        (review,) = make_reviews(self.business, 1)
+        Review.objects.filter(pk=review.pk).update(text=text)
+        review.refresh_from_db()
+        return review
+
+    def make_copies(self, count):
+        reviews = []
+        for _ in range(count):
+            review = Review.objects.create(
+                business=self.business, rating=4, text=TEXTS[0], platform="Yelp", review_date=timezone.now()
+            )
+            ingest.reviews_added(self.business, [review])
+            reviews.append(review)
+        return reviews
+
+    def test_oldest_duplicate_is_promoted(self):
+        original, first, second = self.make_copies(3)
+        self.assertEqual(
+            set(Review.objects.filter(duplicate_of=original).values_list("pk", flat=True)), {first.pk, second.pk}
+        )
+
+        heir = dedup.promote_duplicates(original)
+        original.delete()
+
+        self.assertEqual(heir.pk, first.pk)
+        self.assertEqual(list(Review.objects.originals().values_list("pk", flat=True)), [first.pk])
+        self.assertEqual(Review.objects.get(pk=second.pk).duplicate_of_id, first.pk)
+        self.assertTrue(ReviewLSHBand.objects.filter(review_id=first.pk).exists())
+
+    def test_review_without_duplicates_is_left_alone(self):
+        (original,) = self.make_copies(1)
+        self.assertIsNone(dedup.promote_duplicates(original))
+
+
+@override_settings(ANALYTICS_SNAPSHOT_DIR=tempfile.mkdtemp(prefix="snapshots-"), BUSINESS_PURGE_IN_PROCESS=False)
+class PurgeTests(TestCase):
+    def test_steps_delete_referencing_rows_first(self):
+        steps = [(model, filters) for model, filters in purge.STEPS]
+        self.assertEqual(steps[0], (ReviewLSHBand, {}))
+        self.assertLess(steps.index((Review, {"duplicate_of__isnull": False})), steps.index((Review, {})))
+
+    def test_purge_removes_every_row_in_batches(self):
+        business = Business.objects.create(name="Cafe")
+        reviews = [
+            Review.objects.create(business=business, rating=2, text=TEXTS[2], platform="Yelp", review_date=timezone.now())
+            for _ in range(3)
+        ]
+        ingest.reviews_added(business, reviews)
+        make_reviews(business, 4)
+        self.assertTrue(Review.objects.filter(business=business, duplicate_of__isnull=False).exists())
+
+        queued = purge.soft_delete(business)
+        done = purge.run(queued.pk, batch_size=2)
+
+        self.assertEqual(done.status, "done")
+        self.assertEqual(done.rows_deleted, done.total_rows)
+        self.assertFalse(Review.objects.filter(business_id=business.pk).exists())
+        self.assertFalse(TrendLog.objects.filter(business_id=business.pk).exists())
+        self.assertFalse(Business.all_objects.filter(pk=business.pk).exists())
+        self.assertTrue(BusinessPurge.objects.filter(pk=queued.pk, status="done").exists())
+
+
+class SnapshotStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp(prefix="snapshot-")
+        self.start = timezone.now() - datetime.timedelta(minutes=10)
+
+    def store(self):
+        snap = snapshot.BusinessSnapshot("b", self.path)
+        snap.load()
+        return snap
+
+    def row(self, seconds, rating=4):
+        created_at = self.start + datetime.timedelta(seconds=seconds)
+        return (created_at, uuid.uuid4(), created_at.date(), rating, TEXTS[0], "Yelp")
+
+    def test_stale_store_neither_truncates_nor_duplicates(self):
+        rows = [self.row(i) for i in range(5)]
+        settled = self.start - datetime.timedelta(minutes=1)
+        first, second = self.store(), self.store()
+
+        self.assertEqual(first.append(rows[:3], settled), 3)
+        # `second` still thinks the files are empty.
+        self.assertEqual(second.append(rows[:2], settled), 0)
+        self.assertEqual(second.count, 3)
+        self.assertEqual(second.append(rows, settled), 2)
+
+        self.assertEqual(first.sync().count, 5)
+        self.assertEqual(self.store().columns["id"].tolist(), [row[1].bytes for row in rows])
+
+    def test_late_commit_inside_the_overlap_is_appended(self):
+        store = self.store()
+        early, late, newer = self.row(0), self.row(1, rating=1), self.row(2)
+        store.append([early, newer], self.start)
+
+        # `late` committed after `newer` was read; the next catch-up sees it in the overlap.
+        self.assertEqual(store.append([early, late, newer], self.start), 1)
+        self.assertEqual(store.append([early, late, newer], self.start), 0)
+        self.assertEqual(sorted(store.columns["rating"].tolist()), [1, 4, 4])
+
+    def test_floor_drops_recent_ids_once_settled(self):
+        store = self.store()
+        store.append([self.row(0), self.row(1)], self.start)
+        self.assertEqual(len(store.recent), 2)
+
+        store.append([], self.start + datetime.timedelta(minutes=1))
+        self.assertEqual(self.store().recent, {})
+
+
+@override_settings(ANALYTICS_SNAPSHOT_DIR=tempfile.mkdtemp(prefix="snapshots-"), REVIEW_DEDUP_ENABLED=False)
+class SnapshotReconcileTests(TestCase):
+    def test_deleted_reviews_are_dropped_without_rescoring(self):
+        business = Business.objects.create(name="Cafe")
+        reviews = make_reviews(business, 10)
+        (snap,) = snapshot.for_businesses([business.pk])
+        self.assertEqual(snap.count, 10)
+
+        gone = reviews[:3]
+        Review.objects.filter(pk__in=[review.pk for review in gone]).delete()
+        ingest.reviews_removed(business, [review.review_date for review in gone])
+        with mock.patch.object(ai_analysis, "get_sentiment_score", side_effect=AssertionError("re-scored")):
+            (snap,) = snapshot.for_businesses([business.pk])
+
+        self.assertEqual(snap.count, 7)
+        self.assertFalse(snap.stale)
+        self.assertEqual(snapshot.stats(snapshot.combine([snap])[0])["total"], 7)
+
+
+@override_settings(ANALYTICS_SNAPSHOT_DIR=tempfile.mkdtemp(prefix="snapshots-"), REVIEW_DEDUP_ENABLED=False)
+class ReviewPageTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="owner@example.com", password="x")
+        self.reviews = make_reviews(Business.objects.create(name="Cafe", owner=user), 7)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_keyset_pages_cover_every_review_once(self):
+        ids, params = [], {"limit": 3}
+        while True:
+            response = self.client.get("/api/reviews", params)
+            self.assertEqual(response.status_code, 200)
+            ids += [review["id"] for review in response.data["reviews"]]
+            if response.data["next"] is None:
+                break
+            params["before"] = response.data["next"]
+        self.assertEqual(ids, [str(review.pk) for review in reversed(self.reviews)])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get("/api/reviews", {"limit": 3, "before": "not-a-key"})
+        self.assertEqual(response.status_code, 400)
+
+
+class AdmissionTests(SimpleTestCase):
+    def setUp(self):
+        admission.reset()
+
+    def tearDown(self):
+        admission.reset()
+
+    @override_settings(ADMISSION_LIMITS={"scraper": {"tokens_per_minute": 6, "burst": 1}})
+    def test_refilled_buckets_are_evicted(self):
+        now = [0.0]
+        for owner in range(100):
+            self.assertEqual(admission.take_token("scraper", owner, clock=lambda: now[0]), 0)
+            now[0] += 1.0
+        # One token refills in 10s, so only the owners seen in the last 10s keep a bucket.
+        self.assertEqual(len(admission._buckets), 10)
+        self.assertGreater(admission.take_token("scraper", 99, clock=lambda: now[0]), 0)
+
+
+class ReviewsAnalyzeTests(TestCase):
+    def setUp(self):
+        admission.reset()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username="owner@example.com", password="x"))
+
+    def test_rating_without_a_number_counts_as_missing(self):
+        text = TEXTS[0]
+        response = self.client.post(
+            "/api/reviews/analyze", {"items": [{"text": text, "rating": "n/a"}, {"text": text}]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        labelled, unrated = response.data["results"]
+        self.assertEqual(labelled["sentiment"], unrated["sentiment"])
+        self.assertNotEqual(labelled["sentiment"], "neg")
@@ -0,0 +1,263 @@
+"""
+Online topic discovery per business.
+
+Reviews are turned into hashed TF-IDF vectors (signed feature hashing into
+`DIMS` buckets, IDF from running per-business document frequencies) and
+clustered with mini-batch spherical k-means: each batch is assigned to the
+nearest centroid by cosine similarity and every centroid moves towards the
+mean of its new members with a per-center learning rate. Centroids are
+seeded from the first sufficiently distinct reviews, so the model starts
+from nothing and never needs the full corpus again.
+
+A small heavy-hitter vocabulary (the most frequent word per bucket) turns
+the strongest centroid dimensions back into words; a topic's label is its
+top words and its count the number of reviews assigned to it.
+
+`catch_up(business)` folds in every review the model has not seen and
+returns the discovered topics ({label: count}) for
+AIResult.discovered_topics.
+"""
+
+import datetime
+import re
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import ai_analysis
+from .lazy import lazy_import
+from .models import Review, TopicModel
+
+np = lazy_import("numpy")
+
+DIMS = 2048
+CLUSTERS = 8
+SEED_SIMILARITY = 0.5  # a review seeds a new centroid when no centroid is closer than this
+MAX_CENTER_WEIGHT = 500.0  # caps the running mean so centroids keep adapting
+LABEL_WORDS = 2
+BATCH_SIZE = 256
+
+STOPWORDS = frozenset(
+    """
+    a about after again all also am an and any are as at be because been before being but by can could did do
+    does doing dont down during each even every few for from get got had has have having he her here him his how
+    i if im in into is it its just like made make me more most much my no nor not now of off on once only or
+    other our out over own same she should so some such than that the their them then there these they this those
+    through to too under until up us very was we well went were what when where which while who why will with
+    would you your
+    good great bad nice amazing awesome excellent love loved lovely best worst terrible poor really definitely
+    place time one back ok okay visit visited came come went order ordered friends weekend evening today yesterday
+    """.split()
+)
+
+_TOKEN = re.compile(r"[a-z][a-z']{2,}")
+
+
+def tokens(text):
+    return [t for t in _TOKEN.findall(ai_analysis.clean(text)) if t not in STOPWORDS]
+
+
+def _bucket(word):
+    """(bucket, sign) of a word; crc32 keeps hashing stable across processes."""
+    h = zlib.crc32(word.encode())
+    return h % DIMS, 1.0 if h & 0x80000000 else -1.0
+
+
+class OnlineTopicModel:
+    """Hashed TF-IDF + mini-batch spherical k-means state for one business."""
+
+    def __init__(self, dims=DIMS, clusters=CLUSTERS):
+        self.dims = dims
+        self.clusters = clusters
+        self.document_count = 0
+        self.centroids = np.zeros((0, dims), dtype=np.float32)
+        self.center_weights = np.zeros(0, dtype=np.float32)
+        self.document_frequency = np.zeros(dims, dtype=np.float32)
+        self.vocabulary = {}  # bucket -> [word, heavy-hitter count]
+
+    # -------------------- vectors --------------------
+
+    def _observe(self, words):
+        """Update document frequencies and the per-bucket vocabulary with one document."""
+        self.document_count += 1
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        buckets = set()
+        for word, count in counts.items():
+            bucket, _ = _bucket(word)
+            buckets.add(bucket)
+            entry = self.vocabulary.get(bucket)
+            if entry is None:
+                self.vocabulary[bucket] = [word, count]
+            elif entry[0] == word:
+                entry[1] += count
+            elif entry[1] > count:
+                entry[1] -= count
+            else:
+                self.vocabulary[bucket] = [word, count - entry[1] or 1]
+        for bucket in buckets:
+            self.document_frequency[bucket] += 1
+        return counts
+
+    def _vectors(self, documents):
+        """L2-normalised hashed TF-IDF rows for per-document {word: count} dicts."""
+        idf = np.log((1 + self.document_count) / (1 + self.document_frequency)) + 1
+        matrix = np.zeros((len(documents), self.dims), dtype=np.float32)
+        for row, counts in enumerate(documents):
+            for word, count in counts.items():
+                bucket, sign = _bucket(word)
+                matrix[row, bucket] += sign * (1 + np.log(count)) * idf[bucket]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix, norms[:, 0] > 0
+
+    # -------------------- clustering --------------------
+
+    def partial_fit(self, texts):
+        """Fold a batch of review texts into the model."""
+        documents = [self._observe(tokens(text)) for text in texts if text]
+        documents = [d for d in documents if d]
+        if not documents:
+            return
+        matrix, nonzero = self._vectors(documents)
+        matrix = matrix[nonzero]
+
+        for x in matrix:
+            if len(self.centroids) >= self.clusters:
+                break
+            if not len(self.centroids) or (self.centroids @ x).max() < SEED_SIMILARITY:
+                self.centroids = np.vstack([self.centroids, x])
+                self.center_weights = np.append(self.center_weights, np.float32(0))
+        if not len(self.centroids):
+            return
+
+        assigned = (matrix @ self.centroids.T).argmax(axis=1)
+        for center in np.unique(assigned):
+            members = matrix[assigned == center]
+            weight = min(float(self.center_weights[center]), MAX_CENTER_WEIGHT)
+            moved = self.centroids[center] * weight + members.sum(axis=0)
+            norm = np.linalg.norm(moved)
+            if norm > 0:
+                self.centroids[center] = moved / norm
+            self.center_weights[center] += len(members)
+
+    # -------------------- labels --------------------
+
+    def _label(self, centroid):
+        words = []
+        for bucket in np.argsort(-np.abs(centroid))[: LABEL_WORDS * 4]:
+            entry = self.vocabulary.get(int(bucket))
+            if entry is None:
+                continue
+            _, sign = _bucket(entry[0])
+            if centroid[bucket] * sign > 0 and entry[0] not in words:
+                words.append(entry[0])
+            if len(words) == LABEL_WORDS:
+                break
+        return "/".join(words)
+
+    def topics(self):
+        """{label: reviews assigned}, most common first."""
+        merged = {}
+        for centroid, weight in zip(self.centroids, self.center_weights):
+            label = self._label(centroid)
+            if label and weight:
+                merged[label] = merged.get(label, 0) + int(weight)
+        return dict(sorted(merged.items(), key=lambda item: item[1], reverse=True))
+
+    # -------------------- persistence --------------------
+
+    def dump(self):
+        return {
+            "dims": self.dims,
+            "clusters": self.clusters,
+            "document_count": self.document_count,
+            "centroids": self.centroids.astype("<f2").tobytes(),
+            "center_weights": self.center_weights.astype("<f4").tobytes(),
+            "document_frequency": self.document_frequency.astype("<f4").tobytes(),
+            "vocabulary": {str(bucket): entry for bucket, entry in self.vocabulary.items()},
+        }
+
+    @classmethod
+    def load(cls, row):
+        model = cls(dims=row.dims, clusters=row.clusters)
+        model.document_count = row.document_count
+        model.centroids = np.frombuffer(bytes(row.centroids), dtype="<f2").astype(np.float32).reshape(-1, row.dims)
+        model.center_weights = np.frombuffer(bytes(row.center_weights), dtype="<f4").copy()
+        frequency = np.frombuffer(bytes(row.document_frequency), dtype="<f4")
+        if len(frequency) == row.dims:
+            model.document_frequency = frequency.copy()
+        model.vocabulary = {int(bucket): entry for bucket, entry in (row.vocabulary or {}).items()}
+        return model
+
+
+# --------------------------
+# PER-BUSINESS STATE
+# --------------------------
+
+
+def _min_documents():
+    return getattr(settings, "TOPIC_MODEL_MIN_REVIEWS", 30)
+
+
+def catch_up(business):
+    """
+    Fold reviews the model has not seen into the business's topic model and
+    save it. Returns the discovered topics, or None while the
+    model has seen fewer than TOPIC_MODEL_MIN_REVIEWS reviews.
+
+    The TopicModel row stays locked while reviews are folded in, so
+    concurrent catch-ups of one business run one after the other instead of
+    overwriting each other's model. It runs from the AI pipeline and once
+    per import, not per inserted review.
+
+    Reviews are re-read from the model's floor on, skipping the ids already
+    folded in, so one whose transaction commits after that of a newer review
+    is not missed. The floor trails the catch-up by CATCH_UP_OVERLAP_SECONDS.
+    """
+    if not getattr(settings, "TOPIC_MODEL_ENABLED", True):
+        return None
+    with transaction.atomic():
+        row, _ = TopicModel.objects.select_for_update().get_or_create(
+            business=business, defaults={"dims": DIMS, "clusters": CLUSTERS}
+        )
+        return _catch_up(business, row)
+
+
+def _catch_up(business, row):
+    model = OnlineTopicModel.load(row) if row.document_count else OnlineTopicModel()
+
+    settled = timezone.now() - datetime.timedelta(seconds=getattr(settings, "CATCH_UP_OVERLAP_SECONDS", 60))
+    floor = settled if row.floor is None else max(row.floor, settled)
+    seen = set(row.recent_ids)
+    reviews = Review.objects.originals().filter(business=business)
+    if row.floor:
+        reviews = reviews.filter(created_at__gte=row.floor)
+    rows = reviews.order_by("created_at", "id").values_list("created_at", "id", "text").iterator(chunk_size=BATCH_SIZE)
+
+    batch = []
+    folded = 0
+    recent = []
+    for created_at, review_id, text in rows:
+        review_id = str(review_id)
+        if created_at >= floor:
+            recent.append(review_id)
+        if review_id in seen:
+            continue
+        batch.append(text)
+        folded += 1
+        if len(batch) >= BATCH_SIZE:
+            model.partial_fit(batch)
+            batch = []
+    model.partial_fit(batch)
+
+    if folded or len(recent) < len(seen):
+        for field, value in {**model.dump(), "floor": floor, "recent_ids": recent}.items():
+            setattr(row, field, value)
+        row.save()
+    if model.document_count < _min_documents():
+        return None
+    return model.topics() or None
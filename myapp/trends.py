@@ -0,0 +1,206 @@
+"""
+TrendLog history bucketed by each review's own review_date.
+
+Every TrendLog row covers one ISO year-week window of a business. New reviews
+are folded into their window's running totals, other changes recompute only
+the windows they touch, and `backfill` rebuilds the whole history in a single
+streaming pass over the Review table.
+"""
+
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.functions import ExtractIsoYear, ExtractWeek
+from django.utils import timezone
+
+from . import ai_analysis
+from .models import Review, TrendLog
+
+
+def review_window(review_date):
+    """(iso_year, iso_week) of a review_date, in the project timezone."""
+    if isinstance(review_date, datetime.datetime):
+        if timezone.is_aware(review_date):
+            review_date = timezone.localtime(review_date)
+        review_date = review_date.date()
+    return ai_analysis.iso_window(review_date)
+
+
+def window_bounds(year, week):
+    """Aware [start, end) datetimes covering an ISO year-week window."""
+    start = ai_analysis.window_start(year, week)
+    start_dt = timezone.make_aware(datetime.datetime.combine(start, datetime.time.min))
+    return start_dt, start_dt + datetime.timedelta(days=7)
+
+
+def _trend_log_values(year, week, window):
+    return {
+        "month": ai_analysis.window_start(year, week).month,
+        "review_count": window["review_count"],
+        "sentiment_score": window["sentiment_score"],
+        "sentiment_sum": window["sentiment_sum"],
+        "topic_trends": window["topic_trends"],
+        "aspect_sentiment": window["aspect_sentiment"],
+    }
+
+
+def touched_windows(business, since=None):
+    """Distinct windows holding reviews of the business changed after `since`."""
+    qs = Review.objects.filter(business=business)
+    if since is not None:
+        qs = qs.filter(updated_at__gt=since)
+    windows = (
+        qs.annotate(iso_year=ExtractIsoYear("review_date"), iso_week=ExtractWeek("review_date"))
+        .values_list("iso_year", "iso_week")
+        .distinct()
+    )
+    return set(windows)
+
+
+def refresh_windows(business, windows):
+    """Recompute (or drop, when now empty) the given windows of a business."""
+    refreshed = []
+    for year, week in sorted(set(windows)):
+        start, end = window_bounds(year, week)
+        texts = Review.objects.originals().filter(
+            business=business, review_date__gte=start, review_date__lt=end
+        ).values_list("text", flat=True)
+
+        window = ai_analysis.analyze_window(texts.iterator())
+        if not window["review_count"]:
+            TrendLog.objects.filter(business=business, year=year, week=week).delete()
+            continue
+
+        TrendLog.objects.update_or_create(
+            business=business,
+            year=year,
+            week=week,
+            defaults=_trend_log_values(year, week, window),
+        )
+        refreshed.append((year, week))
+    return refreshed
+
+
+def add_reviews(business, reviews, scored=None):
+    """
+    Fold newly created reviews into their windows. A window that already has
+    a TrendLog is updated from the new reviews alone; a window without one
+    (or logged before sentiment sums and aspect sentiment were stored) is
+    computed from scratch since it may hold older, never-logged reviews.
+    `scored` maps review pk to ai_analysis.aspect_mentions(review.text) for
+    reviews already scored.
+    """
+    if not business:
+        return []
+    scored = scored or {}
+    by_window = defaultdict(list)
+    for review in reviews:
+        by_window[review_window(review.review_date)].append((review.text, scored.get(review.pk)))
+    if not by_window:
+        return []
+
+    years = {year for year, _ in by_window}
+    weeks = {week for _, week in by_window}
+    existing = {
+        (log.year, log.week): log
+        for log in TrendLog.objects.filter(business=business, year__in=years, week__in=weeks)
+    }
+
+    for (year, week), items in by_window.items():
+        log = existing.get((year, week))
+        if log is None or log.sentiment_sum is None or log.aspect_sentiment is None:
+            refresh_windows(business, [(year, week)])
+            continue
+        acc = ai_analysis.WindowAccumulator.from_result(
+            {
+                "review_count": log.review_count,
+                "sentiment_sum": log.sentiment_sum,
+                "topic_trends": log.topic_trends,
+                "aspect_sentiment": log.aspect_sentiment,
+            }
+        )
+        for text, review_scored in items:
+            acc.add(text, review_scored)
+        window = acc.result()
+        log.review_count = window["review_count"]
+        log.sentiment_score = window["sentiment_score"]
+        log.sentiment_sum = window["sentiment_sum"]
+        log.topic_trends = window["topic_trends"]
+        log.aspect_sentiment = window["aspect_sentiment"]
+        log.save(
+            update_fields=[
+                "review_count", "sentiment_score", "sentiment_sum", "topic_trends", "aspect_sentiment", "updated_at"
+            ]
+        )
+    return sorted(by_window)
+
+
+def refresh_review_dates(business, review_dates):
+    """Recompute the windows the given review dates fall into."""
+    if not business:
+        return []
+    return refresh_windows(business, {review_window(d) for d in review_dates if d})
+
+
+def refresh_stale_windows(business, since=None):
+    """
+    Recompute only the windows touched by reviews changed after `since`
+    (normally the previous pipeline run); every window when since is None.
+    """
+    return refresh_windows(business, touched_windows(business, since=since))
+
+
+def backfill(business_ids=None, chunk_size=2000, log=None):
+    """
+    Rebuild TrendLog history in one pass over Review ordered by
+    (business, review_date). Only the window being filled is kept in memory.
+    Returns the number of windows written.
+    """
+    reviews = Review.objects.originals().order_by("business_id", "review_date")
+    existing = TrendLog.objects.all()
+    if business_ids:
+        reviews = reviews.filter(business_id__in=business_ids)
+        existing = existing.filter(business_id__in=business_ids)
+
+    rows = reviews.values_list("business_id", "review_date", "text").iterator(chunk_size=chunk_size)
+
+    pending = []
+    written = 0
+    current_key = None
+    acc = None
+
+    def flush():
+        business_id, year, week = current_key
+        pending.append(
+            TrendLog(
+                business_id=business_id,
+                year=year,
+                week=week,
+                **_trend_log_values(year, week, acc.result()),
+            )
+        )
+
+    with transaction.atomic():
+        existing.delete()
+        for business_id, review_date, text in rows:
+            key = (business_id, *review_window(review_date))
+            if key != current_key:
+                if acc is not None:
+                    flush()
+                current_key, acc = key, ai_analysis.WindowAccumulator()
+            acc.add(text)
+
+            if len(pending) >= chunk_size:
+                TrendLog.objects.bulk_create(pending)
+                written += len(pending)
+                pending.clear()
+                if log:
+                    log(f"{written} windows written")
+
+        if acc is not None:
+            flush()
+        TrendLog.objects.bulk_create(pending)
+        written += len(pending)
+
+    return written
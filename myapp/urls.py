@@ -10,5 +10,6 @@ urlpatterns = [
     path("dashboard/", views.dashboard, name="dashboard"),
     path("business/", views.business, name="business"),
     path("reviews/", views.reviews, name="reviews"),
+    path("metrics", views.metrics, name="metrics"),
     path("api/", include("myapp.api_urls")),
 ]
\ No newline at end of file
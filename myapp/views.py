@@ -1,9 +1,15 @@
+import hmac
+
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import redirect, render
 from django.views.decorators.csrf import ensure_csrf_cookie
 
+from . import metrics as request_metrics
+from . import profiling
 from .forms import BusinessForm, LoginForm, RegistrationForm
 from .models import Business
 
@@ -65,4 +71,22 @@ def reviews(request):
 
 def logout_view(request):
     logout(request)
-    return redirect("login")
\ No newline at end of file
+    return redirect("login")
+
+
+def _metrics_authorized(request):
+    """A scraper presenting METRICS_TOKEN as a bearer token, or a staff session."""
+    token = getattr(settings, "METRICS_TOKEN", "")
+    scheme, _, credentials = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+    if token and scheme.lower() == "bearer" and hmac.compare_digest(credentials.encode(), token.encode()):
+        return True
+    return request.user.is_authenticated and request.user.is_staff
+
+
+def metrics(request):
+    """Prometheus exposition of request and pipeline metrics; allowed scrapers only."""
+    allowed = getattr(settings, "METRICS_ALLOWED_IPS", ("127.0.0.1", "::1"))
+    if request.META.get("REMOTE_ADDR") not in allowed or not _metrics_authorized(request):
+        return HttpResponseForbidden()
+    body = request_metrics.registry.render() + profiling.render_prometheus()
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
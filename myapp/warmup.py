@@ -0,0 +1,39 @@
+"""
+Opt-in preload for server workers.
+
+Heavy dependencies are imported lazily (see myapp.lazy), so without a warm-up
+the first request of each worker pays for the URLconf, TextBlob's lexicon and
+NumPy. With `settings.WARM_UP_ON_STARTUP` enabled, wsgi.py/asgi.py call
+`warm_up()` once the application is created; under gunicorn `--preload` this
+happens in the master before workers fork, so they share the loaded modules.
+`warm_up()` can also be called from a gunicorn `post_fork` hook.
+"""
+
+import importlib
+import logging
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger("myapp.warmup")
+
+
+def warm_up():
+    """Import the URLconf and heavy dependencies ahead of the first request; returns seconds spent."""
+    start = time.perf_counter()
+
+    importlib.import_module(settings.ROOT_URLCONF)
+
+    from . import ai_analysis, snapshot
+
+    ai_analysis.warm_up()
+    snapshot.np.zeros(1)
+
+    elapsed = time.perf_counter() - start
+    logger.info("warm-up finished in %.3fs", elapsed)
+    return elapsed
+
+
+def warm_up_if_enabled():
+    if getattr(settings, "WARM_UP_ON_STARTUP", False):
+        warm_up()
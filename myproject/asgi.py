@@ -15,3 +15,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
 
 application = get_asgi_application()
 
+from myapp.warmup import warm_up_if_enabled  # noqa: E402  (needs configured settings)
+
+warm_up_if_enabled()
+
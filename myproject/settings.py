@@ -34,6 +34,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myapp.metrics.RequestMetricsMiddleware',
+    'myapp.db.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,9 +73,28 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # Keep connections open between requests instead of reconnecting each time.
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    # Optional read replica for dashboard and list reads (see myapp/db.py), e.g.
+    # 'replica': {'ENGINE': 'django.db.backends.postgresql', 'HOST': 'replica.internal', ...},
+    # On PostgreSQL, Django's pool can replace CONN_MAX_AGE: 'OPTIONS': {'pool': True}.
 }
 
+DATABASE_ROUTERS = ['myapp.db.ReplicaRouter']
+DATABASE_REPLICA_ALIAS = 'replica'
+# After a write, the client reads from the primary for this long (covers replica lag).
+DATABASE_REPLICA_PIN_SECONDS = 15
+# Applied to every new SQLite connection: WAL lets dashboard reads run alongside scraper writes.
+SQLITE_PRAGMAS = [
+    'journal_mode=WAL',
+    'synchronous=NORMAL',
+    'busy_timeout=5000',
+    'temp_store=MEMORY',
+    'cache_size=-20000',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -123,6 +144,11 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson-backed when installed, with the same bytes as JSONRenderer (see myapp/renderers.py).
+    'DEFAULT_RENDERER_CLASSES': [
+        'myapp.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'UNAUTHENTICATED_USER': None,
 }
 
@@ -136,3 +162,94 @@ LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/login/'
 
+# AI pipeline instrumentation (see myapp/profiling.py).
+# Stats hook: 'none', 'log', 'prometheus' or a dotted path to a class with emit(stats).
+# 'log' writes INFO records on the 'myapp.pipeline' logger; add a LOGGING handler to see them.
+AI_PIPELINE_STATS_HOOK = 'none'
+# Profile every pipeline job with cProfile (staff can also pass ?profile=1 per request).
+AI_PIPELINE_PROFILE = False
+# Directory for raw .prof dumps of profiled jobs; None keeps only the summary on AIResult.
+AI_PIPELINE_PROFILE_DIR = None
+# File the 'prometheus' hook rewrites after every job (textfile collector); None disables.
+AI_PIPELINE_PROMETHEUS_FILE = None
+
+# Largest ?limit= page of GET /api/reviews.
+REVIEWS_PAGE_MAX_SIZE = 500
+
+# Per-request limits of POST /api/reviews/analyze.
+REVIEWS_ANALYZE_MAX_TEXTS = 500
+REVIEWS_ANALYZE_MAX_CHARS = 200_000
+REVIEWS_ANALYZE_CPU_SECONDS = 2.0
+
+# Request metrics served on /metrics (see myapp/metrics.py).
+METRICS_ENABLED = True
+# Share of requests that get latency/DB/size accounting; request counts are always kept.
+METRICS_SAMPLE_RATE = 1.0
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+# Bearer token scrapers send to /metrics (Prometheus `authorization: {credentials: ...}`).
+# Empty: only staff sessions from METRICS_ALLOWED_IPS can read it.
+METRICS_TOKEN = ''
+
+# Columnar per-business review snapshots for dashboard aggregations (see myapp/snapshot.py).
+ANALYTICS_SNAPSHOT_DIR = BASE_DIR / 'var' / 'snapshots'
+# Snapshots kept loaded in each process.
+ANALYTICS_SNAPSHOT_CACHE_SIZE = 128
+# Longest a review's transaction may take to commit: snapshot and topic model catch-ups
+# re-read reviews created this long before the last one and skip those already seen.
+CATCH_UP_OVERLAP_SECONDS = 60
+
+# Import the URLconf, TextBlob and NumPy when wsgi/asgi start instead of on the
+# first request (see myapp/warmup.py). Pair with gunicorn --preload to share them across workers.
+WARM_UP_ON_STARTUP = False
+
+# Scraper proxy pool (see myapp/proxies.py): 'swiftshadow', 'none', a list of
+# proxy URLs (e.g. a local stub) or the path of a file with one proxy per line.
+SCRAPER_PROXY_SOURCE = 'swiftshadow'
+SCRAPER_PROXY_POOL_SIZE = 50
+SCRAPER_PROXY_REFRESH_SECONDS = 600
+# Proxies tried per scrape before falling back to a direct connection.
+SCRAPER_PROXY_ATTEMPTS = 3
+
+# Admission control for expensive endpoints (see myapp/admission.py): a token
+# bucket per owner, plus a cap on concurrent runs across owners; requests wait
+# up to queue_seconds for a slot, then get 429 with Retry-After. Per process.
+ADMISSION_LIMITS = {
+    'insights_refresh': {'tokens_per_minute': 6, 'burst': 3, 'concurrency': 2, 'queue_seconds': 5},
+    'scraper': {'tokens_per_minute': 2, 'burst': 2, 'concurrency': 1, 'queue_seconds': 2},
+    'reviews_analyze': {'tokens_per_minute': 60, 'burst': 10, 'concurrency': 4, 'queue_seconds': 5},
+}
+
+# Online topic discovery per business (see myapp/topics.py). Discovered topics are stored in
+# AIResult.discovered_topics and lead the dashboard once a business has this many reviews.
+TOPIC_MODEL_ENABLED = True
+TOPIC_MODEL_MIN_REVIEWS = 30
+
+# Near-duplicate review detection (see myapp/dedup.py). A review whose MinHash
+# similarity to an earlier review of the same business reaches the threshold is
+# flagged and left out of analysis aggregates; shorter texts are never flagged.
+REVIEW_DEDUP_ENABLED = True
+REVIEW_DEDUP_THRESHOLD = 0.8
+REVIEW_DEDUP_MIN_CHARS = 50
+
+# Streaming escalation detection (see myapp/escalations.py): daily rating and
+# polarity windows are compared with an EWMA baseline and a one-sided CUSUM
+# (slack K, threshold H, in standard errors) raises an Escalation.
+ESCALATION_ENABLED = True
+ESCALATION_EWMA_ALPHA = 0.1
+ESCALATION_CUSUM_K = 0.5
+ESCALATION_CUSUM_H = 5.0
+ESCALATION_WARMUP_REVIEWS = 20
+ESCALATION_LOOKBACK_DAYS = 30
+
+# Business deletion (see myapp/purge.py): DELETE soft-deletes at once and the
+# related rows are removed in batches of PURGE_BATCH_SIZE, in a background
+# thread of the deleting process or by `manage.py purge_businesses`.
+BUSINESS_PURGE_IN_PROCESS = True
+PURGE_BATCH_SIZE = 1000
+PURGE_STALE_SECONDS = 300
+
+# Extractive review summaries (see myapp/summaries.py): TextRank over the
+# sentences of the latest SUMMARY_WEEKS trend windows, keeping SUMMARY_SENTENCES.
+SUMMARY_ENABLED = True
+SUMMARY_WEEKS = 26
+SUMMARY_SENTENCES = 5